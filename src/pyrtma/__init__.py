@@ -1,5 +1,9 @@
 from .message import *
 from .client import *
+from .async_client import *
+from .reactor import *
+from .prepared import *
+from .blob import *
 from .client_logging import RTMALogger as RTMALogger
 from .context import *
 
@@ -0,0 +1,526 @@
+"""pyrtma.async_client module
+
+Includes :py:class:`~AsyncClient`, an asyncio version of :py:class:`~pyrtma.client.Client`
+"""
+
+import asyncio
+import os
+import socket
+import time
+
+from .message import Message
+from .message_data import MessageData
+from .header import MessageHeader, get_header_cls
+from .core_defs import ALL_MESSAGE_TYPES
+from .client import Client
+from .socket_profile import SocketProfile, get_socket_profile
+from .stream import MessageStream, decode_message
+from .exceptions import (
+    SocketOptionError,
+    MessageManagerNotFound,
+    NotConnectedError,
+    ConnectionLost,
+    AcknowledgementTimeout,
+    InvalidSubscription,
+)
+from . import core_defs as cd
+
+from typing import Iterable, List, Optional, Set, Type, Union
+
+__all__ = ["AsyncClient"]
+
+
+class _ClientProtocol(asyncio.Protocol):
+    """Protocol that feeds received bytes into a MessageStream
+
+    Used internally by AsyncClient. Bytes are framed directly from the shared
+    stream buffer, so a cancelled read never loses partially consumed data.
+    """
+
+    # Stop reading from the socket while this many bytes are waiting to be framed
+    HIGH_WATER = 16 * 1024**2
+
+    def __init__(self, stream: MessageStream, quickack: bool = False):
+        self.stream = stream
+        self.quickack = quickack
+        self.transport: Optional[asyncio.Transport] = None
+        self.recv_time = 0.0
+        self.closed = False
+        self.reading_paused = False
+        self._waiter: Optional[asyncio.Future] = None
+        self._can_write = asyncio.Event()
+        self._can_write.set()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        self.stream.feed(data)
+        self.recv_time = time.perf_counter()
+
+        if self.quickack:
+            SocketProfile.rearm_quickack(self.transport.get_extra_info("socket"))
+
+        if self.stream.pending_bytes > self.HIGH_WATER:
+            self.transport.pause_reading()
+            self.reading_paused = True
+
+        self._wake()
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.closed = True
+        self._can_write.set()
+        self._wake()
+
+    def pause_writing(self):
+        self._can_write.clear()
+
+    def resume_writing(self):
+        self._can_write.set()
+
+    def resume_reading(self):
+        if self.reading_paused and not self.closed:
+            self.transport.resume_reading()
+            self.reading_paused = False
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def wait_for_data(self):
+        self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+
+    async def drain(self):
+        await self._can_write.wait()
+
+
+class AsyncClient:
+    """asyncio RTMA client interface
+
+    Mirrors :py:class:`~pyrtma.client.Client` for use in asyncio applications.
+    Messages can also be read with ``async for msg in client``.
+
+    Args:
+        module_id (optional): Static module ID, which must be unique.
+            Defaults to 0, which generates a dynamic module ID.
+        host_id (optional): Host ID. Defaults to 0.
+        timecode (optional): Add additional timecode fields to message
+            header, used by some projects at RNEL. Defaults to False.
+        name (optional): Module name. Defaults to "".
+        hop_times (optional): Add message manager hop timestamp fields to message header.
+            Defaults to False.
+    """
+
+    # Header stamping and destination checks are shared with Client
+    _check_destination = Client._check_destination
+    _make_header = Client._make_header
+    _make_data_header = Client._make_data_header
+
+    def __init__(
+        self,
+        module_id: int = 0,
+        host_id: int = 0,
+        timecode: bool = False,
+        name: str = "",
+        hop_times: bool = False,
+    ):
+        if module_id >= cd.DYN_MOD_ID_START or module_id < 0:
+            raise ValueError(f"Module ID must be >= 0 and < {cd.DYN_MOD_ID_START}")
+
+        self._module_id = module_id
+        self._host_id = host_id
+        self._name = name
+        self._msg_count = 0
+        self._server = ("", -1)
+        self._connected = False
+        self._header_cls = get_header_cls(timecode, hop_times)
+        self._stream = MessageStream(self._header_cls)
+        self._protocol: Optional[_ClientProtocol] = None
+        self._sub_all = False
+        self._subscribed_types: Set[int] = set()
+        self._manager_capabilities = 0
+        self._dynamic_id: bool = module_id == 0
+        # Time sync is not implemented here. Send times use the local clock.
+        self._clock_offset = 0.0
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.disconnect()
+
+    def __aiter__(self) -> "AsyncClient":
+        return self
+
+    async def __anext__(self) -> Message:
+        if not self._connected:
+            raise StopAsyncIteration
+
+        msg = await self.read_message()
+        if msg is None:
+            raise StopAsyncIteration
+        return msg
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def server(self) -> tuple:
+        """Message manager server address as a (IP_addr, port_num) tuple"""
+        return self._server
+
+    @property
+    def connected(self) -> bool:
+        """Status of connection to message manager server"""
+        return self._connected
+
+    @property
+    def msg_count(self) -> int:
+        """Count of messages that have been sent"""
+        return self._msg_count
+
+    @property
+    def module_id(self) -> int:
+        """Numeric module ID of client"""
+        return self._module_id
+
+    @property
+    def header_cls(self) -> Type[MessageHeader]:
+        """Class defining the RTMA message header"""
+        return self._header_cls
+
+    @property
+    def subscribed_types(self) -> Set[int]:
+        """Set of subscribed message types"""
+        return self._subscribed_types
+
+    @property
+    def manager_capabilities(self) -> int:
+        """Bitmask of optional features supported by the connected message manager (MM_CAP_*)"""
+        return self._manager_capabilities
+
+    @property
+    def has_buffered_messages(self) -> bool:
+        """True if a complete message has already been received and can be read without waiting"""
+        return self._stream.has_frame()
+
+    async def connect(
+        self,
+        server_name: str = "localhost:7111",
+        logger_status: bool = False,
+        daemon_status: bool = False,
+        allow_multiple: bool = False,
+        socket_profile: Union[str, SocketProfile, None] = None,
+    ):
+        """Connect to message manager server
+
+        Args:
+            server_name (optional): IP_addr:port_num string associated with message manager.
+                Defaults to "localhost:7111".
+            logger_status (optional): Flag to declare client as a logger module. Defaults to False.
+            daemon_status (optional): Flag to declare client as a daemon module. Defaults to False.
+            allow_multiple (optional): Flag to declare client can have multiple instances. Defaults to False.
+            socket_profile (optional): Socket tuning profile name or a SocketProfile object.
+                Defaults to None, which selects "logger" for logger modules and "default" otherwise.
+
+        Raises:
+            MessageManagerNotFound: Unable to connect to message manager
+        """
+        if self._connected:
+            await self.disconnect()
+
+        if socket_profile is None:
+            socket_profile = "logger" if logger_status else "default"
+        profile = get_socket_profile(socket_profile)
+
+        addr, port = server_name.split(":")
+        self._server = (addr, int(port))
+
+        # Buffer sizes must be set before connecting to take full effect
+        sock = socket.socket(
+            family=socket.AF_INET, type=socket.SOCK_STREAM, proto=socket.IPPROTO_TCP
+        )
+        try:
+            profile.apply(sock)
+        except SocketOptionError:
+            sock.close()
+            raise
+        sock.setblocking(False)
+
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.sock_connect(sock, self._server)
+        except ConnectionRefusedError as e:
+            sock.close()
+            raise MessageManagerNotFound(
+                f"No message manager server responding at {addr}:{port}"
+            ) from e
+
+        self._stream.clear()
+        _, self._protocol = await loop.create_connection(
+            lambda: _ClientProtocol(self._stream, profile.quickack), sock=sock
+        )
+        self._connected = True
+
+        # Reset the module_id to zero for dynamic assignment
+        if self._dynamic_id:
+            self._module_id = 0
+
+        msg = cd.MDF_CONNECT()
+        msg.logger_status = int(logger_status)
+        msg.daemon_status = int(daemon_status)
+
+        msg2 = cd.MDF_CONNECT_V2()
+        msg2.logger_status = int(logger_status)
+        msg2.daemon_status = int(daemon_status)
+        msg2.allow_multiple = int(allow_multiple)
+        msg2.pid = os.getpid()
+        msg2.mod_id = self._module_id
+        msg2.name = self._name
+
+        await self.send_message(msg2)
+        await self.send_message(msg)
+        ack_msg = await self._wait_for_acknowledgement()
+
+        if self._module_id == 0:
+            self._module_id = ack_msg.header.dest_mod_id
+        self._manager_capabilities = ack_msg.header.remaining_bytes
+
+        self._subscribed_types = set()
+        self._sub_all = False
+
+        ready = cd.MDF_MODULE_READY()
+        ready.pid = os.getpid()
+        await self.send_message(ready)
+
+    async def disconnect(self):
+        """Disconnect from message manager server"""
+        try:
+            if self._connected:
+                await self.send_signal(cd.MT_DISCONNECT)
+                # Allow some time for signal to reach MM
+                await asyncio.sleep(0.100)
+        except Exception:
+            pass
+        finally:
+            if self._protocol is not None and self._protocol.transport is not None:
+                self._protocol.transport.close()
+            self._protocol = None
+            self._connected = False
+            self._subscribed_types = set()
+            self._sub_all = False
+
+    def _check_connected(self):
+        if not self._connected:
+            raise NotConnectedError
+
+    async def _write(self, buffers: List):
+        assert self._protocol is not None and self._protocol.transport is not None
+        if self._protocol.closed:
+            self._connected = False
+            raise ConnectionLost
+
+        self._protocol.transport.writelines(buffers)
+        await self._protocol.drain()
+
+    async def send_message(
+        self, msg_data: MessageData, dest_mod_id: int = 0, dest_host_id: int = 0
+    ):
+        """Send a message
+
+        Waits only if the transport's write buffer is full.
+
+        Args:
+            msg_data: Object containing the message to send
+            dest_mod_id (optional): Specific module ID to send to. Defaults to 0 (broadcast).
+            dest_host_id (optional): Specific host ID to send to. Defaults to 0 (broadcast).
+
+        Raises:
+            InvalidDestinationModule: Specified destination module is invalid
+            InvalidDestinationHost: Specified destination host is invalid
+            ConnectionLost: Connection error to message manager server
+        """
+        self._check_connected()
+        self._check_destination(dest_mod_id, dest_host_id)
+
+        header = self._make_data_header(msg_data, dest_mod_id, dest_host_id)
+        if header.num_data_bytes > 0:
+            buffers = [bytes(header), bytes(msg_data)]
+        else:
+            buffers = [bytes(header)]
+        self._msg_count += 1
+
+        await self._write(buffers)
+
+    async def send_signal(
+        self, signal_type: int, dest_mod_id: int = 0, dest_host_id: int = 0
+    ):
+        """Send a signal (a message type without data)
+
+        Args:
+            signal_type: Numeric message type ID of signal
+            dest_mod_id (optional): Specific module ID to send to. Defaults to 0 (broadcast).
+            dest_host_id (optional): Specific host ID to send to. Defaults to 0 (broadcast).
+        """
+        self._check_connected()
+        self._check_destination(dest_mod_id, dest_host_id)
+
+        header = self._make_header(signal_type, dest_mod_id, dest_host_id)
+        self._msg_count += 1
+
+        await self._write([bytes(header)])
+
+    async def subscribe(self, msg_list: Iterable[int]):
+        """Subscribe to message types
+
+        Args:
+            msg_list (Iterable[int]): A list of numeric message IDs to subscribe to
+        """
+        await self._subscription_control(msg_list, True)
+
+    async def unsubscribe(self, msg_list: Iterable[int]):
+        """Unsubscribe from message types
+
+        Args:
+            msg_list (Iterable[int]): A list of numeric message IDs to unsubscribe from
+        """
+        await self._subscription_control(msg_list, False)
+
+    async def subscribe_to_all(self):
+        """Subscribe to all message types"""
+        await self.subscribe([ALL_MESSAGE_TYPES])
+
+    async def unsubscribe_from_all(self):
+        """Unsubscribe from all message types"""
+        await self.unsubscribe([ALL_MESSAGE_TYPES])
+
+    async def _subscription_control(self, msg_list: Iterable[int], add: bool):
+        self._check_connected()
+
+        msg_set = set(msg_list)
+        all_msg = ALL_MESSAGE_TYPES in msg_set
+        if all_msg:
+            msg_set = {ALL_MESSAGE_TYPES}
+        elif self._sub_all:
+            raise InvalidSubscription(
+                "Cannot modify subscriptions to individual MTs while subscribed to ALL_MESSAGE_TYPES"
+            )
+
+        if add:
+            self._subscribed_types = (
+                msg_set if all_msg else self._subscribed_types | msg_set
+            )
+        else:
+            self._subscribed_types = (
+                set() if all_msg else self._subscribed_types - msg_set
+            )
+        self._sub_all = add and all_msg
+
+        msg_types = list(msg_set)
+        if len(msg_types) > 1 and self._manager_capabilities & cd.MM_CAP_SUBSCRIBE_MANY:
+            many = cd.MDF_SUBSCRIBE_MANY() if add else cd.MDF_UNSUBSCRIBE_MANY()
+            for i in range(0, len(msg_types), cd.MAX_SUBS):
+                chunk = msg_types[i : i + cd.MAX_SUBS]
+                many.num_types = len(chunk)
+                many.msg_types[: len(chunk)] = chunk
+                await self.send_message(many)
+        else:
+            msg = cd.MDF_SUBSCRIBE() if add else cd.MDF_UNSUBSCRIBE()
+            for msg_type in msg_types:
+                msg.msg_type = msg_type
+                await self.send_message(msg)
+
+    async def read_message(
+        self, timeout: Union[int, float, None] = -1, ack=False, sync_check=False
+    ) -> Optional[Message]:
+        """Read a message
+
+        Args:
+            timeout (optional): Timeout to wait for a message to be available for reading.
+                Defaults to -1 (wait forever). None also waits forever.
+            ack (optional): Primarily for internal use. When True, will not discard ACK messages. Defaults to False.
+            sync_check (optional): Validate message definition matches header version. Defaults to False.
+
+        Raises:
+            ConnectionLost: Connection error to message manager server
+
+        Returns:
+            Message object. If no message is read before timeout, returns None.
+        """
+        self._check_connected()
+
+        if timeout is None or timeout < 0:
+            return await self._read_message(ack, sync_check)
+
+        msg = self._next_message(ack, sync_check)
+        if msg is not None or timeout == 0:
+            return msg
+
+        try:
+            return await asyncio.wait_for(self._read_message(ack, sync_check), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _read_message(self, ack=False, sync_check=False) -> Message:
+        assert self._protocol is not None
+        while True:
+            msg = self._next_message(ack, sync_check)
+            if msg is not None:
+                return msg
+
+            if self._protocol.closed:
+                self._connected = False
+                raise ConnectionLost
+
+            await self._protocol.wait_for_data()
+
+    def _next_message(self, ack=False, sync_check=False) -> Optional[Message]:
+        """Decode the next buffered message that passes the subscription filter"""
+        assert self._protocol is not None
+        while True:
+            offset = self._stream.next_frame()
+            if offset is None:
+                self._protocol.resume_reading()
+                return None
+
+            header = self._header_cls.from_buffer_copy(self._stream.buffer, offset)
+            header.recv_time = self._protocol.recv_time
+
+            msg_type = header.msg_type
+            if not (
+                self._sub_all
+                or msg_type in self._subscribed_types
+                or (ack and msg_type == cd.MT_ACKNOWLEDGE)
+            ):
+                continue
+
+            start = offset + header.size
+            payload = self._stream.view[start : start + header.num_data_bytes]
+            return decode_message(header, payload, sync_check)
+
+    async def _wait_for_acknowledgement(self, timeout: float = 3) -> Message:
+        """Wait for acknowledgement from message manager module
+
+        Raises:
+            AcknowledgementTimeout: Ack not received from message manager
+
+        Returns:
+            Ack message
+        """
+        deadline = time.perf_counter() + timeout
+        while (time_remaining := deadline - time.perf_counter()) > 0:
+            msg = await self.read_message(timeout=time_remaining, ack=True)
+            if msg is not None and msg.header.msg_type == cd.MT_ACKNOWLEDGE:
+                return msg
+
+        raise AcknowledgementTimeout(
+            "Failed to receive Acknowlegement from MessageManager"
+        )
+
+    def __str__(self) -> str:
+        return f"AsyncClient(module_id={self.module_id}, server={self.server}, connected={self.connected})"
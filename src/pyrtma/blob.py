@@ -0,0 +1,123 @@
+"""pyrtma.blob module
+
+Contains :py:class:`~Blob` and :py:class:`~BlobAssembler`, which carry payloads
+larger than a fixed-size message as a series of BLOB_FRAGMENT messages
+"""
+
+import struct
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from . import core_defs as cd
+
+from typing import Optional, Tuple
+
+__all__ = ["Blob", "BlobAssembler"]
+
+# Fixed fields of BLOB_FRAGMENT that precede the data field
+BLOB_FIELDS = struct.Struct("6iq")
+
+
+@dataclass
+class Blob:
+    """Payload reassembled from BLOB_FRAGMENT messages"""
+
+    blob_type: int
+    blob_id: int
+    src_host_id: int
+    src_mod_id: int
+    data: bytearray
+
+
+@dataclass
+class _Partial:
+    blob: Blob
+    next_seq: int
+    num_fragments: int
+
+
+class BlobAssembler:
+    """Reassembles blobs from the data of BLOB_FRAGMENT messages
+
+    The buffer for a blob is allocated once, at its full size, when its first
+    fragment arrives, and each fragment is copied straight into place.
+    Fragments must arrive in order. A blob that skips a fragment, such as
+    one the message manager dropped, is discarded and counted in :py:attr:`dropped`.
+
+    Args:
+        max_size (optional): Largest accepted blob in bytes. Defaults to 1 GiB.
+        max_partial (optional): Maximum number of blobs reassembled at once.
+            The oldest is discarded to make room. Defaults to 16.
+    """
+
+    def __init__(self, max_size: int = 1024**3, max_partial: int = 16):
+        self.max_size = max_size
+        self.max_partial = max_partial
+        self.dropped = 0
+        self._partial: "OrderedDict[Tuple[int, int, int], _Partial]" = OrderedDict()
+
+    def clear(self):
+        """Discard all partially received blobs"""
+        self._partial.clear()
+
+    def feed(
+        self, src_host_id: int, src_mod_id: int, payload: memoryview
+    ) -> Tuple[Optional[Blob], Optional[Tuple[int, int]]]:
+        """Add a received fragment
+
+        Args:
+            src_host_id (int): Host ID of the sender
+            src_mod_id (int): Module ID of the sender
+            payload (memoryview): BLOB_FRAGMENT message data
+
+        Returns:
+            The completed blob or None, and the (blob_id, seq) to acknowledge or None
+        """
+        blob_type, blob_id, seq, num_fragments, ack_every, num_bytes, total_size = (
+            BLOB_FIELDS.unpack_from(payload)
+        )
+        key = (src_host_id, src_mod_id, blob_id)
+
+        if seq == 0:
+            if total_size > self.max_size:
+                self.dropped += 1
+                return None, None
+            if len(self._partial) >= self.max_partial:
+                self._partial.popitem(last=False)
+                self.dropped += 1
+            blob = Blob(
+                blob_type, blob_id, src_host_id, src_mod_id, bytearray(total_size)
+            )
+            partial = self._partial[key] = _Partial(blob, 0, num_fragments)
+        else:
+            partial = self._partial.get(key)  # type: ignore
+            if partial is None:
+                # Start of the blob was lost or discarded
+                return None, None
+            if seq != partial.next_seq:
+                del self._partial[key]
+                self.dropped += 1
+                return None, None
+
+        start = seq * cd.BLOB_FRAGMENT_SIZE
+        end = start + num_bytes
+        if num_bytes > cd.BLOB_FRAGMENT_SIZE or end > len(partial.blob.data):
+            del self._partial[key]
+            self.dropped += 1
+            return None, None
+
+        data_offset = BLOB_FIELDS.size
+        partial.blob.data[start:end] = payload[data_offset : data_offset + num_bytes]
+        partial.next_seq = seq + 1
+
+        last = partial.next_seq == partial.num_fragments
+        ack = None
+        if ack_every and (last or partial.next_seq % ack_every == 0):
+            ack = (blob_id, seq)
+
+        if last:
+            del self._partial[key]
+            return partial.blob, ack
+
+        return None, ack
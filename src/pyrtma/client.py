@@ -3,13 +3,19 @@
 Includes :py:class:`~Client` class and associated exception classes
 """
 
+import bisect
 import socket
 import select
 import time
 import os
 import ctypes
 import logging
+import struct
+import threading
+import traceback
 
+from collections import deque
+from concurrent.futures import Future, wait as wait_futures
 from contextlib import contextmanager
 
 from .context import get_context
@@ -19,6 +25,28 @@ from .header import MessageHeader, get_header_cls
 from .core_defs import ALL_MESSAGE_TYPES
 from .validators import disable_message_validation
 from .client_logging import RTMALogger, ClientLike
+from .socket_profile import SocketProfile, get_socket_profile
+from .stream import MessageStream, check_message, decode_message
+from .pool import MessagePool
+from .prepared import PreparedMessage
+from .stats import ClientStats
+from .request import RequestTracker
+from .blob import Blob, BlobAssembler, BLOB_FIELDS
+from .compact import (
+    trimmed_size,
+    is_compact,
+    compact_header,
+    expand_header,
+    expand_payload,
+)
+from .compression import (
+    Codec,
+    get_codec,
+    is_compressed,
+    compress_payload,
+    decompress_payload,
+)
+from .envelope import envelope_offsets
 from .exceptions import (
     InvalidMessageDefinition,
     UnknownMessageType,
@@ -28,6 +56,8 @@ from .exceptions import (
     NotConnectedError,
     ConnectionLost,
     AcknowledgementTimeout,
+    TimeSyncTimeout,
+    RequestTimeout,
     InvalidDestinationModule,
     InvalidDestinationHost,
     InvalidSubscription,
@@ -43,21 +73,35 @@ from typing import (
     List,
     Union,
     Iterable,
+    Iterator,
+    Deque,
     Set,
     Callable,
     Any,
     TypeVar,
     cast,
-    Union,
 )
 from warnings import warn
 
+# Maximum number of buffers accepted by a single sendmsg call
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+# Per-call non-blocking send flag (not available on Windows)
+_MSG_DONTWAIT: int = getattr(socket, "MSG_DONTWAIT", 0)
+
 __all__ = [
     "ClientError",
     "MessageManagerNotFound",
     "NotConnectedError",
     "ConnectionLost",
     "AcknowledgementTimeout",
+    "TimeSyncTimeout",
+    "RequestTimeout",
     "InvalidDestinationModule",
     "InvalidDestinationHost",
     "Client",
@@ -89,14 +133,27 @@ class Client(ClientLike):
         host_id (optional): Host ID. Defaults to 0.
         timecode (optional): Add additional timecode fields to message
             header, used by some projects at RNEL. Defaults to False.
+        name (optional): Name of module
+        lazy_decode (optional): Return :py:class:`~pyrtma.message.LazyMessage` objects
+            whose data is decoded on first access. Defaults to False.
+        pool_size (optional): Number of reusable message objects kept per message type
+            for :py:meth:`read_message`. Defaults to 0 (a new object for every message).
+        hop_times (optional): Add message manager hop timestamp fields to message header.
+            The message manager must run with hop timestamps. Defaults to False.
     """
 
+    # Number of recent time sync replies the clock offset is chosen from
+    TIME_SYNC_WINDOW = 8
+
     def __init__(
         self,
         module_id: int = 0,
         host_id: int = 0,
         timecode: bool = False,
         name: str = "",
+        lazy_decode: bool = False,
+        pool_size: int = 0,
+        hop_times: bool = False,
     ):
         if module_id >= cd.DYN_MOD_ID_START or module_id < 0:
             raise ValueError(f"Module ID must be >= 0 and < {cd.DYN_MOD_ID_START}")
@@ -106,12 +163,86 @@ class Client(ClientLike):
         self._msg_count = 0
         self._server = ("", -1)
         self._connected = False
-        self._header_cls = get_header_cls(timecode)
-        self._recv_buffer = bytearray(1024**2)
+        self._header_cls = get_header_cls(timecode, hop_times)
+        self._stream = MessageStream(self._header_cls)
+        self._recv_time = 0.0
+        self.lazy_decode = lazy_decode
+        self._pool = MessagePool(self._header_cls, pool_size) if pool_size else None
         self._sub_all = False
         self._subscribed_types: Set[int] = set()
         self._paused_types: Set[int] = set()
+        self._group_subs: Dict[int, cd.MDF_SUBSCRIBE_GROUP] = {}
+        self._subscribed_ranges: Set[Tuple[int, int]] = set()
+        # Subscribed ranges merged into sorted, non-overlapping intervals
+        self._range_starts: List[int] = []
+        self._range_ends: List[int] = []
+        self._manager_capabilities = 0
+        self._quickack = False
         self._dynamic_id: bool = module_id == 0
+
+        # Background receive mode
+        self._handlers: Dict[int, List[Callable[[Message], Any]]] = {}
+        self._receiving = False
+        self._receiver: Optional[threading.Thread] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._inbox: Deque[Union[Message, Exception]] = deque()
+        self._inbox_ready = threading.Event()
+        self._dispatch_queue: Deque[Message] = deque()
+        self._dispatch_ready = threading.Event()
+
+        # Thread-safe send mode
+        self._thread_safe_send = False
+        self._send_lock = threading.Lock()
+        self._send_queue: Deque[Tuple[bytearray, int, bool]] = deque()
+        self._staging = threading.local()
+        self._int32 = struct.Struct("i")
+        self._double = struct.Struct("d")
+        self._count_offset = self._header_cls._msg_count.offset  # type: ignore
+        self._send_time_offset = self._header_cls._send_time.offset  # type: ignore
+        self._hop_times = struct.Struct("2d")
+        self._hop_offset: Optional[int] = None
+        if hop_times:
+            self._hop_offset = self._header_cls._mm_recv_time.offset  # type: ignore
+
+        # Clock offset to the message manager
+        self._clock_offset = 0.0
+        self._time_samples: Deque[Tuple[float, float]] = deque(
+            maxlen=self.TIME_SYNC_WINDOW
+        )
+        self._time_sync_replies = 0
+        self._time_sync_event = threading.Event()
+        self._time_sync_struct = struct.Struct("3d")
+
+        # Compact wire encoding
+        self._compact_requested = False
+        self._compact = False
+
+        # Per message type compression
+        self._codecs: Dict[int, Optional[Codec]] = {}
+        self._compressed_receive_requested = False
+        self._compressed_receive = False
+
+        # Envelopes of packed messages
+        self._envelope_receive_requested = False
+        self._envelope_receive = False
+
+        # Requests waiting for replies
+        self._requests = RequestTracker()
+
+        # Blob reassembly
+        self._blobs = BlobAssembler()
+        self._blob_handlers: Dict[int, List[Callable[[Blob], Any]]] = {}
+
+        # Latency and loss statistics
+        self._stats = ClientStats()
+        self._stats_enabled = False
+
+        # Non-blocking send mode
+        self._nonblocking_send = False
+        self._outbox = bytearray()
+        self._high_water = 0
+        self._above_high_water = False
+        self._on_high_water: Optional[Callable[[Client, int], Any]] = None
         self._sock = socket.socket()
 
         # Auto-assign a name if module-id is defined
@@ -150,20 +281,42 @@ class Client(ClientLike):
                 """Silently ignore any errors at this point."""
                 pass
 
-    def _socket_connect(self, server_name: str):
+    def _socket_connect(
+        self, server_name: str, socket_profile: Union[str, SocketProfile] = "default"
+    ):
         # Close the previously used socket
         self._connected = False
         self._sock.close()
+        self._stream.clear()
+        self._stats.reconnected()
+        self._clock_offset = 0.0
+        self._time_samples.clear()
+        self._blobs.clear()
+        self._compact = False
+        self._compressed_receive = False
+        self._envelope_receive = False
+        self._outbox.clear()
+        self._above_high_water = False
 
         # Get the server ip info
         addr, port = server_name.split(":")
         self._server = (addr, int(port))
 
+        profile = get_socket_profile(socket_profile)
+
         # Create the tcp socket
         self._sock = socket.socket(
             family=socket.AF_INET, type=socket.SOCK_STREAM, proto=socket.IPPROTO_TCP
         )
 
+        # Buffer sizes must be set before connecting to take full effect
+        try:
+            profile.apply(self._sock)
+        except SocketOptionError:
+            self._sock.close()
+            raise
+        self._quickack = profile.quickack
+
         # Connect to the message server
         try:
             self._sock.connect(self._server)
@@ -174,9 +327,7 @@ class Client(ClientLike):
                 f"No message manager server responding at {self.ip_addr}:{self.port}"
             ) from e
 
-        # Disable Nagle Algorithm
         try:
-            self._sock.setsockopt(socket.getprotobyname("tcp"), socket.TCP_NODELAY, 1)
             self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         except Exception as e:
             self._connected = False
@@ -215,11 +366,25 @@ class Client(ClientLike):
         if self._module_id == 0:
             self._module_id = ack_msg.header.dest_mod_id
 
+        # Optional manager features are advertised in the CONNECT ACK.
+        # Legacy managers leave this field zeroed.
+        self._manager_capabilities = ack_msg.header.remaining_bytes
+
         # reset subscribed and paused types
         self._subscribed_types = set()
         self._paused_types = set()
+        self._group_subs = {}
+        self._subscribed_ranges = set()
+        self._index_ranges()
         self._sub_all = False
 
+        if (
+            self._compact_requested
+            or self._compressed_receive_requested
+            or self._envelope_receive_requested
+        ):
+            self._declare_capabilities()
+
         self.logger.log_name = self._name or f"Module {self._module_id}"
 
         return ack_msg
@@ -242,6 +407,7 @@ class Client(ClientLike):
         logger_status: bool = False,
         daemon_status: bool = False,
         allow_multiple: bool = False,
+        socket_profile: Union[str, SocketProfile, None] = None,
     ):
         """Connect to message manager server
 
@@ -252,6 +418,9 @@ class Client(ClientLike):
                 Logger modules are automatically subscribed to all message types.
                 Defaults to False.
             allow_multiple (optional): Flag to declare client can have multiple instances. Defaults to False.
+            socket_profile (optional): Socket tuning profile name (see :py:data:`~pyrtma.socket_profile.SOCKET_PROFILES`)
+                or a SocketProfile object. Defaults to None, which selects "logger" for logger modules and "default" otherwise.
+                Latency-critical control modules should pass "low_latency".
 
         Raises:
             MessageManagerNotFound: Unable to connect to message manager
@@ -260,8 +429,11 @@ class Client(ClientLike):
         if self.connected:
             self.disconnect()
 
+        if socket_profile is None:
+            socket_profile = "logger" if logger_status else "default"
+
         # Setup the underlying socket connection
-        self._socket_connect(server_name)
+        self._socket_connect(server_name, socket_profile)
 
         ack = self._connect_helper(logger_status, daemon_status, allow_multiple)
 
@@ -270,9 +442,11 @@ class Client(ClientLike):
 
     def disconnect(self):
         """Disconnect from message manager server"""
+        self.stop_receiving()
         try:
             if self._connected:
                 self.send_signal(cd.MT_DISCONNECT)
+                self.flush(timeout=1.0)
                 # Allow some time for signal to reach MM
                 time.sleep(0.100)
         except:
@@ -284,7 +458,13 @@ class Client(ClientLike):
             # reset subscribed and paused types
             self._subscribed_types = set()
             self._paused_types = set()
+            self._group_subs = {}
+            self._subscribed_ranges = set()
+            self._index_ranges()
             self._sub_all = False
+            self._requests.fail_all(
+                ConnectionLost("Disconnected before a reply was received")
+            )
 
     @property
     def server(self) -> Tuple[str, int]:
@@ -321,6 +501,11 @@ class Client(ClientLike):
         """Underlying socket connection with MessageManager"""
         return self._sock
 
+    @property
+    def has_buffered_messages(self) -> bool:
+        """True if a complete message has already been received and can be read without waiting on the socket"""
+        return bool(self._inbox) or self._stream.has_frame()
+
     @property
     def header_cls(self) -> Type[MessageHeader]:
         """Class defining the RTMA message header"""
@@ -336,6 +521,36 @@ class Client(ClientLike):
         """Subscriptions on pause"""
         return set(self._paused_types)
 
+    @property
+    def manager_capabilities(self) -> int:
+        """Bitmask of MM_CAP_* features supported by the connected message manager"""
+        return self._manager_capabilities
+
+    @property
+    def subscribed_ranges(self) -> Set[Tuple[int, int]]:
+        """Subscribed message type ranges as inclusive (first, last) tuples"""
+        return set(self._subscribed_ranges)
+
+    def _is_subscribed(self, msg_type: int) -> bool:
+        if msg_type in self._subscribed_types:
+            return True
+
+        i = bisect.bisect_right(self._range_starts, msg_type) - 1
+        return i >= 0 and msg_type <= self._range_ends[i]
+
+    def _index_ranges(self):
+        """Merge the subscribed ranges for binary search by :py:meth:`_is_subscribed`"""
+        starts: List[int] = []
+        ends: List[int] = []
+        for first, last in sorted(self._subscribed_ranges):
+            if ends and first <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], last)
+            else:
+                starts.append(first)
+                ends.append(last)
+        self._range_starts = starts
+        self._range_ends = ends
+
     @requires_connection
     def send_module_ready(self):
         """Send a signal to message manager that client is ready
@@ -365,6 +580,7 @@ class Client(ClientLike):
         if ctrl_msg == "Subscribe":
             msg = cd.MDF_SUBSCRIBE()
             if all_msg:
+                self._leave_groups()
                 self._subscribed_types = msg_set
                 self._paused_types.clear()
                 self._sub_all = True
@@ -401,21 +617,143 @@ class Client(ClientLike):
         else:
             raise TypeError("Unknown control message type.")
 
+        msg_types = []
+        for msg_type in msg_set:
+            group_sub = self._group_subs.get(msg_type)
+            if group_sub is not None:
+                self._group_control(group_sub, ctrl_msg)
+                if ctrl_msg != "Subscribe":
+                    continue
+            msg_types.append(msg_type)
+
+        if len(msg_types) > 1 and self._manager_capabilities & cd.MM_CAP_SUBSCRIBE_MANY:
+            # Pausing is equivalent to unsubscribing on the manager side
+            add = ctrl_msg in ("Subscribe", "ResumeSubscription")
+            self._send_subscribe_many(msg_types, add)
+        else:
+            for msg_type in msg_types:
+                msg.msg_type = msg_type
+                self.send_message(msg)
+
+    def _send_subscribe_many(self, msg_types: List[int], add: bool):
+        many: Union[cd.MDF_SUBSCRIBE_MANY, cd.MDF_UNSUBSCRIBE_MANY]
+        if add:
+            many = cd.MDF_SUBSCRIBE_MANY()
+        else:
+            many = cd.MDF_UNSUBSCRIBE_MANY()
+
+        for i in range(0, len(msg_types), cd.MAX_SUBS):
+            chunk = msg_types[i : i + cd.MAX_SUBS]
+            many.num_types = len(chunk)
+            many.msg_types[: len(chunk)] = chunk
+            self.send_message(many)
+
+    def _group_control(self, group_sub: cd.MDF_SUBSCRIBE_GROUP, ctrl_msg: str):
+        if ctrl_msg == "ResumeSubscription":
+            self.send_message(group_sub)
+            return
+
+        unsub = cd.MDF_UNSUBSCRIBE_GROUP()
+        unsub.msg_type = group_sub.msg_type
+        unsub.group = group_sub.group
+        self.send_message(unsub)
+
+        # Paused group subscriptions are kept so they can be resumed
+        if ctrl_msg != "PauseSubscription":
+            del self._group_subs[group_sub.msg_type]
+
+    def _leave_groups(self):
+        for group_sub in list(self._group_subs.values()):
+            self._group_control(group_sub, "Unsubscribe")
+
+    def _subscribe_group(
+        self, msg_list: Iterable[int], group: str, group_key: Optional[str]
+    ):
+        msg_set = set(msg_list)
+
+        if not self._manager_capabilities & cd.MM_CAP_GROUPS:
+            raise InvalidSubscription(
+                "The message manager does not support consumer groups"
+            )
+
+        if ALL_MESSAGE_TYPES in msg_set:
+            raise InvalidSubscription(
+                "Consumer groups do not support ALL_MESSAGE_TYPES"
+            )
+
+        if self._sub_all:
+            raise InvalidSubscription(
+                "Cannot modify subscriptions to individual MTs while subscribed to ALL_MESSAGE_TYPES"
+            )
+
+        if len(group) >= cd.MAX_NAME_LEN:
+            raise InvalidSubscription(
+                f"Group name must be less than {cd.MAX_NAME_LEN} characters"
+            )
+
         for msg_type in msg_set:
+            msg = cd.MDF_SUBSCRIBE_GROUP()
             msg.msg_type = msg_type
+            msg.group = group
+            if group_key is None:
+                msg.policy = cd.GROUP_ROUND_ROBIN
+            elif group_key == "source":
+                msg.policy = cd.GROUP_HASH_SOURCE
+            else:
+                key_field = getattr(get_msg_cls(msg_type), f"_{group_key}", None)
+                if key_field is None:
+                    raise InvalidSubscription(
+                        f"{group_key} is not a field of message type {msg_type}"
+                    )
+                msg.policy = cd.GROUP_HASH_FIELD
+                msg.key_offset = key_field.offset
+                msg.key_size = key_field.size
+
+            # Replace any existing group or plain subscription to this type
+            if msg_type in self._group_subs:
+                self._group_control(self._group_subs[msg_type], "Unsubscribe")
+            elif msg_type in self._subscribed_types:
+                unsub = cd.MDF_UNSUBSCRIBE()
+                unsub.msg_type = msg_type
+                self.send_message(unsub)
+
+            self._group_subs[msg_type] = msg
             self.send_message(msg)
 
+        self._subscribed_types |= msg_set
+        self._paused_types -= msg_set
+
     @requires_connection
-    def subscribe(self, msg_list: Iterable[int]):
+    def subscribe(
+        self,
+        msg_list: Iterable[int],
+        group: str = "",
+        group_key: Optional[str] = None,
+    ):
         """Subscribe to message types
 
         Calling this method multiple times will add to, and not replace,
         the list of subscribed messages.
 
+        When a group name is given, the client joins a consumer group for each
+        message type. The message manager delivers each message of that type
+        to exactly one member of the group instead of to every subscriber.
+
         Args:
             msg_list (Iterable[int]): A list of numeric message IDs to subscribe to
+            group (optional): Name of a consumer group to join. Defaults to "" (no group).
+            group_key (optional): How the manager selects a group member.
+                None for round-robin, "source" to hash on the source module ID,
+                or a message field name to hash on that field's value. Defaults to None.
+
+        Raises:
+            InvalidSubscription: Invalid group subscription, or the message
+                manager does not support consumer groups
         """
-        self._subscription_control(msg_list, "Subscribe")
+        if group:
+            self._subscribe_group(msg_list, group, group_key)
+        else:
+            self._subscription_control(msg_list, "Subscribe")
 
     @requires_connection
     def unsubscribe(self, msg_list: Iterable[int]):
@@ -444,10 +782,64 @@ class Client(ClientLike):
         """
         self._subscription_control(msg_list, "ResumeSubscription")
 
+    @requires_connection
+    def subscribe_range(self, first: int, last: int):
+        """Subscribe to a contiguous range of message types
+
+        A single control message covers the whole range, and the message manager
+        resolves range subscriptions with an interval index.
+
+        Args:
+            first (int): First message type ID of the range
+            last (int): Last message type ID of the range (inclusive)
+
+        Raises:
+            InvalidSubscription: Invalid range, or the message manager does
+                not support range subscriptions
+        """
+        if not self._manager_capabilities & cd.MM_CAP_RANGES:
+            raise InvalidSubscription(
+                "The message manager does not support range subscriptions"
+            )
+
+        if first > last or first < 0:
+            raise InvalidSubscription(f"Invalid message type range [{first}, {last}]")
+
+        if self._sub_all:
+            raise InvalidSubscription(
+                "Cannot modify subscriptions to individual MTs while subscribed to ALL_MESSAGE_TYPES"
+            )
+
+        msg = cd.MDF_SUBSCRIBE_RANGE()
+        msg.first_type = first
+        msg.last_type = last
+        self.send_message(msg)
+        self._subscribed_ranges.add((first, last))
+        self._index_ranges()
+
+    @requires_connection
+    def unsubscribe_range(self, first: int, last: int):
+        """Unsubscribe from a range of message types
+
+        The range must match a range previously passed to :py:func:`subscribe_range`.
+
+        Args:
+            first (int): First message type ID of the range
+            last (int): Last message type ID of the range (inclusive)
+        """
+        msg = cd.MDF_UNSUBSCRIBE_RANGE()
+        msg.first_type = first
+        msg.last_type = last
+        self.send_message(msg)
+        self._subscribed_ranges.discard((first, last))
+        self._index_ranges()
+
     @requires_connection
     def unsubscribe_from_all(self):
         """Unsubscribe from all subscribed types"""
         self.unsubscribe(self.subscribed_types)
+        for first, last in self.subscribed_ranges:
+            self.unsubscribe_range(first, last)
 
     @requires_connection
     def pause_all_subscriptions(self):
@@ -527,37 +919,11 @@ class Client(ClientLike):
             InvalidDestinationModule: Specified destination module is invalid
             InvalidDestinationHost: Specified destination host is invalid
         """
-        # Verify that the module & host ids are valid
-        if dest_mod_id < 0 or dest_mod_id > cd.MAX_MODULES:
-            raise InvalidDestinationModule(f"Invalid dest_mod_id  of [{dest_mod_id}]")
-
-        if dest_host_id < 0 or dest_host_id > cd.MAX_HOSTS:
-            raise InvalidDestinationHost(f"Invalid dest_host_id of [{dest_host_id}]")
-
-        if timeout >= 0:
-            readfds, writefds, exceptfds = select.select([], [self._sock], [], timeout)
-        else:
-            readfds, writefds, exceptfds = select.select(
-                [], [self._sock], []
-            )  # blocking
+        self._check_destination(dest_mod_id, dest_host_id)
 
-        if writefds:
-            header = self._header_cls()
-            header.msg_type = signal_type
-            header.msg_count = self._msg_count
-            header.send_time = time.perf_counter()
-            header.recv_time = 0.0
-            header.src_host_id = self._host_id
-            header.src_mod_id = self._module_id
-            header.dest_host_id = dest_host_id
-            header.dest_mod_id = dest_mod_id
-            header.num_data_bytes = 0
-            header.remaining_bytes = 0
-            header.reserved = 0
-
-            self._sendall(header)  # type: ignore
-
-            self._msg_count += 1
+        if self._nonblocking_send or self._wait_writable(timeout):
+            header = self._make_header(signal_type, dest_mod_id, dest_host_id)
+            self._transmit([header])
 
         else:
             # Socket was not ready to receive data. Drop the packet.
@@ -587,79 +953,175 @@ class Client(ClientLike):
             InvalidDestinationModule: Specified destination module is invalid
             InvalidDestinationHost: Specified destination host is invalid
         """
-        # Verify that the module & host ids are valid
-        if dest_mod_id < 0 or dest_mod_id > cd.MAX_MODULES:
-            raise InvalidDestinationModule(f"Invalid dest_mod_id of [{dest_mod_id}]")
+        self._check_destination(dest_mod_id, dest_host_id)
 
-        if dest_host_id < 0 or dest_host_id > cd.MAX_HOSTS:
-            raise InvalidDestinationHost(f"Invalid dest_host_id of [{dest_host_id}]")
+        if self._nonblocking_send or self._wait_writable(timeout):
+            header = self._make_data_header(msg_data, dest_mod_id, dest_host_id)
+            payload = self._data_buffer(header, msg_data)
+            if header.num_data_bytes > 0:
+                self._transmit([header, payload])
+            else:
+                self._transmit([header])
 
-        if timeout >= 0:
-            readfds, writefds, exceptfds = select.select([], [self._sock], [], timeout)
         else:
-            readfds, writefds, exceptfds = select.select(
-                [], [self._sock], []
-            )  # blocking
+            # Socket was not ready to receive data. Drop the packet.
+            print("x", end="")
 
-        if writefds:
-            with disable_message_validation():
-                header = self._header_cls()
-                header.msg_type = msg_data.type_id
-                header.msg_count = self._msg_count
-                header.send_time = time.perf_counter()
-                header.recv_time = 0.0
-                header.src_host_id = self._host_id
-                header.src_mod_id = self._module_id
-                header.dest_host_id = dest_host_id
-                header.dest_mod_id = dest_mod_id
-                header.num_data_bytes = ctypes.sizeof(msg_data)
-                header.remaining_bytes = 0
-                header.reserved = 0
+    def prepare(
+        self,
+        msg_data: Union[MessageData, Type[MessageData]],
+        dest_mod_id: int = 0,
+        dest_host_id: int = 0,
+    ) -> PreparedMessage:
+        """Build a reusable send buffer for repeated sends of one message type
 
-                try:
-                    header.version = msg_data.type_hash
-                except AttributeError as e:
-                    if not hasattr(msg_data, "type_hash"):
-                        warn(
-                            "Message class is missing type_hash. V1 message defs are deprecated.",
-                            FutureWarning,
-                        )
-                    else:
-                        raise e
+        Set fields through the returned object's data view or its
+        :py:meth:`~pyrtma.prepared.PreparedMessage.setter` functions, then
+        call its :py:meth:`~pyrtma.prepared.PreparedMessage.send` method.
 
-            self._sendall(header)  # type: ignore
-            if header.num_data_bytes > 0:
-                self._sendall(msg_data)  # type: ignore
+        Args:
+            msg_data: Message data class, or message object whose contents are copied
+            dest_mod_id (optional): Specific module ID to send to. Defaults to 0 (broadcast).
+            dest_host_id (optional): Specific host ID to send to. Defaults to 0 (broadcast).
 
-            self._msg_count += 1
+        Raises:
+            InvalidDestinationModule: Specified destination module is invalid
+            InvalidDestinationHost: Specified destination host is invalid
+
+        Returns:
+            PreparedMessage: Prepared message bound to this client
+        """
+        return PreparedMessage(self, msg_data, dest_mod_id, dest_host_id)
+
+    @requires_connection
+    def send_messages(
+        self,
+        msg_list: Iterable[MessageData],
+        dest_mod_id: int = 0,
+        dest_host_id: int = 0,
+        timeout: float = -1,
+    ):
+        """Send a batch of messages with a single socket write
+
+        Args:
+            msg_list: Objects containing the messages to send
+            dest_mod_id (optional): Specific module ID to send to. Defaults to 0 (broadcast).
+            dest_host_id (optional): Specific host ID to send to. Defaults to 0 (broadcast).
+            timeout (optional): Timeout in seconds to wait for socket to be available for sending.
+                Defaults to -1 (blocking).
+
+        Raises:
+            InvalidDestinationModule: Specified destination module is invalid
+            InvalidDestinationHost: Specified destination host is invalid
+        """
+        self._check_destination(dest_mod_id, dest_host_id)
+
+        msg_list = list(msg_list)
+        if not msg_list:
+            return
+
+        if self._nonblocking_send or self._wait_writable(timeout):
+            buffers: List[Any] = []
+            msg_count = self._msg_count
+            for msg_data in msg_list:
+                header = self._make_data_header(msg_data, dest_mod_id, dest_host_id)
+                header.msg_count = msg_count
+                msg_count += 1
+                payload = self._data_buffer(header, msg_data)
+                buffers.append(header)
+                if header.num_data_bytes > 0:
+                    buffers.append(payload)
+
+            self._transmit(buffers, len(msg_list))
 
         else:
-            # Socket was not ready to receive data. Drop the packet.
+            # Socket was not ready to receive data. Drop the packets.
             print("x", end="")
 
-    @requires_connection
-    def forward_message(
+    def send_envelope(
         self,
-        msg_hdr: MessageHeader,
-        msg_data: Optional[MessageData] = None,
+        msg_list: Iterable[MessageData],
+        dest_mod_id: int = 0,
+        dest_host_id: int = 0,
         timeout: float = -1,
     ):
-        """Forward a message
+        """Send a batch of messages of one type packed into ENVELOPE frames
 
-        A message is a packet that contains a defined data payload.
-        To send a message without associated data, see :py:func:`send_signal`.
+        The message manager handles each envelope of up to MAX_MESSAGE_SIZE
+        bytes as a single frame, which removes most of the per-message cost
+        of small messages. Subscribers receive the messages one by one as
+        usual. If the message manager does not support envelopes, the
+        messages are sent with :py:meth:`send_messages`.
 
         Args:
-            msg_hdr: Object containing RTMA header to send
-            msg_data: Object containing the message to send
+            msg_list: Objects containing the messages to send, all of the same message type
+            dest_mod_id (optional): Specific module ID to send to. Defaults to 0 (broadcast).
+            dest_host_id (optional): Specific host ID to send to. Defaults to 0 (broadcast).
             timeout (optional): Timeout in seconds to wait for socket to be available for sending.
                 Defaults to -1 (blocking).
 
+        Raises:
+            ValueError: Messages are of several types or of a core message type
+            InvalidDestinationModule: Specified destination module is invalid
+            InvalidDestinationHost: Specified destination host is invalid
         """
-        # Assume that msg_type, num_data_bytes, data - have been filled in
-        if msg_data is not None:
-            msg_hdr.num_data_bytes = ctypes.sizeof(msg_data)
+        msg_list = list(msg_list)
+        if not msg_list:
+            return
+
+        msg_type = msg_list[0].type_id
+        if msg_type <= cd.MAX_RTMA_MSG_TYPE:
+            raise ValueError("Core message types cannot be enveloped")
+        if any(msg_data.type_id != msg_type for msg_data in msg_list):
+            raise ValueError("Enveloped messages must share one message type")
+
+        if not self._manager_capabilities & cd.MM_CAP_ENVELOPE:
+            self.send_messages(msg_list, dest_mod_id, dest_host_id, timeout)
+            return
+
+        self._check_destination(dest_mod_id, dest_host_id)
+
+        if self._nonblocking_send or self._wait_writable(timeout):
+            header_size = ctypes.sizeof(self._header_cls)
+            buffers: List[Any] = []
+            envelope = None
+            num_envelopes = 0
+            for msg_data in msg_list:
+                header = self._make_data_header(msg_data, dest_mod_id, dest_host_id)
+                frame_size = header_size + header.num_data_bytes
+
+                # Start a new envelope when this message does not fit
+                if (
+                    envelope is None
+                    or envelope.num_data_bytes + frame_size > cd.MAX_MESSAGE_SIZE
+                ):
+                    envelope = self._make_header(cd.MT_ENVELOPE)
+                    envelope.msg_count = self._msg_count + num_envelopes
+                    num_envelopes += 1
+                    buffers.append(envelope)
+
+                header.msg_count = envelope.msg_count
+                envelope.num_data_bytes += frame_size
+                buffers.append(header)
+                if header.num_data_bytes > 0:
+                    buffers.append(msg_data)
+
+            self._transmit(buffers, num_envelopes)
+
+        else:
+            # Socket was not ready to receive data. Drop the packets.
+            print("x", end="")
 
+    def _check_destination(self, dest_mod_id: int, dest_host_id: int):
+        """Verify that the module & host ids are valid"""
+        if dest_mod_id < 0 or dest_mod_id > cd.MAX_MODULES:
+            raise InvalidDestinationModule(f"Invalid dest_mod_id of [{dest_mod_id}]")
+
+        if dest_host_id < 0 or dest_host_id > cd.MAX_HOSTS:
+            raise InvalidDestinationHost(f"Invalid dest_host_id of [{dest_host_id}]")
+
+    def _wait_writable(self, timeout: float = -1) -> bool:
+        """Wait for the socket to be writable (helper called by the send methods)"""
         if timeout >= 0:
             readfds, writefds, exceptfds = select.select([], [self._sock], [], timeout)
         else:
@@ -667,188 +1129,1821 @@ class Client(ClientLike):
                 [], [self._sock], []
             )  # blocking
 
-        if writefds:
-            self._sendall(msg_hdr)  # type: ignore
-            if msg_data is not None:
-                self._sendall(msg_data)  # type: ignore
-
-            self._msg_count += 1
+        return len(writefds) > 0
 
-        else:
-            # Socket was not ready to write data. Drop the packet.
-            print("x", end="")
+    def _make_header(
+        self,
+        msg_type: int,
+        dest_mod_id: int = 0,
+        dest_host_id: int = 0,
+        num_data_bytes: int = 0,
+    ) -> MessageHeader:
+        """Create a header for an outgoing message stamped with the current msg_count and time"""
+        header = self._header_cls()
+        header.msg_type = msg_type
+        header.msg_count = self._msg_count
+        header.send_time = time.perf_counter() + self._clock_offset
+        header.recv_time = 0.0
+        header.src_host_id = self._host_id
+        header.src_mod_id = self._module_id
+        header.dest_host_id = dest_host_id
+        header.dest_mod_id = dest_mod_id
+        header.num_data_bytes = num_data_bytes
+        header.remaining_bytes = 0
+        header.reserved = 0
+        return header
+
+    def _data_buffer(self, header: MessageHeader, msg_data: MessageData) -> Any:
+        """Message data to write after header, compressed or without trailing zeros if enabled"""
+        if header.num_data_bytes and self._manager_capabilities & cd.MM_CAP_COMPRESSION:
+            codec = self._send_codec(msg_data)
+            if codec is not None:
+                compressed = compress_payload(header, msg_data, codec)
+                if compressed is not None:
+                    return compressed
+
+        if self._compact:
+            size = trimmed_size(msg_data)
+            if size < header.num_data_bytes:
+                compact_header(header, size)
+                return memoryview(msg_data).cast("B")[:size]
+        return msg_data
+
+    def _make_data_header(
+        self, msg_data: MessageData, dest_mod_id: int = 0, dest_host_id: int = 0
+    ) -> MessageHeader:
+        """Create a header for an outgoing message with a data payload"""
+        with disable_message_validation():
+            header = self._make_header(
+                msg_data.type_id, dest_mod_id, dest_host_id, ctypes.sizeof(msg_data)
+            )
 
-    def _sendall(self, buffer: bytearray):
+            try:
+                header.version = msg_data.type_hash
+            except AttributeError as e:
+                if not hasattr(msg_data, "type_hash"):
+                    warn(
+                        "Message class is missing type_hash. V1 message defs are deprecated.",
+                        FutureWarning,
+                    )
+                else:
+                    raise e
+
+        return header
+
+    def _send_buffers(self, buffers: List[Any]):
+        """Write a sequence of buffers to the socket with as few system calls as possible"""
+        if self._nonblocking_send:
+            self._send_or_queue(buffers)
+            return
+
+        if not hasattr(self._sock, "sendmsg"):
+            # No scatter/gather send on this platform (Windows)
+            self._sendall(b"".join(buffers))
+            return
+
+        views = [memoryview(buffer).cast("B") for buffer in buffers]
+        i = 0
         try:
-            self._sock.sendall(buffer)
+            while i < len(views):
+                nbytes = self._sock.sendmsg(views[i : i + _IOV_MAX])
+
+                # Skip past the buffers that were sent completely
+                while i < len(views) and nbytes >= len(views[i]):
+                    nbytes -= len(views[i])
+                    i += 1
+
+                if nbytes:
+                    views[i] = views[i][nbytes:]
         except ConnectionError as e:
             self._connected = False
             raise ConnectionLost from e
 
-    @requires_connection
-    def read_message(
-        self, timeout: Union[int, float, None] = -1, ack=False, sync_check=False
-    ) -> Optional[Message]:
-        """Read a message
+    def _transmit(self, buffers: List[Any], count: int = 1, restamp: bool = True):
+        """Write complete messages and advance msg_count (helper called by the send methods)
 
         Args:
-            timeout (optional): Timeout to wait for a message to be available for reading.
-                Defaults to -1 (blocking).
-            ack (optional): Primarily for internal use. When True, will not discard ACK messages. Defaults to False.
-            sync_check (optional): Validate message definition matches header version. Defaults to False.
+            buffers: Headers and message data of count messages
+            count (optional): Number of messages in buffers. Defaults to 1.
+            restamp (optional): Stamp msg_count into the headers in thread-safe mode. Defaults to True.
+        """
+        if not self._thread_safe_send:
+            self._send_buffers(buffers)
+            self._msg_count += count
+            return
+
+        # Stage the messages in this thread's buffer. It is free again once
+        # this call returns, because a queued buffer has always been written
+        # by the time the send lock can be acquired.
+        staging = getattr(self._staging, "buffer", None)
+        try:
+            staging.clear()  # type: ignore
+        except (AttributeError, BufferError):
+            # First send from this thread, or the buffer is still referenced
+            staging = self._staging.buffer = bytearray()
+        for buffer in buffers:
+            staging += memoryview(buffer).cast("B")
+        self._send_queue.append((staging, count, restamp))
+
+        with self._send_lock:
+            self._combine()
+
+    def _combine(self):
+        """Write every queued message with one gathered write (called with the send lock held)"""
+        while self._send_queue:
+            batch: List[bytearray] = []
+            while self._send_queue:
+                staging, count, restamp = self._send_queue.popleft()
+                if restamp:
+                    self._restamp(staging)
+                else:
+                    self._msg_count += count
+                batch.append(staging)
+            self._send_buffers(batch)
+
+    def _restamp(self, frames: bytearray):
+        """Stamp consecutive msg_count values into the headers of staged messages"""
+        header_size = ctypes.sizeof(self._header_cls)
+        count_offset = self._header_cls._msg_count.offset  # type: ignore
+        size_offset = self._header_cls._num_data_bytes.offset  # type: ignore
+        offset = 0
+        while offset < len(frames):
+            self._int32.pack_into(frames, offset + count_offset, self._msg_count)
+            self._msg_count += 1
+            (num_data_bytes,) = self._int32.unpack_from(frames, offset + size_offset)
+            offset += header_size + num_data_bytes
 
-        Raises:
-            ConnectionLost: Connection error to message manager server
+    def enable_stats(self):
+        """Start collecting latency histograms and message loss counts
 
-        Returns:
-            Message object. If no message is read before timeout, returns None.
+        Every message received from the manager is counted, including
+        unsubscribed messages that are skipped. See :py:meth:`stats`.
         """
-        t0 = time.perf_counter()
-        M = self._read_message(timeout, ack, sync_check)
+        self._stats_enabled = True
 
-        if self._sub_all:
-            return M
+    def disable_stats(self):
+        """Stop collecting statistics. Collected statistics are kept."""
+        self._stats_enabled = False
 
-        # filter out unsubscribed messages that may still be in queue
-        while M and (M.header.msg_type not in self.subscribed_types):
-            if (
-                ack and M.header.msg_type == cd.MT_ACKNOWLEDGE
-            ):  # ack input allows ACK to be read and not discarded
-                break
-            if timeout is None:  # blocking
-                t_rem = None  # continue blocking until subscribed message recv'd
-            elif timeout == 0:  # no timeout
-                M = None  # discard unsub'd msg and break
-                break
-            else:  # subtract time elapsed from timeout and read again
-                t_rem = max(timeout - (time.perf_counter() - t0), 0)
-            M = self._read_message(timeout, ack, sync_check)
+    def stats(self) -> ClientStats:
+        """Latency histograms and message loss counts collected since :py:meth:`enable_stats`
 
-        return M
+        Returns:
+            ClientStats: Live statistics object of this client
+        """
+        return self._stats
 
     @requires_connection
-    def _read_message(
-        self, timeout: Union[int, float, None] = -1, ack=False, sync_check=False
-    ) -> Optional[Message]:
-        """Read message without filtering for subscribed messages (helper called by read_message)"""
+    def publish_stats(self, reset: bool = False, timeout: float = -1):
+        """Send the collected statistics as CLIENT_LATENCY_STATS messages
 
-        if timeout is None:
-            # Skip select call
-            pass
-        elif timeout >= 0:
-            # Wait timeout amount
-            readfds, writefds, exceptfds = select.select([self._sock], [], [], timeout)
-            if len(readfds) == 0:
-                return None
-        else:
-            # Blocking
-            readfds, writefds, exceptfds = select.select([self._sock], [], [])
-            if len(readfds) == 0:
-                return None
+        Sends one message with the totals (msg_type ALL_MESSAGE_TYPES) and one
+        message per received message type, in a single write.
 
-        # Read RTMA Header Section
-        header = self._header_cls()
-        try:
-            nbytes = self._sock.recv_into(header, header.size, socket.MSG_WAITALL)
-            """
-            Note:
-            MSG_WAITALL Flag:
-            The receive request will complete only when one of the following events occurs:
-            The buffer supplied by the caller is completely full.
-            The connection has been closed.
-            The request has been canceled or an error occurred.
-            """
-
-            if nbytes != header.size:
-                self._connected = False
-                raise ConnectionLost
+        Args:
+            reset (optional): Discard the statistics after sending them. Defaults to False.
+            timeout (optional): Timeout in seconds to wait for socket to be available for sending.
+                Defaults to -1 (blocking).
+        """
+        self.send_messages(self._stats.to_messages(), timeout=timeout)
+        if reset:
+            self._stats.reset()
 
-            header.recv_time = time.perf_counter()
-        except ConnectionError:
-            raise ConnectionLost
+    @property
+    def clock_offset(self) -> float:
+        """Estimated offset in seconds of the message manager clock from the local clock
 
-        # Read Data Section
+        Zero until the first time sync reply is received. See :py:meth:`sync_clock`.
+        """
+        return self._clock_offset
 
-        try:
-            data = get_msg_cls(header.msg_type)()
-        except UnknownMessageType as e:
-            mt = header.msg_type
-            raw = self._sock.recv(header.num_data_bytes, socket.MSG_WAITALL)
-            raise UnknownMessageType(
-                f"No message definition found for MT={mt}", header, raw
-            )
+    def manager_time(self) -> float:
+        """Current time in the message manager timebase
 
-        type_size = data.type_size
-        if type_size == -1:  # not defined for v1 message defs
-            type_size = data.size
+        This is the timebase used for send_time and recv_time in message headers.
 
-        if type_size != header.num_data_bytes:
-            _ = self._sock.recv(header.num_data_bytes, socket.MSG_WAITALL)
-            raise InvalidMessageDefinition(
-                f"Received message header indicating a message data size ({header.num_data_bytes}) that does not match the expected size ({type_size}) of message type {data.type_name}. Message definitions may be out of sync across systems."
-            )
+        Returns:
+            float: time.perf_counter() adjusted by :py:attr:`clock_offset`
+        """
+        return time.perf_counter() + self._clock_offset
 
-        # Note: Ignore the sync check if header.version is not filled in
-        # This can removed once all clients support this field.
-        if sync_check and header.version != 0 and header.version != data.type_hash:
-            _ = self._sock.recv(header.num_data_bytes, socket.MSG_WAITALL)
-            raise InvalidMessageDefinition(
-                f"Received message header indicating a message version that does not match the expected version of message type {data.type_name}. Message definitions may be out of sync across systems."
-            )
+    @requires_connection
+    def request_time_sync(self, timeout: float = -1):
+        """Send a time sync request to the message manager without waiting for the reply
 
-        if header.num_data_bytes:
-            try:
-                nbytes = self._sock.recv_into(data, type_size, socket.MSG_WAITALL)
+        The reply is handled whenever it is read, updating :py:attr:`clock_offset`.
+        Call this periodically to track clock drift.
 
-                if nbytes != type_size:
-                    self._connected = False
-                    raise ConnectionLost
-            except ConnectionError:
-                raise ConnectionLost
+        Args:
+            timeout (optional): Timeout in seconds to wait for socket to be available for sending.
+                Defaults to -1 (blocking).
 
-        return Message(header, data)
+        Raises:
+            ClientError: The message manager does not support time sync
+        """
+        if not self._manager_capabilities & cd.MM_CAP_TIME_SYNC:
+            raise ClientError("Message manager does not support time sync.")
 
-    def _wait_for_acknowledgement(self, timeout: float = 3) -> Message:
-        """Wait for acknowledgement from message manager module
+        msg = cd.MDF_TIME_SYNC_REQUEST()
+        # Raw local clock reading, compared against the reply arrival time
+        msg.client_send_time = time.perf_counter()
+        self.send_message(msg, timeout=timeout)
 
-        Used internally when acknowledgement replies from message manager are expected
+    @requires_connection
+    def sync_clock(self, samples: int = 4, timeout: float = 1.0) -> float:
+        """Estimate the offset of the message manager clock from the local clock
+
+        Performs NTP-style request/reply exchanges with the message manager.
+        The offset from the exchange with the shortest round trip among the
+        last TIME_SYNC_WINDOW replies is kept, which rejects exchanges delayed
+        by queueing. Messages received while waiting are kept for reading.
+
+        Once synchronized, send_time and recv_time of all messages sent and
+        received by this client are in the message manager timebase, so
+        latencies are comparable across hosts.
 
         Args:
-            timeout (optional): Timeout in seconds to wait for ack message. Defaults to 3.
+            samples (optional): Number of exchanges to perform. Defaults to 4.
+            timeout (optional): Timeout in seconds for each reply. Defaults to 1.0.
 
         Raises:
-            AcknowledgementTimeout: Ack not received from message manager
+            ClientError: The message manager does not support time sync
+            TimeSyncTimeout: A reply was not received before timeout
 
         Returns:
-            Ack message
+            float: Estimated clock offset in seconds
         """
-        ret = 0
+        for _ in range(samples):
+            replies = self._time_sync_replies
+            self._time_sync_event.clear()
+            self.request_time_sync()
+            if not self._wait_time_sync(replies, timeout):
+                raise TimeSyncTimeout(
+                    "Failed to receive time sync reply from MessageManager"
+                )
 
-        # Wait Forever
-        if timeout == -1:
-            while True:
-                msg = self.read_message(ack=True)
-                if msg is not None:
-                    if msg.header.msg_type == cd.MT_ACKNOWLEDGE:
-                        break
-            return msg
-        else:
-            # Wait up to timeout seconds
-            time_remaining = timeout
-            start_time = time.perf_counter()
-            while time_remaining > 0:
-                msg = self.read_message(timeout=time_remaining, ack=True)
-                if msg is not None:
-                    if msg.header.msg_type == cd.MT_ACKNOWLEDGE:
-                        return msg
-
-                time_now = time.perf_counter()
-                time_waited = time_now - start_time
-                time_remaining = timeout - time_waited
-
-            raise AcknowledgementTimeout(
-                "Failed to receive Acknowlegement from MessageManager"
-            )
+        return self._clock_offset
+
+    def _wait_time_sync(self, replies: int, timeout: float) -> bool:
+        """Wait for the time sync reply count to change, keeping other messages"""
+        deadline = time.perf_counter() + timeout
+
+        if self._receiving:
+            while self._time_sync_replies == replies:
+                if not self._time_sync_event.wait(deadline - time.perf_counter()):
+                    return self._time_sync_replies != replies
+            return True
+
+        while self._time_sync_replies == replies:
+            if not self._stream.has_frame():
+                time_remaining = deadline - time.perf_counter()
+                if time_remaining <= 0 or not self._wait_readable(time_remaining):
+                    return False
+                self._recv_frame()
+
+            # Keep subscribed messages received with the reply
+            self._stash_frames()
+
+        return True
+
+    @requires_connection
+    def request(
+        self,
+        msg_data: MessageData,
+        reply_type: int,
+        dest_mod_id: int = 0,
+        timeout: Union[int, float, None] = 1.0,
+        correlation_field: Optional[str] = None,
+        dest_host_id: int = 0,
+    ) -> Future:
+        """Send a request and return a future for its reply
+
+        The reply is the first message of reply_type from dest_mod_id (or from
+        any module when dest_mod_id is 0) received after the request. When
+        correlation_field is given, the request's field of that name is set to
+        a new correlation ID, and the reply must carry the same value in its
+        field of that name. Replies are consumed wherever messages are read and
+        are not returned by the read methods. The client is subscribed to
+        reply_type if it is not already.
+
+        Futures are resolved while the client reads messages, by the receive
+        thread, a :py:class:`~pyrtma.reactor.ClientReactor`, or
+        :py:meth:`wait_for_replies`.
+
+        Args:
+            msg_data: Request message
+            reply_type (int): Message type ID of the reply
+            dest_mod_id (optional): Module ID to send the request to. Defaults to 0 (broadcast).
+            timeout (optional): Time in seconds to wait for the reply before the future fails
+                with RequestTimeout. None waits forever. Defaults to 1.0.
+            correlation_field (optional): Name of the data field used to match the reply.
+                Defaults to None (match by module only).
+            dest_host_id (optional): Specific host ID to send to. Defaults to 0 (broadcast).
+
+        Raises:
+            InvalidDestinationModule: Specified destination module is invalid
+            InvalidDestinationHost: Specified destination host is invalid
+
+        Returns:
+            Future: Future resolved with the reply message
+        """
+        return self.request_many(
+            msg_data,
+            reply_type,
+            [dest_mod_id],
+            timeout,
+            correlation_field,
+            dest_host_id,
+        )[0]
+
+    @requires_connection
+    def request_many(
+        self,
+        msg_data: MessageData,
+        reply_type: int,
+        dest_mod_ids: Iterable[int],
+        timeout: Union[int, float, None] = 1.0,
+        correlation_field: Optional[str] = None,
+        dest_host_id: int = 0,
+    ) -> List[Future]:
+        """Send a request to several modules at once and return a future for each reply
+
+        The requests are sent with a single socket write, so all replies
+        arrive within one round trip. See :py:meth:`request`.
+
+        Args:
+            msg_data: Request message
+            reply_type (int): Message type ID of the replies
+            dest_mod_ids: Module IDs to send the request to
+            timeout (optional): Time in seconds to wait for the replies before the futures fail
+                with RequestTimeout. None waits forever. Defaults to 1.0.
+            correlation_field (optional): Name of the data field used to match the replies.
+                Defaults to None (match by module only).
+            dest_host_id (optional): Specific host ID to send to. Defaults to 0 (broadcast).
+
+        Raises:
+            InvalidDestinationModule: Specified destination module is invalid
+            InvalidDestinationHost: Specified destination host is invalid
+
+        Returns:
+            List[Future]: One future per destination module, in order
+        """
+        dest_mod_ids = list(dest_mod_ids)
+        for dest_mod_id in dest_mod_ids:
+            self._check_destination(dest_mod_id, dest_host_id)
+
+        if not self._wants(reply_type):
+            self.subscribe([reply_type])
+
+        correlation = self._requests.next_id()
+        if correlation_field is not None:
+            setattr(msg_data, correlation_field, correlation)
+
+        deadline = None
+        if timeout is not None and timeout >= 0:
+            deadline = time.perf_counter() + timeout
+
+        # Register before sending so that an early reply is not missed
+        futures = [
+            self._requests.add(
+                reply_type, dest_mod_id, correlation_field, correlation, deadline
+            )
+            for dest_mod_id in dest_mod_ids
+        ]
+
+        buffers: List[Any] = []
+        msg_count = self._msg_count
+        for dest_mod_id in dest_mod_ids:
+            header = self._make_data_header(msg_data, dest_mod_id, dest_host_id)
+            header.msg_count = msg_count
+            msg_count += 1
+            payload = self._data_buffer(header, msg_data)
+            buffers.append(header)
+            if header.num_data_bytes > 0:
+                buffers.append(payload)
+
+        try:
+            self._transmit(buffers, len(dest_mod_ids))
+        except BaseException:
+            self._requests.discard(futures)
+            raise
+
+        return futures
+
+    @requires_connection
+    def wait_for_replies(
+        self, futures: Iterable[Future], timeout: Union[int, float, None] = None
+    ) -> bool:
+        """Read messages until the given requests are resolved
+
+        Subscribed messages received while waiting are kept for reading.
+
+        Args:
+            futures: Futures returned by :py:meth:`request` or :py:meth:`request_many`
+            timeout (optional): Maximum time to wait in seconds. None waits until every
+                request is resolved or has timed out. Defaults to None.
+
+        Returns:
+            True if every future is done
+        """
+        futures = list(futures)
+        deadline = None
+        if timeout is not None and timeout >= 0:
+            deadline = time.perf_counter() + timeout
+
+        if self._receiving:
+            # The receive thread resolves and expires requests
+            t_rem = None if deadline is None else max(deadline - time.perf_counter(), 0)
+            _, not_done = wait_futures(futures, t_rem)
+            return not not_done
+
+        while True:
+            now = time.perf_counter()
+            self._requests.expire(now)
+            if all(f.done() for f in futures):
+                return True
+            if deadline is not None and now >= deadline:
+                return False
+
+            if not self._stream.has_frame():
+                # Wake up in time to expire the next request
+                wake = self._requests.next_deadline()
+                if deadline is not None:
+                    wake = deadline if wake is None else min(wake, deadline)
+                t_rem = -1 if wake is None else max(wake - now, 0)
+                if not self._wait_readable(t_rem):
+                    continue
+                self._recv_frame()
+
+            self._stash_frames()
+
+    @requires_connection
+    def send_blob(
+        self,
+        blob_type: int,
+        data: Union[bytes, bytearray, memoryview],
+        dest_mod_id: int = 0,
+        dest_host_id: int = 0,
+        window: int = 8,
+        timeout: Union[int, float, None] = 5.0,
+    ) -> int:
+        """Send a payload of any size as a series of BLOB_FRAGMENT messages
+
+        Subscribers receive the payload through handlers registered with
+        :py:meth:`on_blob`. Each fragment carries BLOB_FRAGMENT_SIZE bytes,
+        taken from data without copying.
+
+        When sent to a single module, the receiver acknowledges every window
+        fragments, and at most two windows are in flight at once, so a large
+        blob cannot fill the receiver's buffers and cause the message manager to drop
+        its other traffic. Broadcast blobs are not acknowledged. Fragments are
+        written one window per socket write, so messages sent from other
+        threads in thread-safe mode are interleaved between windows.
+
+        Args:
+            blob_type (int): Message type ID identifying the payload for :py:meth:`on_blob`
+            data: Payload bytes
+            dest_mod_id (optional): Specific module ID to send to. Defaults to 0 (broadcast).
+            dest_host_id (optional): Specific host ID to send to. Defaults to 0 (broadcast).
+            window (optional): Number of fragments per acknowledgement. Defaults to 8.
+            timeout (optional): Time in seconds to wait for each acknowledgement. None waits
+                forever. Defaults to 5.0.
+
+        Raises:
+            ValueError: window is less than 1
+            InvalidDestinationModule: Specified destination module is invalid
+            InvalidDestinationHost: Specified destination host is invalid
+            RequestTimeout: The receiver did not acknowledge a window in time
+
+        Returns:
+            int: Blob ID
+        """
+        if window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+
+        self._check_destination(dest_mod_id, dest_host_id)
+
+        view = memoryview(data).cast("B")
+        size = len(view)
+        frag_size = cd.BLOB_FRAGMENT_SIZE
+        num_fragments = max(1, -(-size // frag_size))
+        blob_id = self._requests.next_id()
+
+        ack_every = window if dest_mod_id else 0
+        if ack_every and not self._wants(cd.MT_BLOB_ACK):
+            self.subscribe([cd.MT_BLOB_ACK])
+
+        in_flight: List[Future] = []
+        try:
+            for first in range(0, num_fragments, window):
+                last = min(first + window, num_fragments)
+                if ack_every:
+                    in_flight.append(
+                        self._requests.add(
+                            cd.MT_BLOB_ACK, dest_mod_id, "blob_id", blob_id
+                        )
+                    )
+
+                buffers: List[Any] = []
+                for seq in range(first, last):
+                    chunk = view[seq * frag_size : (seq + 1) * frag_size]
+                    header = self._make_header(
+                        cd.MT_BLOB_FRAGMENT,
+                        dest_mod_id,
+                        dest_host_id,
+                        cd.MDF_BLOB_FRAGMENT.type_size,
+                    )
+                    header.msg_count = self._msg_count + seq - first
+                    header.version = cd.MDF_BLOB_FRAGMENT.type_hash
+                    fields = BLOB_FIELDS.pack(
+                        blob_type,
+                        blob_id,
+                        seq,
+                        num_fragments,
+                        ack_every,
+                        len(chunk),
+                        size,
+                    )
+                    buffers += [header, fields, chunk]
+                    if len(chunk) < frag_size:
+                        if self._compact:
+                            compact_header(header, BLOB_FIELDS.size + len(chunk))
+                        else:
+                            buffers.append(bytes(frag_size - len(chunk)))
+
+                self._transmit(buffers, last - first)
+
+                # Keep at most two windows unacknowledged
+                if len(in_flight) == 2:
+                    self._wait_blob_ack(in_flight.pop(0), timeout)
+
+            while in_flight:
+                self._wait_blob_ack(in_flight.pop(0), timeout)
+        finally:
+            self._requests.discard(in_flight)
+
+        return blob_id
+
+    def _wait_blob_ack(self, future: Future, timeout: Union[int, float, None]):
+        """Wait for a window of blob fragments to be acknowledged"""
+        if not self.wait_for_replies([future], timeout):
+            raise RequestTimeout("Blob fragments were not acknowledged")
+        future.result()
+
+    def on_blob(self, blob_type: int) -> Callable[[Callable[[Blob], Any]], Any]:
+        """Decorator that registers a handler for blobs (see :py:meth:`add_blob_handler`)
+
+        Args:
+            blob_type (int): Message type ID the blobs are sent as
+        """
+
+        def decorator(handler: Callable[[Blob], Any]) -> Callable[[Blob], Any]:
+            self.add_blob_handler(blob_type, handler)
+            return handler
+
+        return decorator
+
+    @requires_connection
+    def add_blob_handler(self, blob_type: int, handler: Callable[[Blob], Any]):
+        """Register a handler for blobs sent with :py:meth:`send_blob`
+
+        The client is subscribed to BLOB_FRAGMENT if it is not already. While
+        any blob handler is registered, fragments are consumed wherever messages
+        are read and are not returned by the read methods. Handlers are called
+        in the thread that reads the last fragment of a blob.
+
+        Fragments are acknowledged from the thread that reads them, such as
+        the receive thread of :py:meth:`start_receiving`, so this also enables
+        :py:meth:`enable_thread_safe_send` to keep acknowledgements from
+        interleaving with the application's own sends.
+
+        Args:
+            blob_type (int): Message type ID the blobs are sent as
+            handler (Callable[[Blob], Any]): Function called with each completed blob
+        """
+        if not self._wants(cd.MT_BLOB_FRAGMENT):
+            self.subscribe([cd.MT_BLOB_FRAGMENT])
+
+        self.enable_thread_safe_send()
+
+        self._blob_handlers = {
+            **self._blob_handlers,
+            blob_type: self._blob_handlers.get(blob_type, []) + [handler],
+        }
+
+    def remove_blob_handler(self, blob_type: int, handler: Callable[[Blob], Any]):
+        """Unregister a blob handler
+
+        Args:
+            blob_type (int): Message type ID the blobs are sent as
+            handler (Callable[[Blob], Any]): Previously registered handler
+        """
+        handlers = [h for h in self._blob_handlers.get(blob_type, []) if h != handler]
+        self._blob_handlers = {
+            k: v for k, v in self._blob_handlers.items() if k != blob_type
+        }
+        if handlers:
+            self._blob_handlers[blob_type] = handlers
+
+    @property
+    def compact_encoding(self) -> bool:
+        """True if messages are sent and received in the compact encoding"""
+        return self._compact
+
+    def enable_compact_encoding(self) -> bool:
+        """Send messages without their trailing zero bytes
+
+        Fixed-size messages with unused string or array space at the end,
+        such as RTMA_LOG or TIMING_MESSAGE, shrink to the bytes actually
+        used. Receivers zero-fill the data back to full size. The client also
+        asks the message manager to send it compact messages. The manager
+        still sends full-size messages to clients that did not ask.
+
+        The setting is kept across reconnects.
+
+        Returns:
+            True if the connected message manager supports the compact encoding.
+            Otherwise messages are sent at full size.
+        """
+        self._compact_requested = True
+        if self._connected:
+            self._declare_capabilities()
+        return self._compact
+
+    def disable_compact_encoding(self):
+        """Send and receive full-size messages"""
+        self._compact_requested = False
+        if self._connected and self._compact:
+            self._declare_capabilities()
+
+    def set_compression(
+        self, msg_type: int, codec: Union[int, str, Codec, None] = "zlib"
+    ):
+        """Compress the message data of a message type when sending it
+
+        Overrides the compression named in the message definition. Messages
+        are only compressed if the message manager supports compression and
+        the result is smaller than the message data. The manager decompresses
+        them for clients that do not accept compressed messages. Messages sent
+        with :py:meth:`prepare` are never compressed.
+
+        Args:
+            msg_type (int): Message type ID
+            codec (optional): Registered codec ID, name or object, or None to
+                send the message type uncompressed. Defaults to "zlib".
+
+        Raises:
+            ValueError: Unknown codec, or msg_type is a core message type
+        """
+        if msg_type <= cd.MAX_RTMA_MSG_TYPE:
+            raise ValueError("Core message types cannot be compressed")
+        self._codecs[msg_type] = None if codec is None else get_codec(codec)
+
+    def _send_codec(self, msg_data: MessageData) -> Optional[Codec]:
+        """Codec that a message is sent with, or None"""
+        try:
+            return self._codecs[msg_data.type_id]
+        except KeyError:
+            codec = None
+            if msg_data.type_compression and msg_data.type_id > cd.MAX_RTMA_MSG_TYPE:
+                codec = get_codec(msg_data.type_compression)
+            self._codecs[msg_data.type_id] = codec
+            return codec
+
+    @property
+    def compressed_receive(self) -> bool:
+        """True if the message manager forwards compressed messages to this client"""
+        return self._compressed_receive
+
+    def enable_compressed_receive(self) -> bool:
+        """Receive compressed messages as they were sent
+
+        The message manager forwards compressed messages without
+        decompressing them, which saves bandwidth between hosts. Their data
+        is decompressed on first access, see
+        :py:class:`~pyrtma.compression.CompressedMessage`. Messages compressed
+        with a custom codec require the codec to be registered with
+        :py:func:`~pyrtma.compression.register_codec`.
+
+        The setting is kept across reconnects.
+
+        Returns:
+            True if the connected message manager supports compression.
+        """
+        self._compressed_receive_requested = True
+        if self._connected:
+            self._declare_capabilities()
+        return self._compressed_receive
+
+    def disable_compressed_receive(self):
+        """Have the message manager decompress messages before sending them to this client"""
+        self._compressed_receive_requested = False
+        if self._connected and self._compressed_receive:
+            self._declare_capabilities()
+
+    @property
+    def envelope_receive(self) -> bool:
+        """True if the message manager forwards envelopes intact to this client"""
+        return self._envelope_receive
+
+    def enable_envelope_receive(self) -> bool:
+        """Receive envelopes sent with :py:meth:`send_envelope` as single frames
+
+        The message manager forwards an envelope of many small messages as
+        one frame instead of one frame per message. The client splices the
+        packed messages into its receive buffer, so they are read exactly
+        like messages that were sent one by one.
+
+        The setting is kept across reconnects.
+
+        Returns:
+            True if the connected message manager supports envelopes.
+        """
+        self._envelope_receive_requested = True
+        if self._connected:
+            self._declare_capabilities()
+        return self._envelope_receive
+
+    def disable_envelope_receive(self):
+        """Have the message manager unpack envelopes before sending them to this client"""
+        self._envelope_receive_requested = False
+        if self._connected and self._envelope_receive:
+            self._declare_capabilities()
+
+    def _declare_capabilities(self):
+        """Tell the message manager which optional encodings this client accepts"""
+        self._compact = False
+        self._compressed_receive = False
+        self._envelope_receive = False
+        mm_caps = self._manager_capabilities
+        if not mm_caps & (
+            cd.MM_CAP_COMPACT | cd.MM_CAP_COMPRESSION | cd.MM_CAP_ENVELOPE
+        ):
+            return
+
+        compact = self._compact_requested and bool(mm_caps & cd.MM_CAP_COMPACT)
+        compressed = self._compressed_receive_requested and bool(
+            mm_caps & cd.MM_CAP_COMPRESSION
+        )
+        envelopes = self._envelope_receive_requested and bool(
+            mm_caps & cd.MM_CAP_ENVELOPE
+        )
+        msg = cd.MDF_CLIENT_CAPABILITIES()
+        if compact:
+            msg.capabilities |= cd.CLIENT_CAP_COMPACT
+        if compressed:
+            msg.capabilities |= cd.CLIENT_CAP_COMPRESSION
+        if envelopes:
+            msg.capabilities |= cd.CLIENT_CAP_ENVELOPE
+        self.send_message(msg)
+        self._compact = compact
+        self._compressed_receive = compressed
+        self._envelope_receive = envelopes
+
+    @property
+    def thread_safe_send(self) -> bool:
+        """True if the send methods may be called from several threads at once"""
+        return self._thread_safe_send
+
+    def enable_thread_safe_send(self):
+        """Allow the send methods to be called from several threads at once
+
+        Each thread stages its messages in its own buffer and queues it. The
+        thread that takes the send lock stamps msg_count in queue order and
+        writes everything queued so far with one gathered write. Threads that
+        send at the same time share a single system call and never interleave
+        partial messages on the socket.
+        """
+        self._thread_safe_send = True
+
+    def disable_thread_safe_send(self):
+        """Return to the single-threaded send path
+
+        Only call this when no other thread is sending.
+
+        Raises:
+            ClientError: Blob handlers are registered, which acknowledge
+                fragments from the reading thread
+        """
+        if self._blob_handlers:
+            raise ClientError(
+                "Thread-safe send is required while blob handlers are registered"
+            )
+
+        with self._send_lock:
+            self._combine()
+            self._thread_safe_send = False
+
+    def _try_flush(self):
+        """Write queued outgoing data without waiting, unless another thread is sending"""
+        if not self._thread_safe_send:
+            self._flush_available()
+        elif self._send_lock.acquire(blocking=False):
+            try:
+                self._flush_available()
+            finally:
+                self._send_lock.release()
+
+    @property
+    def nonblocking_send(self) -> bool:
+        """True if sends are queued instead of waiting on the socket"""
+        return self._nonblocking_send
+
+    @property
+    def pending_bytes(self) -> int:
+        """Number of queued bytes not yet written to the socket"""
+        return len(self._outbox)
+
+    def enable_nonblocking_send(
+        self,
+        high_water: int = 4 * 1024**2,
+        on_high_water: Optional[Callable[["Client", int], Any]] = None,
+    ):
+        """Queue outgoing messages instead of blocking when the socket is full
+
+        In this mode the send methods never wait for the socket. Whatever the
+        socket does not accept immediately is copied to an outbound buffer,
+        which is written out by later sends and reads, or by :py:meth:`flush`.
+        Messages are never dropped, so the buffer keeps growing while the
+        message manager is stalled.
+
+        Args:
+            high_water (optional): Queued byte count that triggers on_high_water. Defaults to 4 MB.
+            on_high_water (optional): Called as on_high_water(client, pending_bytes)
+                when the queue grows past high_water. Called again only after the
+                queue has drained below high_water. Defaults to None.
+        """
+        self._high_water = high_water
+        self._on_high_water = on_high_water
+        self._nonblocking_send = True
+
+    def disable_nonblocking_send(self, timeout: float = -1) -> bool:
+        """Return to blocking sends after flushing the outbound buffer
+
+        Args:
+            timeout (optional): Timeout in seconds to wait for the buffer to drain.
+                Defaults to -1 (blocking).
+
+        Returns:
+            bool: True if the buffer was flushed. Otherwise, non-blocking mode stays enabled.
+        """
+        if not self.flush(timeout):
+            return False
+        self._nonblocking_send = False
+        return True
+
+    def flush(self, timeout: float = -1) -> bool:
+        """Write queued outgoing messages to the socket
+
+        Args:
+            timeout (optional): Timeout in seconds to wait for the socket to accept the data.
+                Defaults to -1 (blocking).
+
+        Raises:
+            ConnectionLost: Connection error to message manager server
+
+        Returns:
+            bool: True if no data remains queued
+        """
+        if not self._outbox:
+            return True
+
+        deadline = self._deadline(timeout)
+        t_rem = timeout
+        while True:
+            if self._thread_safe_send:
+                with self._send_lock:
+                    self._flush_available()
+            else:
+                self._flush_available()
+            if not self._outbox:
+                return True
+
+            if t_rem == 0 or not self._wait_writable(t_rem):
+                return False
+
+            if deadline is not None:
+                t_rem = max(deadline - time.perf_counter(), 0)
+
+    def _send_nowait(self, views: List[memoryview]) -> int:
+        """Write as much as the socket accepts without blocking
+
+        Returns:
+            Number of bytes written
+        """
+        try:
+            if _MSG_DONTWAIT:
+                return self._sock.sendmsg(views[:_IOV_MAX], [], _MSG_DONTWAIT)
+
+            # No per-call flag on this platform (Windows)
+            self._sock.setblocking(False)
+            try:
+                return self._sock.send(b"".join(views))
+            finally:
+                self._sock.setblocking(True)
+        except (BlockingIOError, InterruptedError):
+            return 0
+        except ConnectionError as e:
+            self._connected = False
+            raise ConnectionLost from e
+
+    def _send_or_queue(self, buffers: List[Any]):
+        """Send without blocking and queue whatever the socket did not accept"""
+        views = [memoryview(buffer).cast("B") for buffer in buffers]
+
+        # Keep messages in order behind data that is already queued
+        if self._outbox:
+            self._flush_available()
+
+        if not self._outbox:
+            nbytes = self._send_nowait(views)
+            i = 0
+            while i < len(views) and nbytes >= len(views[i]):
+                nbytes -= len(views[i])
+                i += 1
+            if i == len(views):
+                return
+            views = views[i:]
+            views[0] = views[0][nbytes:]
+
+        for view in views:
+            self._outbox += view
+
+        if not self._above_high_water and len(self._outbox) >= self._high_water:
+            self._above_high_water = True
+            if self._on_high_water is not None:
+                self._on_high_water(self, len(self._outbox))
+
+    def _flush_available(self):
+        """Write queued data until the socket would block"""
+        while self._outbox:
+            with memoryview(self._outbox) as view:
+                nbytes = self._send_nowait([view])
+            if nbytes == 0:
+                break
+            del self._outbox[:nbytes]
+
+        if len(self._outbox) < self._high_water:
+            self._above_high_water = False
+
+    @requires_connection
+    def forward_message(
+        self,
+        msg_hdr: MessageHeader,
+        msg_data: Optional[MessageData] = None,
+        timeout: float = -1,
+    ):
+        """Forward a message
+
+        A message is a packet that contains a defined data payload.
+        To send a message without associated data, see :py:func:`send_signal`.
+
+        Args:
+            msg_hdr: Object containing RTMA header to send
+            msg_data: Object containing the message to send
+            timeout (optional): Timeout in seconds to wait for socket to be available for sending.
+                Defaults to -1 (blocking).
+
+        """
+        # Assume that msg_type, num_data_bytes, data - have been filled in
+        if msg_data is not None:
+            msg_hdr.num_data_bytes = ctypes.sizeof(msg_data)
+
+        if self._nonblocking_send or self._wait_writable(timeout):
+            if msg_data is not None:
+                self._transmit([msg_hdr, msg_data], restamp=False)
+            else:
+                self._transmit([msg_hdr], restamp=False)
+
+        else:
+            # Socket was not ready to write data. Drop the packet.
+            print("x", end="")
+
+    def _sendall(self, buffer: bytearray):
+        try:
+            self._sock.sendall(buffer)
+        except ConnectionError as e:
+            self._connected = False
+            raise ConnectionLost from e
+
+    @requires_connection
+    def read_message(
+        self,
+        timeout: Union[int, float, None] = -1,
+        ack=False,
+        sync_check=False,
+        copy=True,
+    ) -> Optional[Message]:
+        """Read a message
+
+        With copy=False, the header and data of the returned message are views
+        of the client's receive buffer instead of copies. They are only valid
+        until the next read from this client. Call :py:meth:`Message.copy` to
+        keep a message longer.
+
+        When the client was created with a pool_size, the returned message is
+        a pooled object that is overwritten by a later read of the same
+        message type. Call :py:meth:`detach` to keep it.
+
+        Args:
+            timeout (optional): Timeout to wait for a message to be available for reading.
+                Defaults to -1 (blocking).
+            ack (optional): Primarily for internal use. When True, will not discard ACK messages. Defaults to False.
+            sync_check (optional): Validate message definition matches header version. Defaults to False.
+            copy (optional): Copy the message out of the receive buffer. Defaults to True.
+
+        Raises:
+            ConnectionLost: Connection error to message manager server
+
+        Returns:
+            Message object. If no message is read before timeout, returns None.
+        """
+        if self._outbox:
+            self._try_flush()
+
+        if self._receiving:
+            return self._read_inbox(timeout, ack)
+        elif self._inbox:
+            M = self._pop_inbox(ack)
+            if M is not None:
+                return M
+
+        return self._read_message(timeout, ack, sync_check, copy)
+
+    @requires_connection
+    def read_messages(
+        self,
+        max_count: Optional[int] = None,
+        timeout: Union[int, float, None] = -1,
+        sync_check=False,
+    ) -> List[Message]:
+        """Read all messages that are available, waiting only once
+
+        Waits up to timeout for the first message, then returns every subscribed
+        message that has already been received, including data waiting in the
+        socket, without waiting again.
+
+        Args:
+            max_count (optional): Maximum number of messages to return. Defaults to None (no limit).
+            timeout (optional): Timeout to wait for a message to be available for reading.
+                Defaults to -1 (blocking).
+            sync_check (optional): Validate message definition matches header version. Defaults to False.
+
+        Raises:
+            ValueError: max_count is less than 1
+            ConnectionLost: Connection error to message manager server
+
+        Returns:
+            List of Message objects. If no message is read before timeout, returns an empty list.
+        """
+        if max_count is not None and max_count < 1:
+            raise ValueError(f"max_count must be at least 1, got {max_count}")
+
+        if self._outbox:
+            self._try_flush()
+
+        if self._receiving or self._inbox:
+            return self._read_inbox_batch(max_count, timeout)
+
+        return self._read_batch(max_count, timeout, sync_check)
+
+    def _read_batch(
+        self,
+        max_count: Optional[int] = None,
+        timeout: Union[int, float, None] = -1,
+        sync_check=False,
+        ack=False,
+    ) -> List[Message]:
+        """Read a batch of messages from the socket (helper called by read_messages)"""
+        msgs: List[Message] = []
+        deadline = self._deadline(timeout)
+        t_rem = timeout
+
+        while True:
+            if not self._stream.has_frame():
+                if not self._wait_readable(t_rem):
+                    return msgs
+                self._recv_frame()
+
+            while True:
+                offset = self._next_frame(ack)
+                if offset is None:
+                    if self._recv_available():
+                        continue
+                    break
+
+                try:
+                    M = self._decode_frame(offset, sync_check)
+                except (UnknownMessageType, InvalidMessageDefinition):
+                    if not msgs:
+                        raise
+                    # Return what was read so far. The next read raises the error.
+                    self._stream.unread(offset)
+                    return msgs
+
+                msgs.append(M)
+                if max_count is not None and len(msgs) >= max_count:
+                    return msgs
+
+            if msgs or t_rem == 0:
+                return msgs
+
+            # Everything read was filtered out. Wait again for the remaining time.
+            if deadline is not None:
+                t_rem = max(deadline - time.perf_counter(), 0)
+
+    @requires_connection
+    def _read_available(
+        self, max_count: Optional[int] = None, sync_check=False
+    ) -> List[Message]:
+        """Read the messages that are available without blocking (helper called by ClientReactor)
+
+        Unlike :py:meth:`read_messages`, a partially received message is left
+        buffered instead of waited for, and a closed connection raises
+        ConnectionLost once all buffered messages have been returned.
+        """
+        msgs: List[Message] = []
+        while self._inbox and (max_count is None or len(msgs) < max_count):
+            msg = self._pop_inbox()
+            if msg is None:
+                break
+            msgs.append(msg)
+
+        while max_count is None or len(msgs) < max_count:
+            offset = self._next_frame()
+            if offset is None:
+                if self._recv_available(raise_closed=not msgs):
+                    continue
+                break
+
+            try:
+                M = self._decode_frame(offset, sync_check)
+            except (UnknownMessageType, InvalidMessageDefinition):
+                if not msgs:
+                    raise
+                self._stream.unread(offset)
+                break
+
+            msgs.append(M)
+
+        return msgs
+
+    def iter_messages(
+        self,
+        max_count: Optional[int] = None,
+        timeout: Union[int, float, None] = -1,
+        sync_check=False,
+    ) -> Iterator[Message]:
+        """Iterate over received messages, reading them in batches with :py:meth:`read_messages`
+
+        Iteration stops when no message is read before timeout.
+
+        Args:
+            max_count (optional): Maximum number of messages to read per batch. Defaults to None (no limit).
+            timeout (optional): Timeout to wait for each batch of messages. Defaults to -1 (blocking).
+            sync_check (optional): Validate message definition matches header version. Defaults to False.
+
+        Yields:
+            Message objects
+        """
+        while True:
+            msgs = self.read_messages(max_count, timeout, sync_check)
+            if not msgs:
+                return
+            yield from msgs
+
+    def on(
+        self, msg_type: int
+    ) -> Callable[[Callable[[Message], Any]], Callable[[Message], Any]]:
+        """Decorator that registers a handler for a message type
+
+        Handlers are called for received messages while the client is in
+        background receive mode (see :py:meth:`start_receiving`). Messages with
+        a handler are passed to the handler instead of being returned by
+        :py:meth:`read_message`. Registering a handler does not subscribe to
+        the message type.
+
+        Example::
+
+            @client.on(MT_FOO)
+            def handle_foo(msg: Message):
+                ...
+
+        Args:
+            msg_type (int): Numeric message type ID
+        """
+
+        def decorator(handler: Callable[[Message], Any]) -> Callable[[Message], Any]:
+            self.add_handler(msg_type, handler)
+            return handler
+
+        return decorator
+
+    def add_handler(self, msg_type: int, handler: Callable[[Message], Any]):
+        """Register a handler for a message type (see :py:meth:`on`)
+
+        Args:
+            msg_type (int): Numeric message type ID
+            handler (Callable[[Message], Any]): Function called with each received message
+        """
+        self._handlers = {
+            **self._handlers,
+            msg_type: self._handlers.get(msg_type, []) + [handler],
+        }
+
+    def remove_handler(self, msg_type: int, handler: Callable[[Message], Any]):
+        """Unregister a handler for a message type
+
+        Args:
+            msg_type (int): Numeric message type ID
+            handler (Callable[[Message], Any]): Previously registered handler
+        """
+        handlers = [h for h in self._handlers.get(msg_type, []) if h != handler]
+        self._handlers = {k: v for k, v in self._handlers.items() if k != msg_type}
+        if handlers:
+            self._handlers[msg_type] = handlers
+
+    @property
+    def receiving(self) -> bool:
+        """True while the background receive thread is running"""
+        return self._receiving
+
+    @requires_connection
+    def start_receiving(self, dispatch_thread: bool = True):
+        """Start reading messages on a background thread
+
+        The receive thread drains the socket continuously, so slow processing
+        in the application or in handlers never holds back the socket.
+        Messages with a registered handler are queued for dispatch. All other
+        messages are queued for :py:meth:`read_message` and :py:meth:`read_messages`.
+
+        Handlers run on a dispatcher thread, or in the application's own thread
+        through :py:meth:`dispatch` when dispatch_thread is False. Handlers that
+        send messages while the application also sends from another thread
+        must serialize their sends.
+
+        Args:
+            dispatch_thread (optional): Run handlers on a dedicated dispatcher thread. Defaults to True.
+        """
+        if self._receiving:
+            return
+
+        self._receiving = True
+        self._receiver = threading.Thread(
+            target=self._receive_loop, name=f"{self} receiver", daemon=True
+        )
+        self._receiver.start()
+
+        if dispatch_thread:
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name=f"{self} dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+
+    def stop_receiving(self):
+        """Stop the background receive and dispatcher threads
+
+        Messages that were already received stay queued. They are returned by
+        later reads, or passed to handlers by :py:meth:`dispatch`, before any new
+        data is read from the socket.
+        """
+        if not self._receiving:
+            return
+
+        self._receiving = False
+        for thread in (self._receiver, self._dispatcher):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join()
+        self._receiver = None
+        self._dispatcher = None
+
+    def _receive_loop(self):
+        while self._receiving:
+            try:
+                msgs = self._read_batch(timeout=0.1, ack=True)
+            except (UnknownMessageType, InvalidMessageDefinition) as e:
+                self._inbox.append(e)
+                self._inbox_ready.set()
+                continue
+            except (ClientError, OSError) as e:
+                self._inbox.append(e)
+                self._inbox_ready.set()
+                self._receiving = False
+                self._dispatch_ready.set()
+                return
+
+            if not msgs:
+                continue
+
+            handlers = self._handlers
+            for msg in msgs:
+                if msg.header.msg_type in handlers:
+                    self._dispatch_queue.append(msg)
+                    self._dispatch_ready.set()
+                else:
+                    self._inbox.append(msg)
+                    self._inbox_ready.set()
+
+    def _dispatch_loop(self):
+        while self._receiving or self._dispatch_queue:
+            try:
+                self._dispatch(timeout=0.1)
+            except Exception:
+                # Keep dispatching. Report like an uncaught thread exception.
+                traceback.print_exc()
+
+    def dispatch(
+        self, timeout: Union[int, float, None] = 0, max_count: Optional[int] = None
+    ) -> int:
+        """Run handlers for received messages in the calling thread
+
+        Only used when :py:meth:`start_receiving` was called with dispatch_thread=False.
+
+        Args:
+            timeout (optional): Timeout to wait for a message to dispatch. Defaults to 0 (no wait).
+                None or -1 waits forever.
+            max_count (optional): Maximum number of messages to dispatch. Defaults to None (no limit).
+
+        Raises:
+            ClientError: A dispatcher thread is running
+
+        Returns:
+            int: Number of messages dispatched
+        """
+        if self._dispatcher is not None:
+            raise ClientError("Handlers are already run by the dispatcher thread")
+        return self._dispatch(timeout, max_count)
+
+    def _dispatch(
+        self, timeout: Union[int, float, None] = 0, max_count: Optional[int] = None
+    ) -> int:
+        if not self._dispatch_queue:
+            self._dispatch_ready.clear()
+            if not self._dispatch_queue:
+                if timeout is None or timeout < 0:
+                    self._dispatch_ready.wait()
+                elif timeout > 0:
+                    self._dispatch_ready.wait(timeout)
+
+        count = 0
+        while self._dispatch_queue and (max_count is None or count < max_count):
+            msg = self._dispatch_queue.popleft()
+            count += 1
+            for handler in self._handlers.get(msg.header.msg_type, ()):
+                handler(msg)
+
+        return count
+
+    def _wait_inbox(self, deadline: Optional[float]) -> bool:
+        """Wait for the receive thread to queue a message"""
+        self._inbox_ready.clear()
+        if self._inbox:
+            return True
+        if not self._receiving:
+            return False
+        if deadline is None:
+            return self._inbox_ready.wait()
+        return self._inbox_ready.wait(max(deadline - time.perf_counter(), 0))
+
+    def _read_inbox(
+        self, timeout: Union[int, float, None] = -1, ack=False
+    ) -> Optional[Message]:
+        """Read a message queued by the receive thread (helper called by read_message)"""
+        deadline = None
+        if timeout is not None and timeout >= 0:
+            deadline = time.perf_counter() + timeout
+
+        while True:
+            msg = self._pop_inbox(ack)
+            if msg is not None:
+                return msg
+
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+
+            if not self._wait_inbox(deadline) and not self._inbox:
+                if not self._receiving:
+                    # The receive thread stopped without queuing an error
+                    raise ConnectionLost
+                return None
+
+    def _pop_inbox(self, ack=False) -> Optional[Message]:
+        """Read a queued message without waiting"""
+        while self._inbox:
+            item = self._inbox.popleft()
+            if isinstance(item, Exception):
+                raise item
+
+            msg_type = item.header.msg_type
+            if (
+                self._sub_all
+                or self._is_subscribed(msg_type)
+                or (ack and msg_type == cd.MT_ACKNOWLEDGE)
+            ):
+                return item
+
+        return None
+
+    def _read_inbox_batch(
+        self, max_count: Optional[int] = None, timeout: Union[int, float, None] = -1
+    ) -> List[Message]:
+        """Read all messages queued by the receive thread (helper called by read_messages)"""
+        if self._receiving:
+            msg = self._read_inbox(timeout)
+        else:
+            msg = self._pop_inbox()
+            if msg is None:
+                return self._read_batch(max_count, timeout)
+        if msg is None:
+            return []
+
+        msgs = [msg]
+        while self._inbox and (max_count is None or len(msgs) < max_count):
+            item = self._inbox[0]
+            if isinstance(item, Exception):
+                # The next read raises the error
+                break
+            self._inbox.popleft()
+            if self._sub_all or self._is_subscribed(item.header.msg_type):
+                msgs.append(item)
+
+        return msgs
+
+    @requires_connection
+    def _read_message(
+        self,
+        timeout: Union[int, float, None] = -1,
+        ack=False,
+        sync_check=False,
+        copy=True,
+    ) -> Optional[Message]:
+        """Read the next subscribed message from the socket (helper called by read_message)
+
+        Unsubscribed messages are skipped by their header alone, without
+        decoding their data. The timeout covers all reads made while skipping them.
+        """
+        deadline = self._deadline(timeout)
+        t_rem = timeout
+        waited = False
+
+        while True:
+            # Serve messages that arrived with an earlier read first
+            offset = self._next_frame(ack)
+            if offset is not None:
+                if copy and self._pool is not None:
+                    return self._decode_pooled(offset, sync_check)
+                return self._decode_frame(offset, sync_check, copy)
+
+            if waited and t_rem == 0:
+                return None
+
+            if not self._wait_readable(t_rem):
+                return None
+            self._recv_frame()
+            waited = True
+
+            if deadline is not None:
+                t_rem = max(deadline - time.perf_counter(), 0)
+
+    @staticmethod
+    def _deadline(timeout: Union[int, float, None]) -> Optional[float]:
+        """Absolute deadline for a positive timeout, otherwise None"""
+        if timeout is not None and timeout > 0:
+            return time.perf_counter() + timeout
+        return None
+
+    def _wants(self, msg_type: int, ack=False) -> bool:
+        """Check whether a message type passes the subscription filter"""
+        return (
+            self._sub_all
+            or self._is_subscribed(msg_type)
+            or (ack and msg_type == cd.MT_ACKNOWLEDGE)
+        )
+
+    def _next_frame(self, ack=False) -> Optional[int]:
+        """Frame the next buffered message that passes the subscription filter
+
+        Frames of other message types are dropped using the message type in
+        the raw header, so no objects are created for them.
+
+        Returns:
+            Offset of the message in the receive buffer, or None
+        """
+        stream = self._stream
+        while True:
+            offset = stream.next_frame()
+            if offset is None:
+                if self._requests:
+                    self._requests.expire(time.perf_counter())
+                return None
+
+            msg_type = stream.msg_type(offset)
+            if msg_type == cd.MT_ENVELOPE:
+                self._splice_envelope(offset)
+                continue
+            if self._stats_enabled:
+                self._record_frame(offset, msg_type)
+            if msg_type == cd.MT_TIME_SYNC_REPLY:
+                self._time_sync_reply(offset)
+            elif msg_type in self._requests and self._resolve_reply(offset):
+                continue
+            elif msg_type == cd.MT_BLOB_FRAGMENT and self._blob_handlers:
+                self._blob_fragment(offset)
+            elif self._wants(msg_type, ack):
+                return offset
+
+    def _splice_envelope(self, offset: int):
+        """Frame the messages packed in an envelope in the receive buffer like regular messages"""
+        stream = self._stream
+        buffer = stream.buffer
+        header = self._header_cls.from_buffer_copy(buffer, offset)
+        start = offset + stream.header_size
+        payload = stream.view[start : start + header.num_data_bytes]
+        try:
+            offsets = envelope_offsets(self._header_cls, payload)
+        except ValueError as e:
+            raise InvalidMessageDefinition(f"Received an invalid ENVELOPE: {e!s}")
+
+        # Packed messages inherit what the manager stamped on the envelope
+        hop_times = None
+        if self._hop_offset is not None:
+            hop_times = self._hop_times.unpack_from(buffer, offset + self._hop_offset)
+        for packed in offsets:
+            self._int32.pack_into(
+                buffer, start + packed + self._count_offset, header.msg_count
+            )
+            if hop_times is not None:
+                self._hop_times.pack_into(
+                    buffer, start + packed + self._hop_offset, *hop_times
+                )
+
+        stream.splice(offset)
+
+    def _record_frame(self, offset: int, msg_type: int):
+        """Add a received frame to the client statistics"""
+        buffer = self._stream.buffer
+        (msg_count,) = self._int32.unpack_from(buffer, offset + self._count_offset)
+        (send_time,) = self._double.unpack_from(buffer, offset + self._send_time_offset)
+        recv_time = self._recv_time + self._clock_offset
+        self._stats.record(msg_type, msg_count, recv_time - send_time)
+
+        if self._hop_offset is not None:
+            mm_recv_time, mm_send_time = self._hop_times.unpack_from(
+                buffer, offset + self._hop_offset
+            )
+            # Messages from the manager itself have no first hop
+            if mm_recv_time:
+                self._stats.record_hops(
+                    mm_recv_time - send_time,
+                    mm_send_time - mm_recv_time,
+                    recv_time - mm_send_time,
+                )
+
+    def _resolve_reply(self, offset: int) -> bool:
+        """Resolve the request a frame in the receive buffer replies to, if any"""
+        try:
+            msg = self._decode_frame(offset)
+        except (UnknownMessageType, InvalidMessageDefinition):
+            # Reported when the frame is read as a regular message
+            return False
+        return self._requests.resolve(msg)
+
+    def _blob_fragment(self, offset: int):
+        """Reassemble a blob fragment in the receive buffer and dispatch completed blobs"""
+        header = self._header_cls.from_buffer_copy(self._stream.buffer, offset)
+        payload = self._frame_data(header, offset)
+        check_message(header, payload)
+
+        blob, ack = self._blobs.feed(header.src_host_id, header.src_mod_id, payload)
+        if ack is not None:
+            reply = cd.MDF_BLOB_ACK()
+            reply.blob_id, reply.seq = ack
+            self.send_message(reply, header.src_mod_id, header.src_host_id)
+
+        if blob is not None:
+            for handler in self._blob_handlers.get(blob.blob_type, ()):
+                handler(blob)
+
+    def _stash_frames(self):
+        """Keep framed subscribed messages for reading while waiting for replies"""
+        offset = self._next_frame()
+        while offset is not None:
+            try:
+                self._inbox.append(self._decode_frame(offset))
+            except (UnknownMessageType, InvalidMessageDefinition) as e:
+                self._inbox.append(e)
+            offset = self._next_frame()
+
+    def _time_sync_reply(self, offset: int):
+        """Update the clock offset estimate from a time sync reply in the receive buffer"""
+        header = self._header_cls.from_buffer_copy(self._stream.buffer, offset)
+        t0, t1, t2 = self._time_sync_struct.unpack_from(
+            self._frame_data(header, offset)
+        )
+        t3 = self._recv_time
+
+        # NTP-style estimate. Keep the sample with the shortest round trip,
+        # whose offset is least distorted by queueing delays.
+        delay = (t3 - t0) - (t2 - t1)
+        self._time_samples.append((delay, ((t1 - t0) + (t2 - t3)) / 2))
+        self._clock_offset = min(self._time_samples)[1]
+
+        self._time_sync_replies += 1
+        self._time_sync_event.set()
+
+    def _wait_readable(self, timeout: Union[int, float, None] = -1) -> bool:
+        """Wait for the socket to be readable (helper called by the read methods)"""
+        if timeout is None:
+            # Skip select call
+            return True
+        elif timeout >= 0:
+            # Wait timeout amount
+            readfds, writefds, exceptfds = select.select([self._sock], [], [], timeout)
+        else:
+            # Blocking
+            readfds, writefds, exceptfds = select.select([self._sock], [], [])
+
+        return len(readfds) > 0
+
+    def _decode_frame(self, offset: int, sync_check=False, copy=True) -> Message:
+        """Create a message from a frame in the receive buffer"""
+        if copy:
+            header = self._header_cls.from_buffer_copy(self._stream.buffer, offset)
+        else:
+            header = self._header_cls.from_buffer(self._stream.buffer, offset)
+        header.recv_time = self._recv_time + self._clock_offset
+
+        # Compressed data is decompressed on first access by decode_message
+        payload = self._frame_data(header, offset, decompress=False)
+        return decode_message(
+            header, payload, sync_check, lazy=self.lazy_decode, copy=copy
+        )
+
+    def _frame_data(
+        self, header: MessageHeader, offset: int, decompress: bool = True
+    ) -> Union[memoryview, bytearray]:
+        """Full-size message data of a frame, zero-filled if it was sent compact
+        and decompressed if it was sent compressed and decompress is True"""
+        start = offset + self._stream.header_size
+        payload = self._stream.view[start : start + header.num_data_bytes]
+        if is_compact(header):
+            return expand_payload(header, payload)
+        if decompress and is_compressed(header):
+            try:
+                return decompress_payload(header, payload)
+            except ValueError as e:
+                raise InvalidMessageDefinition(str(e))
+        return payload
+
+    def _decode_pooled(self, offset: int, sync_check=False) -> Message:
+        """Fill a pooled message from a frame in the receive buffer"""
+        stream = self._stream
+        msg_type = stream.msg_type(offset)
+        try:
+            msg_cls = get_msg_cls(msg_type)
+        except UnknownMessageType:
+            # Raise with the message header and data attached
+            return self._decode_frame(offset, sync_check)
+
+        msg = self._pool.acquire(msg_type, msg_cls)  # type: ignore
+        header = msg.header
+        stream.copy_into(header, offset)
+        if is_compact(header):
+            size = expand_header(header)
+            check_message(header, sync_check=sync_check)
+            ctypes.memset(ctypes.addressof(msg.data), 0, ctypes.sizeof(msg.data))
+            stream.copy_into(msg.data, offset + header.size, size)
+        elif is_compressed(header):
+            payload = self._frame_data(header, offset)
+            check_message(header, sync_check=sync_check)
+            memoryview(msg.data).cast("B")[:] = payload  # type: ignore
+        else:
+            check_message(header, sync_check=sync_check)
+            stream.copy_into(msg.data, offset + header.size)
+        header.recv_time = self._recv_time + self._clock_offset
+        return msg
+
+    def detach(self, msg: Message) -> Message:
+        """Keep a message read from the message pool
+
+        The message is removed from the pool, so later reads no longer
+        overwrite it. Messages that are not pooled are returned unchanged.
+
+        Args:
+            msg (Message): Message returned by :py:meth:`read_message`
+
+        Returns:
+            Message: The same message
+        """
+        if self._pool is None:
+            return msg
+        return self._pool.detach(msg)
+
+    def _recv_available(self, raise_closed=False) -> bool:
+        """Read data already waiting in the socket without blocking
+
+        By default, connection errors are left for the next read to report, so
+        messages that were already framed are not lost.
+
+        Args:
+            raise_closed (optional): Raise ConnectionLost if the connection was closed. Defaults to False.
+
+        Returns:
+            True if a complete message is now buffered
+        """
+        while self._wait_readable(0):
+            try:
+                nbytes = self._stream.recv_into(self._sock)
+            except ConnectionError as e:
+                if raise_closed:
+                    self._connected = False
+                    raise ConnectionLost from e
+                return False
+
+            if nbytes == 0:
+                if raise_closed:
+                    self._connected = False
+                    raise ConnectionLost
+                return False
+
+            self._recv_time = time.perf_counter()
+
+            if self._quickack:
+                SocketProfile.rearm_quickack(self._sock)
+
+            if self._stream.has_frame():
+                return True
+
+        return False
+
+    def _recv_frame(self):
+        """Read from the socket until at least one complete message is buffered"""
+        while True:
+            try:
+                nbytes = self._stream.recv_into(self._sock)
+            except ConnectionError as e:
+                self._connected = False
+                raise ConnectionLost from e
+
+            if nbytes == 0:
+                self._connected = False
+                raise ConnectionLost
+
+            # All buffered messages were received by this call
+            self._recv_time = time.perf_counter()
+
+            if self._quickack:
+                SocketProfile.rearm_quickack(self._sock)
+
+            if self._stream.has_frame():
+                return
+
+    def _wait_for_acknowledgement(self, timeout: float = 3) -> Message:
+        """Wait for acknowledgement from message manager module
+
+        Used internally when acknowledgement replies from message manager are expected
+
+        Args:
+            timeout (optional): Timeout in seconds to wait for ack message. Defaults to 3.
+
+        Raises:
+            AcknowledgementTimeout: Ack not received from message manager
+
+        Returns:
+            Ack message
+        """
+        # Messages read while waiting are returned to the inbox in order
+        stash: List[Message] = []
+        try:
+            # Wait Forever
+            if timeout == -1:
+                while True:
+                    msg = self.read_message(ack=True)
+                    if msg is not None:
+                        if msg.header.msg_type == cd.MT_ACKNOWLEDGE:
+                            break
+                        stash.append(msg)
+                return msg
+            else:
+                # Wait up to timeout seconds
+                time_remaining = timeout
+                start_time = time.perf_counter()
+                while time_remaining > 0:
+                    msg = self.read_message(timeout=time_remaining, ack=True)
+                    if msg is not None:
+                        if msg.header.msg_type == cd.MT_ACKNOWLEDGE:
+                            return msg
+                        stash.append(msg)
+
+                    time_now = time.perf_counter()
+                    time_waited = time_now - start_time
+                    time_remaining = timeout - time_waited
+
+                raise AcknowledgementTimeout(
+                    "Failed to receive Acknowlegement from MessageManager"
+                )
+        finally:
+            self._inbox.extendleft(reversed(stash))
 
     def discard_messages(self, timeout: float = 1) -> bool:
         """Read and discard messages in socket buffer up to timeout
@@ -905,6 +3000,7 @@ def client_context(
     logger_status: bool = False,
     allow_multiple: bool = False,
     name: str = "",
+    hop_times: bool = False,
 ):
     """Context manager function to simplify initializing a pyrtma Client
 
@@ -926,11 +3022,13 @@ def client_context(
             Defaults to False.
         allow_multiple (optional): Flag to declare client can have multiple instances. Defaults to False.
         name (optional): Name of module
+        hop_times (optional): Add message manager hop timestamp fields to message header.
+            Defaults to False.
 
     Yields:
         Client: initialized pyrtma Client object
     """
-    c = Client(module_id, host_id, timecode, name=name)
+    c = Client(module_id, host_id, timecode, name=name, hop_times=hop_times)
     c.connect(server_name, logger_status, allow_multiple)
     if msg_list:
         c.subscribe(msg_list)
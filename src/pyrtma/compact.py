@@ -0,0 +1,99 @@
+"""pyrtma.compact module
+
+Helpers for the compact wire encoding of message data
+
+Fixed-size messages are often mostly zeros at the end, such as unused
+string and array space. A compact message is sent without its trailing zero
+bytes. Its header has the IS_DYNAMIC_COMPACT bit set in is_dynamic,
+num_data_bytes is the number of bytes sent, and remaining_bytes is the
+number of zero bytes trimmed. Receivers zero-fill the data back to full
+size. The message manager only sends compact messages to clients that
+declared CLIENT_CAP_COMPACT.
+"""
+
+from . import core_defs as cd
+from .header import MessageHeader
+
+from typing import Any
+
+__all__ = [
+    "trimmed_size",
+    "is_compact",
+    "compact_header",
+    "expand_header",
+    "expand_payload",
+]
+
+_SCAN_BLOCK = 4096
+_ZERO_BLOCK = bytes(_SCAN_BLOCK)
+
+
+def trimmed_size(payload: Any) -> int:
+    """Size of message data without its trailing zero bytes
+
+    Args:
+        payload: Message data object or bytes-like object
+
+    Returns:
+        int: Number of bytes up to and including the last nonzero byte
+    """
+    # Scan back from the end one block at a time, so only the trailing zeros
+    # and the block holding the last nonzero byte are ever copied
+    view = memoryview(payload).cast("B")
+    end = len(view)
+    while end > 0:
+        start = max(0, end - _SCAN_BLOCK)
+        block = view[start:end].tobytes()
+        if block != _ZERO_BLOCK[: end - start]:
+            return start + len(block.rstrip(b"\x00"))
+        end = start
+    return 0
+
+
+def is_compact(header: MessageHeader) -> bool:
+    """Check whether a header describes compact message data"""
+    return bool(header.is_dynamic & cd.IS_DYNAMIC_COMPACT)
+
+
+def compact_header(header: MessageHeader, size: int):
+    """Mark a header for sending only the first size bytes of its message data
+
+    Args:
+        header (MessageHeader): Header of a full-size message
+        size (int): Number of data bytes to send
+    """
+    header.remaining_bytes = header.num_data_bytes - size
+    header.num_data_bytes = size
+    header.is_dynamic |= cd.IS_DYNAMIC_COMPACT
+
+
+def expand_header(header: MessageHeader) -> int:
+    """Restore a compact header to describe the full-size message data
+
+    Args:
+        header (MessageHeader): Header of a compact message
+
+    Returns:
+        int: Number of data bytes that were sent
+    """
+    size = header.num_data_bytes
+    header.num_data_bytes = size + header.remaining_bytes
+    header.remaining_bytes = 0
+    header.is_dynamic &= ~cd.IS_DYNAMIC_COMPACT
+    return size
+
+
+def expand_payload(header: MessageHeader, payload: Any) -> bytearray:
+    """Restore a compact header and zero-fill its message data to full size
+
+    Args:
+        header (MessageHeader): Header of a compact message
+        payload: Message data bytes that were sent
+
+    Returns:
+        bytearray: Full-size message data
+    """
+    size = expand_header(header)
+    data = bytearray(header.num_data_bytes)
+    data[:size] = payload
+    return data
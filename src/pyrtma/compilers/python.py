@@ -203,6 +203,11 @@ class PyDefCompiler:
             type_def_rhs = f'type_def: ClassVar[\n{TAB *4}str\n{TAB *3}] = "'
             type_def_line = f"{type_def_rhs}{type_def_str}{type_def_end}"
 
+        if mdf.compression:
+            type_def_line += (
+                f'\n{TAB * 3}type_compression: ClassVar[str] = "{mdf.compression}"'
+            )
+
         template = f"""\
         @pyrtma.message_def
         class MDF_{mdf.name}(MessageData, metaclass=MessageMeta):
@@ -0,0 +1,259 @@
+"""pyrtma.compression module
+
+Per message type compression of message data on the wire
+
+Large, compressible message types, such as images or configuration dumps,
+can be sent compressed by naming a codec in their message definition::
+
+    message_defs:
+      IMAGE:
+        id: 1234
+        compression: zlib
+        fields: ...
+
+or at run time with :py:meth:`~pyrtma.client.Client.set_compression`.
+
+A compressed message has the ID of its codec in the IS_DYNAMIC_CODEC_MASK
+bits of is_dynamic, num_data_bytes is the number of compressed bytes sent,
+and remaining_bytes is the number of bytes compression saved. The message
+manager forwards compressed messages untouched to clients that declared
+CLIENT_CAP_COMPRESSION and decompresses them for all other clients and for
+the traffic recorder.
+"""
+
+import lzma
+import zlib
+
+from dataclasses import dataclass
+
+from . import core_defs as cd
+from .header import MessageHeader
+from .message import LazyMessage, MessageData
+from .exceptions import InvalidMessageDefinition
+
+from typing import Any, Callable, Dict, Optional, Type, Union
+
+__all__ = [
+    "Codec",
+    "register_codec",
+    "get_codec",
+    "is_compressed",
+    "compress_payload",
+    "restore_header",
+    "decompress_payload",
+    "CompressedMessage",
+]
+
+
+@dataclass(frozen=True)
+class Codec:
+    """Compression codec
+
+    Args:
+        codec_id: ID sent in message headers, between 1 and 255
+        name: Name used in message definitions
+        compress: Function that compresses bytes
+        decompress: Function that decompresses bytes, given the compressed
+            bytes and the expected decompressed size. It must not return more
+            than the expected size.
+    """
+
+    codec_id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes, int], bytes]
+
+
+def _zlib_decompress(data: bytes, size: int) -> bytes:
+    return zlib.decompressobj().decompress(data, size)
+
+
+def _lzma_decompress(data: bytes, size: int) -> bytes:
+    return lzma.LZMADecompressor().decompress(data, max_length=size)
+
+
+_codecs_by_id: Dict[int, Codec] = {}
+_codecs_by_name: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec):
+    """Make a codec available for sending and receiving compressed messages
+
+    Every client that receives messages compressed with a custom codec, and
+    the message manager if any client does not accept compressed messages,
+    must register the codec.
+
+    Args:
+        codec (Codec): Codec to register
+
+    Raises:
+        ValueError: Invalid codec ID, or the ID or name is already registered
+    """
+    if not 0 < codec.codec_id <= 0xFF:
+        raise ValueError(f"Codec ID must be between 1 and 255, got {codec.codec_id}")
+
+    existing = _codecs_by_id.get(codec.codec_id) or _codecs_by_name.get(codec.name)
+    if existing is not None and existing != codec:
+        raise ValueError(
+            f"Codec {codec.name} conflicts with registered codec {existing.name} (ID {existing.codec_id})"
+        )
+
+    _codecs_by_id[codec.codec_id] = codec
+    _codecs_by_name[codec.name] = codec
+
+
+register_codec(Codec(cd.CODEC_ZLIB, "zlib", zlib.compress, _zlib_decompress))
+register_codec(Codec(cd.CODEC_LZMA, "lzma", lzma.compress, _lzma_decompress))
+
+
+def get_codec(codec: Union[int, str, Codec]) -> Codec:
+    """Look up a registered codec
+
+    Args:
+        codec: Codec ID, name or object
+
+    Raises:
+        ValueError: Codec is not registered
+
+    Returns:
+        Codec: Registered codec
+    """
+    if isinstance(codec, Codec):
+        found = _codecs_by_id.get(codec.codec_id)
+        if found != codec:
+            found = None
+    elif isinstance(codec, str):
+        found = _codecs_by_name.get(codec)
+    else:
+        found = _codecs_by_id.get(codec)
+
+    if found is None:
+        raise ValueError(f"Unknown compression codec {codec!r}")
+    return found
+
+
+def is_compressed(header: MessageHeader) -> bool:
+    """Check whether a header describes compressed message data"""
+    return bool(header.is_dynamic & cd.IS_DYNAMIC_CODEC_MASK)
+
+
+def compress_payload(
+    header: MessageHeader, payload: Any, codec: Codec
+) -> Optional[bytes]:
+    """Compress message data and mark its header
+
+    Args:
+        header (MessageHeader): Header of a full-size message
+        payload: Message data object or bytes-like object
+        codec (Codec): Codec to compress with
+
+    Returns:
+        The compressed bytes, or None if compression does not make the
+        message smaller, in which case the header is unchanged
+    """
+    compressed = codec.compress(memoryview(payload).cast("B").tobytes())
+    if len(compressed) >= header.num_data_bytes:
+        return None
+
+    header.remaining_bytes = header.num_data_bytes - len(compressed)
+    header.num_data_bytes = len(compressed)
+    header.is_dynamic |= codec.codec_id << cd.IS_DYNAMIC_CODEC_SHIFT
+    return compressed
+
+
+def restore_header(header: MessageHeader) -> Codec:
+    """Restore a compressed header to describe the full-size message data
+
+    Args:
+        header (MessageHeader): Header of a compressed message
+
+    Raises:
+        ValueError: Codec of the message is not registered
+
+    Returns:
+        Codec: Codec the message data was compressed with
+    """
+    codec_id = (
+        header.is_dynamic & cd.IS_DYNAMIC_CODEC_MASK
+    ) >> cd.IS_DYNAMIC_CODEC_SHIFT
+    codec = get_codec(codec_id)
+    header.num_data_bytes += header.remaining_bytes
+    header.remaining_bytes = 0
+    header.is_dynamic &= ~cd.IS_DYNAMIC_CODEC_MASK
+    return codec
+
+
+def _decompress(codec: Codec, payload: Any, size: int) -> bytearray:
+    data = bytearray(codec.decompress(bytes(payload), size))
+    if len(data) != size:
+        raise ValueError(
+            f"Message data decompressed with {codec.name} to {len(data)} bytes, expected {size}"
+        )
+    return data
+
+
+def decompress_payload(
+    header: MessageHeader, payload: Any, max_size: Optional[int] = None
+) -> bytearray:
+    """Restore a compressed header and decompress its message data
+
+    Args:
+        header (MessageHeader): Header of a compressed message
+        payload: Compressed message data bytes
+        max_size (optional): Largest accepted message data size. Defaults to None (no limit).
+
+    Raises:
+        ValueError: Unknown codec, size limit exceeded or corrupt message data
+
+    Returns:
+        bytearray: Full-size message data
+    """
+    codec = restore_header(header)
+    if max_size is not None and header.num_data_bytes > max_size:
+        raise ValueError(
+            f"Compressed message data expands to {header.num_data_bytes} bytes, more than {max_size}"
+        )
+    try:
+        return _decompress(codec, payload, header.num_data_bytes)
+    except (zlib.error, lzma.LZMAError) as e:
+        raise ValueError(f"Corrupt {codec.name} message data: {e}") from e
+
+
+class CompressedMessage(LazyMessage):
+    """Message whose data is decompressed and decoded on first access
+
+    Args:
+        header: Message header, restored to the full-size message data
+        msg_cls: Message data class
+        payload: Compressed message data bytes
+        codec: Codec the message data was compressed with
+    """
+
+    def __init__(
+        self,
+        header: MessageHeader,
+        msg_cls: Type[MessageData],
+        payload: bytearray,
+        codec: Codec,
+    ):
+        super().__init__(header, msg_cls, payload)
+        self._codec: Optional[Codec] = codec
+
+    @property
+    def data(self) -> MessageData:
+        if self._data is None and self._codec is not None:
+            try:
+                payload = _decompress(
+                    self._codec, self._payload, self.header.num_data_bytes
+                )
+            except (ValueError, zlib.error, lzma.LZMAError) as e:
+                raise InvalidMessageDefinition(
+                    f"Could not decompress message data of {self.name}: {e}"
+                ) from e
+            self._payload = payload
+            self._codec = None
+        return LazyMessage.data.fget(self)  # type: ignore
+
+    @data.setter
+    def data(self, value: MessageData):
+        self._data = value
@@ -56,6 +56,25 @@ MAX_NAME_LEN: int = 32
 MAX_LOG_LENGTH: int = 1024
 MESSAGE_TRAFFIC_SIZE: int = 64
 MAX_MESSAGE_SIZE: int = 65535
+GROUP_ROUND_ROBIN: int = 0
+GROUP_HASH_SOURCE: int = 1
+GROUP_HASH_FIELD: int = 2
+MM_CAP_SUBSCRIBE_MANY: int = 1
+MM_CAP_GROUPS: int = 2
+MM_CAP_RANGES: int = 4
+MM_CAP_TIME_SYNC: int = 8
+MM_CAP_COMPACT: int = 16
+MM_CAP_COMPRESSION: int = 32
+MM_CAP_ENVELOPE: int = 64
+CLIENT_CAP_COMPACT: int = 1
+CLIENT_CAP_COMPRESSION: int = 2
+CLIENT_CAP_ENVELOPE: int = 4
+IS_DYNAMIC_COMPACT: int = 1
+IS_DYNAMIC_CODEC_SHIFT: int = 8
+IS_DYNAMIC_CODEC_MASK: int = 65280
+CODEC_ZLIB: int = 1
+CODEC_LZMA: int = 2
+BLOB_FRAGMENT_SIZE: int = 61440
 
 # String Constants
 
@@ -114,6 +133,19 @@ MT_DISCONNECT: int = 14
 MT_SUBSCRIBE: int = 15
 MT_UNSUBSCRIBE: int = 16
 MT_SHUTDOWN_RTMA: int = 17
+MT_SUBSCRIBE_GROUP: int = 18
+MT_UNSUBSCRIBE_GROUP: int = 19
+MT_SUBSCRIBE_RANGE: int = 20
+MT_UNSUBSCRIBE_RANGE: int = 21
+MT_SUBSCRIBE_MANY: int = 22
+MT_UNSUBSCRIBE_MANY: int = 23
+MT_CLIENT_LATENCY_STATS: int = 24
+MT_TIME_SYNC_REQUEST: int = 25
+MT_TIME_SYNC_REPLY: int = 27
+MT_BLOB_FRAGMENT: int = 28
+MT_BLOB_ACK: int = 29
+MT_CLIENT_CAPABILITIES: int = 30
+MT_ENVELOPE: int = 35
 MT_MODULE_READY: int = 26
 MT_ACTIVE_CLIENTS: int = 31
 MT_CLIENT_INFO: int = 32
@@ -686,6 +718,215 @@ class MDF_SHUTDOWN_RTMA(MessageData, metaclass=MessageMeta):
     type_def: ClassVar[str] = "'SHUTDOWN_RTMA:\n  id: 17\n  fields: null'"
 
 
+@pyrtma.message_def
+class MDF_SUBSCRIBE_GROUP(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 18
+    type_name: ClassVar[str] = "SUBSCRIBE_GROUP"
+    type_hash: ClassVar[int] = 0xC3158266
+    type_size: ClassVar[int] = 48
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'SUBSCRIBE_GROUP:\n  id: 18\n  fields:\n    msg_type: MSG_TYPE\n    policy: int32\n    key_offset: int32\n    key_size: int32\n    group: char[MAX_NAME_LEN]'"
+    )
+
+    msg_type: Int32 = Int32()
+    policy: Int32 = Int32()
+    key_offset: Int32 = Int32()
+    key_size: Int32 = Int32()
+    group: String = String(32)
+
+
+@pyrtma.message_def
+class MDF_UNSUBSCRIBE_GROUP(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 19
+    type_name: ClassVar[str] = "UNSUBSCRIBE_GROUP"
+    type_hash: ClassVar[int] = 0x990D2D2E
+    type_size: ClassVar[int] = 40
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'UNSUBSCRIBE_GROUP:\n  id: 19\n  fields:\n    msg_type: MSG_TYPE\n    reserved: int32\n    group: char[MAX_NAME_LEN]'"
+    )
+
+    msg_type: Int32 = Int32()
+    reserved: Int32 = Int32()
+    group: String = String(32)
+
+
+@pyrtma.message_def
+class MDF_SUBSCRIBE_RANGE(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 20
+    type_name: ClassVar[str] = "SUBSCRIBE_RANGE"
+    type_hash: ClassVar[int] = 0x641B9A84
+    type_size: ClassVar[int] = 8
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'SUBSCRIBE_RANGE:\n  id: 20\n  fields:\n    first_type: MSG_TYPE\n    last_type: MSG_TYPE'"
+    )
+
+    first_type: Int32 = Int32()
+    last_type: Int32 = Int32()
+
+
+@pyrtma.message_def
+class MDF_UNSUBSCRIBE_RANGE(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 21
+    type_name: ClassVar[str] = "UNSUBSCRIBE_RANGE"
+    type_hash: ClassVar[int] = 0xE4CE119A
+    type_size: ClassVar[int] = 8
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'UNSUBSCRIBE_RANGE:\n  id: 21\n  fields:\n    first_type: MSG_TYPE\n    last_type: MSG_TYPE'"
+    )
+
+    first_type: Int32 = Int32()
+    last_type: Int32 = Int32()
+
+
+@pyrtma.message_def
+class MDF_SUBSCRIBE_MANY(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 22
+    type_name: ClassVar[str] = "SUBSCRIBE_MANY"
+    type_hash: ClassVar[int] = 0x170F6D8C
+    type_size: ClassVar[int] = 1032
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'SUBSCRIBE_MANY:\n  id: 22\n  fields:\n    num_types: int32\n    reserved: int32\n    msg_types: MSG_TYPE[MAX_SUBS]'"
+    )
+
+    num_types: Int32 = Int32()
+    reserved: Int32 = Int32()
+    msg_types: IntArray[Int32] = IntArray(Int32, 256)
+
+
+@pyrtma.message_def
+class MDF_UNSUBSCRIBE_MANY(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 23
+    type_name: ClassVar[str] = "UNSUBSCRIBE_MANY"
+    type_hash: ClassVar[int] = 0xE4AF5934
+    type_size: ClassVar[int] = 1032
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'UNSUBSCRIBE_MANY:\n  id: 23\n  fields:\n    num_types: int32\n    reserved: int32\n    msg_types: MSG_TYPE[MAX_SUBS]'"
+    )
+
+    num_types: Int32 = Int32()
+    reserved: Int32 = Int32()
+    msg_types: IntArray[Int32] = IntArray(Int32, 256)
+
+
+@pyrtma.message_def
+class MDF_CLIENT_LATENCY_STATS(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 24
+    type_name: ClassVar[str] = "CLIENT_LATENCY_STATS"
+    type_hash: ClassVar[int] = 0x29A05CF8
+    type_size: ClassVar[int] = 64
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'CLIENT_LATENCY_STATS:\n  id: 24\n  fields:\n    msg_type: MSG_TYPE\n    count: int32\n    gaps: int32\n    lost: int32\n    min: double\n    mean: double\n    p50: double\n    p90: double\n    p99: double\n    max: double'"
+    )
+
+    msg_type: Int32 = Int32()
+    count: Int32 = Int32()
+    gaps: Int32 = Int32()
+    lost: Int32 = Int32()
+    min: Double = Double()
+    mean: Double = Double()
+    p50: Double = Double()
+    p90: Double = Double()
+    p99: Double = Double()
+    max: Double = Double()
+
+
+@pyrtma.message_def
+class MDF_TIME_SYNC_REQUEST(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 25
+    type_name: ClassVar[str] = "TIME_SYNC_REQUEST"
+    type_hash: ClassVar[int] = 0x75605350
+    type_size: ClassVar[int] = 8
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'TIME_SYNC_REQUEST:\n  id: 25\n  fields:\n    client_send_time: double'"
+    )
+
+    client_send_time: Double = Double()
+
+
+@pyrtma.message_def
+class MDF_TIME_SYNC_REPLY(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 27
+    type_name: ClassVar[str] = "TIME_SYNC_REPLY"
+    type_hash: ClassVar[int] = 0x1DB8108D
+    type_size: ClassVar[int] = 24
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'TIME_SYNC_REPLY:\n  id: 27\n  fields:\n    client_send_time: double\n    manager_recv_time: double\n    manager_send_time: double'"
+    )
+
+    client_send_time: Double = Double()
+    manager_recv_time: Double = Double()
+    manager_send_time: Double = Double()
+
+
+@pyrtma.message_def
+class MDF_BLOB_FRAGMENT(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 28
+    type_name: ClassVar[str] = "BLOB_FRAGMENT"
+    type_hash: ClassVar[int] = 0x0A407751
+    type_size: ClassVar[int] = 61472
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'BLOB_FRAGMENT:\n  id: 28\n  fields:\n    blob_type: MSG_TYPE\n    blob_id: int32\n    seq: int32\n    num_fragments: int32\n    ack_every: int32\n    num_bytes: int32\n    total_size: int64\n    data: uint8[BLOB_FRAGMENT_SIZE]'"
+    )
+
+    blob_type: Int32 = Int32()
+    blob_id: Int32 = Int32()
+    seq: Int32 = Int32()
+    num_fragments: Int32 = Int32()
+    ack_every: Int32 = Int32()
+    num_bytes: Int32 = Int32()
+    total_size: Int64 = Int64()
+    data: IntArray[Uint8] = IntArray(Uint8, 61440)
+
+
+@pyrtma.message_def
+class MDF_BLOB_ACK(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 29
+    type_name: ClassVar[str] = "BLOB_ACK"
+    type_hash: ClassVar[int] = 0x63AF0848
+    type_size: ClassVar[int] = 8
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'BLOB_ACK:\n  id: 29\n  fields:\n    blob_id: int32\n    seq: int32'"
+    )
+
+    blob_id: Int32 = Int32()
+    seq: Int32 = Int32()
+
+
+@pyrtma.message_def
+class MDF_CLIENT_CAPABILITIES(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 30
+    type_name: ClassVar[str] = "CLIENT_CAPABILITIES"
+    type_hash: ClassVar[int] = 0x7C21EB11
+    type_size: ClassVar[int] = 4
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = (
+        "'CLIENT_CAPABILITIES:\n  id: 30\n  fields:\n    capabilities: int32'"
+    )
+
+    capabilities: Int32 = Int32()
+
+
+@pyrtma.message_def
+class MDF_ENVELOPE(MessageData, metaclass=MessageMeta):
+    type_id: ClassVar[int] = 35
+    type_name: ClassVar[str] = "ENVELOPE"
+    type_hash: ClassVar[int] = 0x913500D0
+    type_size: ClassVar[int] = 0
+    type_source: ClassVar[str] = "core_defs.yaml"
+    type_def: ClassVar[str] = "'ENVELOPE:\n  id: 35\n  fields: null'"
+
+
 @pyrtma.message_def
 class MDF_MODULE_READY(MessageData, metaclass=MessageMeta):
     type_id: ClassVar[int] = 26
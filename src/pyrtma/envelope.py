@@ -0,0 +1,79 @@
+"""pyrtma.envelope module
+
+Helpers for ENVELOPE messages, which pack many small messages into one frame
+
+The data of an ENVELOPE is a sequence of complete messages, each a header
+followed by its full-size message data, exactly as they would be sent one
+by one. All messages in an envelope share one message type and one
+destination, so the message manager routes the envelope like a single
+message of that type. It forwards the envelope intact to clients that
+declared CLIENT_CAP_ENVELOPE and sends the packed messages as separate
+frames, still with one socket write, to all other clients.
+"""
+
+import ctypes
+import struct
+
+from . import core_defs as cd
+from .header import MessageHeader
+
+from typing import Any, List, Type
+
+__all__ = ["envelope_offsets"]
+
+_int16 = struct.Struct("h")
+_int32 = struct.Struct("i")
+
+
+def envelope_offsets(header_cls: Type[MessageHeader], payload: Any) -> List[int]:
+    """Find the messages packed in the data of an ENVELOPE message
+
+    Args:
+        header_cls: Message header class of the connection
+        payload: ENVELOPE message data
+
+    Raises:
+        ValueError: Malformed envelope, or the messages do not share one
+            message type and destination, or are core messages
+
+    Returns:
+        Offsets of the packed message headers in payload
+    """
+    header_size = ctypes.sizeof(header_cls)
+    type_offset = header_cls._msg_type.offset  # type: ignore
+    size_offset = header_cls._num_data_bytes.offset  # type: ignore
+    dest_mod_offset = header_cls._dest_mod_id.offset  # type: ignore
+    dest_host_offset = header_cls._dest_host_id.offset  # type: ignore
+    dynamic_offset = header_cls._is_dynamic.offset  # type: ignore
+
+    size = len(payload)
+    offsets: List[int] = []
+    offset = 0
+    route = None
+    while offset < size:
+        if size - offset < header_size:
+            raise ValueError("Envelope ends with a partial message header")
+
+        (msg_type,) = _int32.unpack_from(payload, offset + type_offset)
+        (num_data_bytes,) = _int32.unpack_from(payload, offset + size_offset)
+        (dest_mod_id,) = _int16.unpack_from(payload, offset + dest_mod_offset)
+        (dest_host_id,) = _int16.unpack_from(payload, offset + dest_host_offset)
+        (is_dynamic,) = _int32.unpack_from(payload, offset + dynamic_offset)
+
+        if num_data_bytes < 0 or offset + header_size + num_data_bytes > size:
+            raise ValueError("Envelope ends with a partial message")
+        if msg_type <= cd.MAX_RTMA_MSG_TYPE:
+            raise ValueError(f"Core message type {msg_type} cannot be enveloped")
+        if is_dynamic:
+            raise ValueError("Enveloped messages must be sent at full size")
+        if route is None:
+            route = (msg_type, dest_mod_id, dest_host_id)
+        elif route != (msg_type, dest_mod_id, dest_host_id):
+            raise ValueError(
+                "Enveloped messages must share one message type and destination"
+            )
+
+        offsets.append(offset)
+        offset += header_size + num_data_bytes
+
+    return offsets
@@ -64,6 +64,18 @@ class AcknowledgementTimeout(ClientError):
     pass
 
 
+class TimeSyncTimeout(ClientError):
+    """Raised when client does not receive a time sync reply from message manager."""
+
+    pass
+
+
+class RequestTimeout(ClientError):
+    """Raised when client does not receive a reply to a request."""
+
+    pass
+
+
 class InvalidDestinationModule(ClientError):
     """Raised when client tries to send to an invalid module."""
 
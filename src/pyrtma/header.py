@@ -43,16 +43,41 @@ class TimeCodeMessageHeader(MessageHeader, metaclass=MessageMeta):
     utc_fraction: Uint32 = Uint32()
 
 
-def get_header_cls(timecode: bool = False) -> Type[MessageHeader]:
+class HopTimeMessageHeader(MessageHeader, metaclass=MessageMeta):
+    """Variant of MessageHeader with message manager hop timestamps
+
+    mm_recv_time is when the message manager read the message and mm_send_time
+    is when it wrote the message to this destination.
+    """
+
+    mm_recv_time: Double = Double()
+    mm_send_time: Double = Double()
+
+
+class TimeCodeHopTimeMessageHeader(TimeCodeMessageHeader, metaclass=MessageMeta):
+    """Variant of TimeCodeMessageHeader with message manager hop timestamps"""
+
+    mm_recv_time: Double = Double()
+    mm_send_time: Double = Double()
+
+
+def get_header_cls(
+    timecode: bool = False, hop_times: bool = False
+) -> Type[MessageHeader]:
     """Get the correct header class depending on whether timecode is used
 
     Args:
         timecode (bool, optional): Flag indicating if timecode fields are needed. Defaults to False.
+        hop_times (bool, optional): Flag indicating if message manager hop timestamps are needed. Defaults to False.
 
     Returns:
         Type[MessageHeader]: MessageHeader class
     """
-    if timecode:
+    if timecode and hop_times:
+        return TimeCodeHopTimeMessageHeader
+    elif timecode:
         return TimeCodeMessageHeader
+    elif hop_times:
+        return HopTimeMessageHeader
     else:
         return MessageHeader
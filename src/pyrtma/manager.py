@@ -5,6 +5,7 @@ Contains :py:class:`~MessageManager` class
 
 import socket
 import select
+import struct
 import argparse
 import logging
 import time
@@ -12,24 +13,40 @@ import random
 import ctypes
 import os
 import typing
+import zlib
+import bisect
 
 
 from .client_logging import RTMALogger, ClientLike
 from .validators import disable_message_validation
-from .message import Message
+from .message import Message, get_msg_cls
 from .header import MessageHeader, get_header_cls
 from .message_data import MessageData
 from .context import _get_core_defs
+from .recorder import TrafficRecorder
+from .compact import trimmed_size, is_compact, compact_header, expand_header
+from .compression import is_compressed, decompress_payload
+from .envelope import envelope_offsets
+from .socket_profile import (
+    SocketProfile,
+    SOCKET_PROFILES,
+    get_socket_profile,
+)
+from .exceptions import SocketOptionError, UnknownMessageType
 from .core_defs import ALL_MESSAGE_TYPES
 from . import core_defs as cd
 
-from typing import Dict, List, Tuple, Set, Type, Union, Optional
+from typing import Dict, Iterator, List, Tuple, Set, FrozenSet, Type, Union, Optional
 from itertools import chain
 from dataclasses import dataclass, field
 from collections import defaultdict, Counter
 from contextlib import contextmanager
 from contextvars import ContextVar
 
+# Stamps header fields of messages packed in an envelope in place
+_int32 = struct.Struct("i")
+_double = struct.Struct("d")
+
 
 @dataclass
 class Module:
@@ -46,12 +63,18 @@ class Module:
     mod_id: int = 0
     pid: int = 0
     subs: Set[int] = field(default_factory=set)
+    groups: Set[Tuple[int, str]] = field(default_factory=set)
+    ranges: Set[Tuple[int, int]] = field(default_factory=set)
     connected: bool = False
     is_logger: bool = False
     is_daemon: bool = False
     unique: bool = True
     drops: int = 0
     msg_count: int = 0
+    hop_times: bool = False
+    compact: bool = False
+    compressed: bool = False
+    envelopes: bool = False
 
     @property
     def ipaddr(self) -> str:
@@ -78,10 +101,61 @@ class Module:
         """
         self.msg_count += 1
         header.msg_count = self.msg_count
+        if self.hop_times:
+            header.mm_send_time = time.perf_counter()  # type: ignore
+
+        if (
+            self.compact
+            and header.num_data_bytes
+            and header.msg_type != cd.MT_ENVELOPE
+            and not is_compressed(header)
+        ):
+            size = trimmed_size(payload)
+            if size < header.num_data_bytes:
+                compact_header(header, size)
+                try:
+                    self.conn.sendall(header)
+                    self.conn.sendall(memoryview(payload).cast("B")[:size])
+                finally:
+                    expand_header(header)
+                return
 
         self.conn.sendall(header)
         self.conn.sendall(payload)
 
+    def send_unpacked(self, frames: memoryview, offsets: List[int]):
+        """Send the messages packed in an envelope as separate frames with one write
+
+        Args:
+            frames (memoryview): ENVELOPE message data. The msg_count of each
+                packed header is stamped in place.
+            offsets (List[int]): Offsets of the packed headers in frames
+        """
+        count_offset = self.header_cls._msg_count.offset  # type: ignore
+        send_time = time.perf_counter()
+        for offset in offsets:
+            self.msg_count += 1
+            _int32.pack_into(frames, offset + count_offset, self.msg_count)
+            if self.hop_times:
+                _double.pack_into(
+                    frames,
+                    offset + self.header_cls._mm_send_time.offset,  # type: ignore
+                    send_time,
+                )
+
+        self.conn.sendall(frames)
+
+    def count_drop(self, count: int = 1):
+        """Count messages that could not be delivered to this module
+
+        msg_count still advances, so the module sees a gap in its message counts.
+
+        Args:
+            count (optional): Number of frames the module missed. Defaults to 1.
+        """
+        self.drops += 1
+        self.msg_count += count
+
     def send_ack(self):
         """Send ACKNOWLEDGE signal header"""
         # Just send a header
@@ -109,6 +183,124 @@ class Module:
         return self.conn.__hash__()
 
 
+@dataclass
+class ConsumerGroup:
+    """ConsumerGroup dataclass
+
+    Used internally by MessageManager to load balance a message type across
+    the members of a named group. Each message is delivered to exactly one member.
+    """
+
+    name: str
+    msg_type: int
+    policy: int = cd.GROUP_ROUND_ROBIN
+    key_offset: int = 0
+    key_size: int = 0
+    members: List[Module] = field(default_factory=list)
+    next_member: int = 0
+
+    def select_member(
+        self, header: MessageHeader, data: Union[bytes, MessageData], wlist: List
+    ) -> Module:
+        """Select the group member that receives a message
+
+        Args:
+            header (MessageHeader): Message header
+            data (Union[bytes, MessageData]): Message data
+            wlist (List): Sockets that are currently ready for writing
+
+        Returns:
+            Module: Selected group member
+        """
+        n = len(self.members)
+        if self.policy == cd.GROUP_HASH_SOURCE:
+            return self.members[header.src_mod_id % n]
+        elif (
+            self.policy == cd.GROUP_HASH_FIELD
+            and self.key_offset + self.key_size <= header.num_data_bytes
+        ):
+            key = memoryview(data).cast("B")[
+                self.key_offset : self.key_offset + self.key_size
+            ]
+            return self.members[zlib.crc32(key) % n]
+
+        # Round-robin (also used if a hash key does not fit in the received payload), skipping members that are not ready for writing
+        for i in range(n):
+            module = self.members[(self.next_member + i) % n]
+            if module.conn in wlist:
+                break
+        else:
+            i = 0
+            module = self.members[self.next_member % n]
+        self.next_member = (self.next_member + i + 1) % n
+        return module
+
+
+class RangeIndex:
+    """Interval index of message type range subscriptions
+
+    Used internally by MessageManager. The subscribed ranges are flattened into
+    sorted, non-overlapping segments so that the subscribers for a message type
+    can be found with a single binary search.
+    """
+
+    _empty: FrozenSet[Module] = frozenset()
+
+    def __init__(self):
+        self.ranges: Dict[Tuple[int, int], Set[Module]] = defaultdict(set)
+        self._starts: List[int] = []
+        self._segments: List[FrozenSet[Module]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.ranges)
+
+    def add(self, first: int, last: int, module: Module):
+        """Add a module subscription to the inclusive range [first, last]"""
+        self.ranges[(first, last)].add(module)
+        self._rebuild()
+
+    def remove(self, first: int, last: int, module: Module):
+        """Remove a module subscription to the inclusive range [first, last]"""
+        modules = self.ranges.get((first, last))
+        if modules is None:
+            return
+
+        modules.discard(module)
+        if not modules:
+            del self.ranges[(first, last)]
+        self._rebuild()
+
+    def lookup(self, msg_type: int) -> FrozenSet[Module]:
+        """Get the modules with a range subscription covering msg_type"""
+        i = bisect.bisect_right(self._starts, msg_type) - 1
+        if i < 0:
+            return RangeIndex._empty
+        return self._segments[i]
+
+    def _rebuild(self):
+        # Segment boundaries are every range start and every (range end + 1).
+        # Sweep over them in order, tracking how many ranges cover each module.
+        events: Dict[int, List[Tuple[Set[Module], int]]] = defaultdict(list)
+        for (first, last), modules in self.ranges.items():
+            events[first].append((modules, 1))
+            events[last + 1].append((modules, -1))
+
+        active: Counter = Counter()
+        starts: List[int] = []
+        segments: List[FrozenSet[Module]] = []
+        for point in sorted(events):
+            for modules, delta in events[point]:
+                for module in modules:
+                    active[module] += delta
+                    if not active[module]:
+                        del active[module]
+            starts.append(point)
+            segments.append(frozenset(active))
+
+        self._starts = starts
+        self._segments = segments
+
+
 class MessageManager(ClientLike):
     """MessageManager class
 
@@ -117,15 +309,31 @@ class MessageManager(ClientLike):
 
     INFO_INTERVAL = 5.0
 
+    # Optional features advertised to clients in the CONNECT acknowledgement
+    CAPABILITIES = (
+        cd.MM_CAP_SUBSCRIBE_MANY
+        | cd.MM_CAP_GROUPS
+        | cd.MM_CAP_RANGES
+        | cd.MM_CAP_TIME_SYNC
+        | cd.MM_CAP_COMPACT
+        | cd.MM_CAP_COMPRESSION
+        | cd.MM_CAP_ENVELOPE
+    )
+
     def __init__(
         self,
         ip_address: str = "",  # "" equivalent to socket.INADDR_ANY
         port: int = 7111,
         timecode=False,
+        hop_times=False,
         log_level=logging.INFO,
         debug=False,
         send_msg_timing=True,
         send_active_clients=True,
+        record_file: Optional[str] = None,
+        record_format: str = "raw",
+        socket_profile: Union[str, SocketProfile] = "default",
+        logger_socket_profile: Union[str, SocketProfile] = "logger",
     ):
         """MessageManager class
 
@@ -135,16 +343,24 @@ class MessageManager(ClientLike):
             ip_address (str, optional): server IP address. Defaults to "".
             port (int, optional): server port. Defaults to 7111.
             timecode (bool, optional): Flag to use message header with timecode values. Defaults to False.
+            hop_times (bool, optional): Flag to stamp the time each message is read and written by the manager
+                in the message header. Clients must use the same header. Defaults to False.
             log_level (int, optional): logging level, defaults to logging.INFO.
             debug (bool, optional): Flag for debug mode. Defaults to False.
             send_msg_timing (bool, optional): Flag to send TIMING_MSG. Defaults to True.
             send_active_clients (bool, optional): Flag to send ACTIVE_CLIENTS. Defaults to True.
+            record_file (str, optional): Path of a file to record all message traffic to. Defaults to None (disabled).
+            record_format (str, optional): Recording format, "raw" or "indexed". Defaults to "raw".
+            socket_profile (Union[str, SocketProfile], optional): Socket tuning profile for client connections. Defaults to "default".
+            logger_socket_profile (Union[str, SocketProfile], optional): Socket tuning profile applied once a client
+                connects as a logger module. Defaults to "logger".
         """
         self._keep_running = False
         self.ip_address = ip_address
         self.port = port
 
-        self.header_cls = get_header_cls(timecode)
+        self.hop_times = hop_times
+        self.header_cls = get_header_cls(timecode, hop_times)
         self.header_size = ctypes.sizeof(self.header_cls)
         self.header_buffer = bytearray(self.header_size)
         self.header_view = memoryview(self.header_buffer)
@@ -154,6 +370,8 @@ class MessageManager(ClientLike):
         self._debug = debug
         self.send_msg_timing = send_msg_timing
         self.send_active_clients_msg = send_active_clients
+        self.socket_profile = get_socket_profile(socket_profile)
+        self.logger_socket_profile = get_socket_profile(logger_socket_profile)
 
         self._logger = RTMALogger(f"message_manager", self, logging.INFO)
         self.logger.set_all_levels(log_level)
@@ -172,6 +390,8 @@ class MessageManager(ClientLike):
         self.next_dynamic_mod_id_offset = 0
 
         self.subscriptions: Dict[int, Set[Module]] = defaultdict(set)
+        self.groups: Dict[int, Dict[str, ConsumerGroup]] = defaultdict(dict)
+        self.range_index = RangeIndex()
         self.sockets = [self.listen_socket]
         self.start_time = time.time()
 
@@ -196,6 +416,7 @@ class MessageManager(ClientLike):
             conn=self.listen_socket,
             address=(ip_address, port),
             header_cls=self.header_cls,
+            hop_times=hop_times,
             name="message_manager",
             mod_id=0,
             pid=os.getpid(),
@@ -208,6 +429,18 @@ class MessageManager(ClientLike):
         self.data_buffer = bytearray(1024**2)
         self.data_view = memoryview(self.data_buffer)
 
+        # Decompressed copy of the compressed message being forwarded
+        self._decompressed: Union[Tuple[MessageHeader, bytearray], bool, None] = None
+
+        # Offsets of the messages packed in the envelope being forwarded
+        self._envelope: Optional[List[int]] = None
+
+        # Optional built-in traffic recorder
+        self.recorder: Optional[TrafficRecorder] = None
+        if record_file:
+            self.recorder = TrafficRecorder(record_file, record_format)
+            self.logger.info(f"Recording message traffic to {record_file}")
+
         # Address Reuse allowed for testing
         if debug:
             self.listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -334,6 +567,12 @@ class MessageManager(ClientLike):
 
         if module.is_logger:
             self.logger_modules.add(module)
+            try:
+                self.logger_socket_profile.apply(module.conn)
+            except SocketOptionError as e:
+                self.logger.warning(
+                    f"Unable to apply logger socket profile to {module!s} - {e!s}"
+                )
 
         return True
 
@@ -347,6 +586,12 @@ class MessageManager(ClientLike):
         for msg_type in module.subs:
             self.subscriptions[msg_type].discard(module)
 
+        for msg_type, group_name in list(module.groups):
+            self.remove_group_member(module, msg_type, group_name)
+
+        for first, last in module.ranges:
+            self.range_index.remove(first, last, module)
+
         # Discard from logger module set if needed
         self.logger_modules.discard(module)
 
@@ -369,39 +614,91 @@ class MessageManager(ClientLike):
 
         Args:
             src_module (Module): Subscribing module
-            msg (Message): incoming SUBSCRIBE message
+            msg (Message): incoming SUBSCRIBE, SUBSCRIBE_MANY, SUBSCRIBE_GROUP or SUBSCRIBE_RANGE message
         """
+        if msg.header.msg_type == cd.MT_SUBSCRIBE_GROUP:
+            group_sub = cd.MDF_SUBSCRIBE_GROUP.from_buffer(msg.data)
+            self.add_group_member(src_module, group_sub)
+            return
+        elif msg.header.msg_type == cd.MT_SUBSCRIBE_RANGE:
+            range_sub = cd.MDF_SUBSCRIBE_RANGE.from_buffer(msg.data)
+            self.add_range_subscription(
+                src_module, range_sub.first_type, range_sub.last_type
+            )
+            return
+
+        elif msg.header.msg_type == cd.MT_SUBSCRIBE_MANY:
+            sub_many = cd.MDF_SUBSCRIBE_MANY.from_buffer(msg.data)
+            for msg_type in sub_many.msg_types[: max(sub_many.num_types, 0)]:
+                self.subscribe_type(src_module, msg_type)
+            return
+
         sub = cd.MDF_SUBSCRIBE.from_buffer(msg.data)
+        self.subscribe_type(src_module, sub.msg_type)
 
-        if sub.msg_type == ALL_MESSAGE_TYPES:
-            self.subscriptions[sub.msg_type].add(src_module)
+    def subscribe_type(self, src_module: Module, msg_type: int):
+        """Subscribe a module to a single message type
+
+        Args:
+            src_module (Module): Subscribing module
+            msg_type (int): Message type ID, or ALL_MESSAGE_TYPES
+        """
+        if msg_type == ALL_MESSAGE_TYPES:
+            self.subscriptions[msg_type].add(src_module)
 
             # Clear out the individual subs
             for sub_type in src_module.subs:
                 self.subscriptions[sub_type].discard(src_module)
             src_module.subs.clear()
 
-            src_module.subs.add(sub.msg_type)
+            src_module.subs.add(msg_type)
             self.logger.debug(f"SUBSCRIBE- {src_module!s} to ALL_MESSAGE_TYPES")
         else:
             # Ignore individual msg_types subs when subscribed to ALL_MESSAGE_TYPES
             if src_module.sub_all:
                 return
-            self.subscriptions[sub.msg_type].add(src_module)
-            src_module.subs.add(sub.msg_type)
-            self.logger.debug(f"SUBSCRIBE- {src_module!s} to MT:{sub.msg_type}")
+            self.subscriptions[msg_type].add(src_module)
+            src_module.subs.add(msg_type)
+            self.logger.debug(f"SUBSCRIBE- {src_module!s} to MT:{msg_type}")
 
     def remove_subscription(self, src_module: Module, msg: Message):
         """Remove message subscription
 
         Args:
             src_module (Module): Unsubscribing module
-            msg (Message): incoming UNSUBSCRIBE message
+            msg (Message): incoming UNSUBSCRIBE, UNSUBSCRIBE_MANY, UNSUBSCRIBE_GROUP or UNSUBSCRIBE_RANGE message
         """
+        if msg.header.msg_type == cd.MT_UNSUBSCRIBE_GROUP:
+            group_unsub = cd.MDF_UNSUBSCRIBE_GROUP.from_buffer(msg.data)
+            self.remove_group_member(
+                src_module, group_unsub.msg_type, group_unsub.group
+            )
+            return
+        elif msg.header.msg_type == cd.MT_UNSUBSCRIBE_RANGE:
+            range_unsub = cd.MDF_UNSUBSCRIBE_RANGE.from_buffer(msg.data)
+            self.remove_range_subscription(
+                src_module, range_unsub.first_type, range_unsub.last_type
+            )
+            return
+
+        elif msg.header.msg_type == cd.MT_UNSUBSCRIBE_MANY:
+            unsub_many = cd.MDF_UNSUBSCRIBE_MANY.from_buffer(msg.data)
+            for msg_type in unsub_many.msg_types[: max(unsub_many.num_types, 0)]:
+                self.unsubscribe_type(src_module, msg_type)
+            return
+
         unsub = cd.MDF_UNSUBSCRIBE.from_buffer(msg.data)
+        self.unsubscribe_type(src_module, unsub.msg_type)
 
-        if unsub.msg_type == ALL_MESSAGE_TYPES:
-            self.subscriptions[unsub.msg_type].discard(src_module)
+    def unsubscribe_type(self, src_module: Module, msg_type: int):
+        """Unsubscribe a module from a single message type
+
+        Args:
+            src_module (Module): Unsubscribing module
+            msg_type (int): Message type ID, or ALL_MESSAGE_TYPES
+        """
+        if msg_type == ALL_MESSAGE_TYPES:
+            self.subscriptions[msg_type].discard(src_module)
 
             # Clear out the individual subs
             for sub_type in src_module.subs:
@@ -413,9 +710,122 @@ class MessageManager(ClientLike):
             # Ignore individual msg_types unsubs when subscribed to ALL_MESSAGE_TYPES
             if src_module.sub_all:
                 return
-            self.subscriptions[unsub.msg_type].discard(src_module)
-            src_module.subs.discard(unsub.msg_type)
-            self.logger.debug(f"UNSUBSCRIBE- {src_module!s} from MT:{unsub.msg_type}")
+            self.subscriptions[msg_type].discard(src_module)
+            src_module.subs.discard(msg_type)
+            self.logger.debug(f"UNSUBSCRIBE- {src_module!s} from MT:{msg_type}")
+
+    def add_group_member(self, src_module: Module, sub: cd.MDF_SUBSCRIBE_GROUP):
+        """Add a module to a consumer group
+
+        Args:
+            src_module (Module): Subscribing module
+            sub (MDF_SUBSCRIBE_GROUP): Group subscription request
+        """
+        if sub.msg_type == ALL_MESSAGE_TYPES:
+            self.logger.error(
+                f"SUBSCRIBE_GROUP- {src_module!s} - Groups do not support ALL_MESSAGE_TYPES"
+            )
+            return
+
+        if sub.policy not in (
+            cd.GROUP_ROUND_ROBIN,
+            cd.GROUP_HASH_SOURCE,
+            cd.GROUP_HASH_FIELD,
+        ):
+            self.logger.error(
+                f"SUBSCRIBE_GROUP- {src_module!s} - Unknown group policy {sub.policy}"
+            )
+            return
+
+        if sub.policy == cd.GROUP_HASH_FIELD:
+            # The manager only knows the size of message types it has definitions for
+            try:
+                type_size = ctypes.sizeof(get_msg_cls(sub.msg_type))
+            except UnknownMessageType:
+                type_size = None
+
+            if (
+                sub.key_offset < 0
+                or sub.key_size <= 0
+                or (type_size is not None and sub.key_offset + sub.key_size > type_size)
+            ):
+                self.logger.error(
+                    f"SUBSCRIBE_GROUP- {src_module!s} - Invalid hash key (offset={sub.key_offset}, size={sub.key_size}) for MT:{sub.msg_type}"
+                )
+                return
+
+        group = self.groups[sub.msg_type].get(sub.group)
+        if group is None:
+            group = ConsumerGroup(sub.group, sub.msg_type)
+            self.groups[sub.msg_type][sub.group] = group
+
+        # The most recent member defines the group's distribution policy
+        group.policy = sub.policy
+        group.key_offset = sub.key_offset
+        group.key_size = sub.key_size
+
+        if src_module not in group.members:
+            group.members.append(src_module)
+        src_module.groups.add((sub.msg_type, sub.group))
+        self.logger.debug(
+            f"SUBSCRIBE_GROUP- {src_module!s} to MT:{sub.msg_type} in group '{sub.group}'"
+        )
+
+    def remove_group_member(self, src_module: Module, msg_type: int, group_name: str):
+        """Remove a module from a consumer group
+
+        Args:
+            src_module (Module): Unsubscribing module
+            msg_type (int): Message type of the group
+            group_name (str): Name of the group
+        """
+        src_module.groups.discard((msg_type, group_name))
+
+        group = self.groups[msg_type].get(group_name)
+        if group is None or src_module not in group.members:
+            return
+
+        group.members.remove(src_module)
+        if not group.members:
+            del self.groups[msg_type][group_name]
+        self.logger.debug(
+            f"UNSUBSCRIBE_GROUP- {src_module!s} from MT:{msg_type} in group '{group_name}'"
+        )
+
+    def add_range_subscription(self, src_module: Module, first: int, last: int):
+        """Add a message type range subscription
+
+        Args:
+            src_module (Module): Subscribing module
+            first (int): First message type of the range
+            last (int): Last message type of the range (inclusive)
+        """
+        if first > last or first < 0:
+            self.logger.error(
+                f"SUBSCRIBE_RANGE- {src_module!s} - Invalid range [{first}, {last}]"
+            )
+            return
+
+        self.range_index.add(first, last, src_module)
+        src_module.ranges.add((first, last))
+        self.logger.debug(f"SUBSCRIBE_RANGE- {src_module!s} to MT:[{first}, {last}]")
+
+    def remove_range_subscription(self, src_module: Module, first: int, last: int):
+        """Remove a message type range subscription
+
+        Args:
+            src_module (Module): Unsubscribing module
+            first (int): First message type of the range
+            last (int): Last message type of the range (inclusive)
+        """
+        if (first, last) not in src_module.ranges:
+            return
+
+        self.range_index.remove(first, last, src_module)
+        src_module.ranges.discard((first, last))
+        self.logger.debug(
+            f"UNSUBSCRIBE_RANGE- {src_module!s} from MT:[{first}, {last}]"
+        )
 
     def resume_subscription(self, src_module: Module, msg: Message):
         """Resume message subscription
@@ -471,6 +881,7 @@ class MessageManager(ClientLike):
         nbytes = sock.recv_into(
             self.header_buffer, self.header_size, socket.MSG_WAITALL
         )
+        recv_time = time.perf_counter()
 
         # Module that sent the message
         mod = self.modules[sock]
@@ -483,11 +894,19 @@ class MessageManager(ClientLike):
             return
 
         header = self.decode_header()
+        if self.hop_times:
+            header.mm_recv_time = recv_time  # type: ignore
+
+        # Compact messages are expanded here, so they are recorded, decoded
+        # and forwarded to legacy modules at full size
+        full_size = header.num_data_bytes
+        if is_compact(header):
+            full_size += header.remaining_bytes
 
         # Read Data Section into Internal Buffer
         data_size = header.num_data_bytes
-        if data_size:
-            if data_size > len(self.data_buffer):
+        if full_size:
+            if full_size > len(self.data_buffer) or full_size < data_size:
                 self.logger.warning(
                     "Message Data size (data_size) exceeds buffer size. Header may be corrupted."
                 )
@@ -503,6 +922,10 @@ class MessageManager(ClientLike):
                 self.remove_module(mod)
                 return
 
+        if full_size != data_size:
+            self.data_buffer[data_size:full_size] = bytes(full_size - data_size)
+            expand_header(header)
+
         return header
 
     def forward_message(
@@ -527,12 +950,22 @@ class MessageManager(ClientLike):
 
         src_name = src_module.name or f"Module({src_module.mod_id})"
 
+        # An envelope is routed like the messages packed in it
+        route = header
+        self._envelope = None
+        if header.msg_type == cd.MT_ENVELOPE:
+            route = self.open_envelope(src_name, header, data)  # type: ignore
+            if route is None:
+                return
+
         # Increment message counts
         if self.send_msg_timing:
-            self.message_counts[header.msg_type] += 1
+            self.message_counts[route.msg_type] += (
+                len(self._envelope) if self._envelope else 1
+            )
 
-        dest_mod_id = header.dest_mod_id
-        dest_host_id = header.dest_host_id
+        dest_mod_id = route.dest_mod_id
+        dest_host_id = route.dest_host_id
 
         # Verify that the module & host ids are valid
         if dest_mod_id < 0 or dest_mod_id > cd.MAX_MODULES:
@@ -547,54 +980,222 @@ class MessageManager(ClientLike):
             )
             return
 
+        # Compressed messages are decompressed at most once, and only if needed
+        self._decompressed = None
+
+        if self.recorder:
+            if self._envelope is not None:
+                for packed_header, packed_data in self.envelope_messages(data):
+                    self.recorder.record(packed_header, packed_data)
+            elif is_compressed(header):
+                decompressed = self.decompressed_message(header, data)
+                if decompressed is not None:
+                    self.recorder.record(*decompressed)
+            else:
+                self.recorder.record(header, data)
+
         # Subscriber set for this message type
         subscribers = list(
             chain(
-                self.subscriptions[header.msg_type],
+                self.subscriptions[route.msg_type],
                 self.subscriptions[ALL_MESSAGE_TYPES],
             )
         )
 
-        for n in range(len(subscribers)):
-            module = subscribers[n]
+        if self.range_index:
+            ranged = self.range_index.lookup(route.msg_type)
+            if ranged:
+                subscribers = list(ranged.union(subscribers))
+
+        for module in subscribers:
             if module.conn in self.wlist:
-                try:
-                    if (
-                        dest_mod_id == 0
-                        or (module.mod_id == dest_mod_id)
-                        or module.is_logger
-                    ):
-                        module.send_message(header, data)
-                        module.drops = 0
-                except ConnectionError as err:
-                    self.remove_module(module)
-                    self.logger.error(
-                        f"Connection Error on write to {module!s} - {err!s}"
-                    )
-                    print("x", end="", flush=True)
-                    self.send_failed_message(module, header, time.perf_counter())
+                if (
+                    dest_mod_id == 0
+                    or (module.mod_id == dest_mod_id)
+                    or module.is_logger
+                ):
+                    self.deliver_message(module, header, data)
             elif module.is_logger:
                 # Block until logger is ready
                 select.select([], [module.conn], [], None)
+                self.deliver_message(module, header, data)
+            else:
+                self.drop_message(module, header)
+
+        # Deliver to exactly one member of each consumer group
+        groups = self.groups.get(route.msg_type)
+        if groups:
+            for group in list(groups.values()):
+                if (
+                    dest_mod_id == 0
+                    and self._envelope is not None
+                    and group.policy == cd.GROUP_HASH_FIELD
+                ):
+                    # Each packed message is routed by its own key
+                    for packed_header, packed_data in self.envelope_messages(data):
+                        module = group.select_member(
+                            packed_header, packed_data, self.wlist
+                        )
+                        if module.conn in self.wlist:
+                            self.deliver_message(module, packed_header, packed_data)
+                        else:
+                            self.drop_message(module, packed_header)
+                    continue
+                elif dest_mod_id == 0:
+                    key_header, key_data = route, data
+                    if group.policy == cd.GROUP_HASH_FIELD and is_compressed(header):
+                        # Hash keys are read from the decompressed data
+                        key_header, key_data = self.decompressed_message(
+                            header, data
+                        ) or (header, data)
+                    module = group.select_member(key_header, key_data, self.wlist)
+                else:
+                    for module in group.members:
+                        if module.mod_id == dest_mod_id:
+                            break
+                    else:
+                        continue
+
+                if module.conn in self.wlist:
+                    self.deliver_message(module, header, data)
+                else:
+                    self.drop_message(module, header)
 
-                try:
-                    module.send_message(header, data)
-                    module.drops = 0
-                except ConnectionError as err:
-                    self.remove_module(module)
-                    self.logger.error(
-                        f"Connection Error on write to {module!s} - {err!s}"
-                    )
-                    print("x", end="", flush=True)
-                    # this could result in infinite recursion,
-                    # this is prevented by send_failed_message returning if
-                    # failed message type is failed_message.
-                    self.send_failed_message(module, header, time.perf_counter())
+    def open_envelope(
+        self, src_name: str, header: MessageHeader, data: memoryview
+    ) -> Optional[MessageHeader]:
+        """Find the messages packed in an ENVELOPE message being forwarded
+
+        Args:
+            src_name (str): Name of the sending module
+            header (MessageHeader): ENVELOPE message header
+            data (memoryview): ENVELOPE message data
+
+        Returns:
+            Header of the first packed message, which the envelope is routed
+            by, or None if the envelope is malformed or empty
+        """
+        try:
+            offsets = envelope_offsets(self.header_cls, data)
+        except ValueError as e:
+            self.logger.error(
+                f"MessageManager::forward_message: Got invalid ENVELOPE from {src_name} - {e!s}"
+            )
+            return None
+
+        if not offsets:
+            return None
+
+        if self.hop_times:
+            recv_offset = self.header_cls._mm_recv_time.offset  # type: ignore
+            for offset in offsets:
+                _double.pack_into(data, offset + recv_offset, header.mm_recv_time)  # type: ignore
+
+        self._envelope = offsets
+        return self.header_cls.from_buffer_copy(data)
+
+    def envelope_messages(
+        self, data: memoryview
+    ) -> Iterator[Tuple[MessageHeader, memoryview]]:
+        """Headers and data of the messages packed in the envelope being forwarded
+
+        Args:
+            data (memoryview): ENVELOPE message data
+
+        Yields:
+            A copy of each packed header and a view of its message data
+        """
+        header_size = ctypes.sizeof(self.header_cls)
+        for offset in self._envelope or ():
+            packed_header = self.header_cls.from_buffer_copy(data, offset)
+            start = offset + header_size
+            yield packed_header, data[start : start + packed_header.num_data_bytes]
 
+    def drop_message(self, module: Module, header: MessageHeader):
+        """Count a message that a module was not ready to receive
+
+        Args:
+            module (Module): Destination module
+            header (MessageHeader): Message header
+        """
+        count = 1
+        if self._envelope is not None and header.msg_type == cd.MT_ENVELOPE:
+            if not module.envelopes:
+                count = len(self._envelope)
+        module.count_drop(count)
+        print("x", end="", flush=True)
+        self.send_failed_message(module, header, time.perf_counter())
+
+    def deliver_message(
+        self,
+        module: Module,
+        header: MessageHeader,
+        data: Union[bytes, MessageData],
+    ):
+        """Send a message to a single module
+
+        Args:
+            module (Module): Destination module
+            header (MessageHeader): Message header
+            data (Union[bytes, MessageData]): Message data
+        """
+        if is_compressed(header) and not module.compressed:
+            decompressed = self.decompressed_message(header, data)
+            if decompressed is None:
+                module.count_drop()
+                return
+            header, data = decompressed
+
+        try:
+            if (
+                self._envelope is not None
+                and header.msg_type == cd.MT_ENVELOPE
+                and not module.envelopes
+            ):
+                module.send_unpacked(data, self._envelope)  # type: ignore
             else:
-                module.drops += 1
-                print("x", end="", flush=True)
-                self.send_failed_message(module, header, time.perf_counter())
+                module.send_message(header, data)
+            module.drops = 0
+        except ConnectionError as err:
+            self.remove_module(module)
+            self.logger.error(f"Connection Error on write to {module!s} - {err!s}")
+            print("x", end="", flush=True)
+            # this could result in infinite recursion,
+            # this is prevented by send_failed_message returning if
+            # failed message type is failed_message.
+            self.send_failed_message(module, header, time.perf_counter())
+
+    def decompressed_message(
+        self, header: MessageHeader, data: Union[bytes, MessageData]
+    ) -> Optional[Tuple[MessageHeader, bytearray]]:
+        """Decompressed copy of the compressed message being forwarded
+
+        The message is decompressed on the first call for each forwarded
+        message and the result is reused by later calls.
+
+        Args:
+            header (MessageHeader): Header of a compressed message
+            data (Union[bytes, MessageData]): Compressed message data
+
+        Returns:
+            The full-size header and message data, or None if the message
+            could not be decompressed
+        """
+        if self._decompressed is None:
+            full_header = self.header_cls.from_buffer_copy(header)
+            try:
+                payload = decompress_payload(
+                    full_header, data, max_size=len(self.data_buffer)
+                )
+            except ValueError as e:
+                self.logger.error(
+                    f"Could not decompress message type {header.msg_type} from module {header.src_mod_id} - {e!s}"
+                )
+                self._decompressed = False
+            else:
+                self._decompressed = (full_header, payload)
+
+        return self._decompressed or None
 
     def send_to_loggers(
         self,
@@ -607,6 +1208,9 @@ class MessageManager(ClientLike):
             header (MessageHeader): Message header to send
             payload (Union[bytes, MessageData]): Message data to send
         """
+        if self.recorder:
+            self.recorder.record(header, payload)
+
         for module in self.logger_modules:
             if module.conn not in self.wlist:
                 # Block until logger is ready
@@ -648,11 +1252,13 @@ class MessageManager(ClientLike):
 
         self.forward_message(self.mm_module, header, msg_data)
 
-    def send_ack(self, src_module: Module):
+    def send_ack(self, src_module: Module, capabilities: int = 0):
         """Send ACKNOWLEDGE signal header
 
         Args:
             src_module (Module): Module to send ACK to
+            capabilities (int, optional): Bitmask of MM_CAP_* flags. Only set when
+                acknowledging CONNECT. Defaults to 0.
         """
         header = self.header_cls()
         header.msg_type = cd.MT_ACKNOWLEDGE
@@ -661,6 +1267,10 @@ class MessageManager(ClientLike):
         header.dest_mod_id = src_module.mod_id
         header.num_data_bytes = 0
 
+        # Signals carry no data, so remaining_bytes is free to advertise
+        # capabilities. Legacy clients ignore this field.
+        header.remaining_bytes = capabilities
+
         try:
             src_module.send_message(header, b"")
         except ConnectionError as err:
@@ -672,6 +1282,39 @@ class MessageManager(ClientLike):
         # Always forward to logger modules
         self.send_to_loggers(header, b"")
 
+    def send_time_sync_reply(
+        self,
+        src_module: Module,
+        request: cd.MDF_TIME_SYNC_REQUEST,
+        recv_time: float,
+    ):
+        """Reply to a time sync request with the manager clock readings
+
+        Args:
+            src_module (Module): Module that sent the request
+            request (MDF_TIME_SYNC_REQUEST): Time sync request
+            recv_time (float): Manager clock when the request was received
+        """
+        reply = cd.MDF_TIME_SYNC_REPLY()
+        reply.client_send_time = request.client_send_time
+        reply.manager_recv_time = recv_time
+
+        header = self.header_cls()
+        header.msg_type = cd.MT_TIME_SYNC_REPLY
+        header.src_mod_id = cd.MID_MESSAGE_MANAGER
+        header.dest_mod_id = src_module.mod_id
+        header.num_data_bytes = reply.type_size
+        header.version = reply.type_hash
+
+        try:
+            header.send_time = reply.manager_send_time = time.perf_counter()
+            src_module.send_message(header, reply)
+        except ConnectionError as err:
+            self.remove_module(src_module)
+            self.logger.error(f"Connection Error on write to {src_module!s} - {err!s}")
+            print("x", end="", flush=True)
+            self.send_failed_message(src_module, header, time.perf_counter())
+
     def send_failed_message(
         self,
         dest_module: Module,
@@ -805,13 +1448,20 @@ class MessageManager(ClientLike):
             # NOTE: DEBUG_TEXT is unsupported legacy STRING_DATA type
             return
 
+        if msg_type == cd.MT_ENVELOPE:
+            # Variable-length, unpacked when forwarded
+            return
+
+        # Read the clock before decoding for the most accurate time sync
+        recv_time = time.perf_counter()
+
         core_msg = self.decode_core_message(src_module, header)
         if core_msg is None:
             return
 
         if msg_type == cd.MT_CONNECT or msg_type == cd.MT_CONNECT_V2:
             if self.connect_module(src_module, core_msg):
-                self.send_ack(src_module)
+                self.send_ack(src_module, self.CAPABILITIES)
                 self.send_client_info(src_module)
                 if msg_type == cd.MT_CONNECT:
                     self.logger.info(f"CONNECT - {src_module!s}")
@@ -820,10 +1470,20 @@ class MessageManager(ClientLike):
         elif msg_type == cd.MT_DISCONNECT:
             self.disconnect_module(src_module)
             self.logger.info(f"DISCONNECT - {src_module!s}")
-        elif msg_type == cd.MT_SUBSCRIBE:
+        elif msg_type in (
+            cd.MT_SUBSCRIBE,
+            cd.MT_SUBSCRIBE_MANY,
+            cd.MT_SUBSCRIBE_GROUP,
+            cd.MT_SUBSCRIBE_RANGE,
+        ):
             self.add_subscription(src_module, core_msg)
             self.send_ack(src_module)
-        elif msg_type == cd.MT_UNSUBSCRIBE:
+        elif msg_type in (
+            cd.MT_UNSUBSCRIBE,
+            cd.MT_UNSUBSCRIBE_MANY,
+            cd.MT_UNSUBSCRIBE_GROUP,
+            cd.MT_UNSUBSCRIBE_RANGE,
+        ):
             self.remove_subscription(src_module, core_msg)
             self.send_ack(src_module)
         elif msg_type == cd.MT_PAUSE_SUBSCRIPTION:
@@ -838,6 +1498,13 @@ class MessageManager(ClientLike):
         elif msg_type == cd.MT_MODULE_READY:
             self.register_module_ready(src_module, core_msg)
             self.send_client_info(src_module)
+        elif msg_type == cd.MT_TIME_SYNC_REQUEST:
+            self.send_time_sync_reply(src_module, core_msg.data, recv_time)
+        elif msg_type == cd.MT_CLIENT_CAPABILITIES:
+            caps = core_msg.data.capabilities
+            src_module.compact = bool(caps & cd.CLIENT_CAP_COMPACT)
+            src_module.compressed = bool(caps & cd.CLIENT_CAP_COMPRESSION)
+            src_module.envelopes = bool(caps & cd.CLIENT_CAP_ENVELOPE)
 
     def process_message(self, src_module: Module, header: MessageHeader):
         """Process incoming message
@@ -878,14 +1545,16 @@ class MessageManager(ClientLike):
                                 f"New connection accepted from {address[0]}:{address[1]}"
                             )
 
-                            # Disable Nagle Algorithm
-                            conn.setsockopt(
-                                socket.getprotobyname("tcp"), socket.TCP_NODELAY, 1
-                            )
+                            # Disable Nagle Algorithm and apply socket tuning
+                            self.socket_profile.apply(conn)
 
                             self.sockets.append(conn)
                             self.modules[conn] = Module(
-                                self.generate_uid(), conn, address, self.header_cls
+                                self.generate_uid(),
+                                conn,
+                                address,
+                                self.header_cls,
+                                hop_times=self.hop_times,
                             )
                         except ValueError:
                             pass
@@ -937,9 +1606,11 @@ class MessageManager(ClientLike):
         finally:
             for mod in self.modules:
                 mod.close()
+            if self.recorder:
+                self.recorder.close()
 
 
-def main():
+def _arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "-a",
@@ -962,6 +1633,12 @@ def main():
     parser.add_argument(
         "-t", "--timecode", action="store_true", help="Use timecode in message header"
     )
+    parser.add_argument(
+        "--hop-timestamps",
+        dest="hop_times",
+        action="store_true",
+        help="Stamp manager read and write times in message header",
+    )
     parser.add_argument(
         "-T",
         "--disable_timing_msg",
@@ -975,7 +1652,84 @@ def main():
         help="Disable sending of ACTIVE_CLIENTS message periodically",
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--record",
+        dest="record_file",
+        type=str,
+        default=None,
+        help="Record all message traffic to the given .dat file (must not already exist)",
+    )
+
+    parser.add_argument(
+        "--record-format",
+        dest="record_format",
+        choices=TrafficRecorder.FORMATS,
+        default="raw",
+        help="Recording file format. 'indexed' also writes a .idx file. Default is 'raw'.",
+    )
+
+    parser.add_argument(
+        "--socket-profile",
+        dest="socket_profile",
+        choices=list(SOCKET_PROFILES),
+        default="default",
+        help="Socket tuning profile for client connections. Default is 'default'.",
+    )
+
+    parser.add_argument(
+        "--logger-socket-profile",
+        dest="logger_socket_profile",
+        choices=list(SOCKET_PROFILES),
+        default="logger",
+        help="Socket tuning profile for logger module connections. Default is 'logger'.",
+    )
+
+    parser.add_argument(
+        "--sndbuf",
+        type=int,
+        default=None,
+        help="Override SO_SNDBUF (bytes) for client connections",
+    )
+
+    parser.add_argument(
+        "--rcvbuf",
+        type=int,
+        default=None,
+        help="Override SO_RCVBUF (bytes) for client connections",
+    )
+
+    parser.add_argument(
+        "--logger-sndbuf",
+        dest="logger_sndbuf",
+        type=int,
+        default=None,
+        help="Override SO_SNDBUF (bytes) for logger module connections",
+    )
+
+    parser.add_argument(
+        "--logger-rcvbuf",
+        dest="logger_rcvbuf",
+        type=int,
+        default=None,
+        help="Override SO_RCVBUF (bytes) for logger module connections",
+    )
+
+    return parser
+
+
+def _socket_profiles(args: argparse.Namespace) -> Tuple[SocketProfile, SocketProfile]:
+    """Get the client and logger socket profiles with command line overrides applied"""
+    profile = get_socket_profile(args.socket_profile).replace(
+        sndbuf=args.sndbuf, rcvbuf=args.rcvbuf
+    )
+    logger_profile = get_socket_profile(args.logger_socket_profile).replace(
+        sndbuf=args.logger_sndbuf, rcvbuf=args.logger_rcvbuf
+    )
+    return profile, logger_profile
+
+
+def main(argv: Optional[List[str]] = None):
+    args = _arg_parser().parse_args(argv)
 
     if args.addr:  # a non-empty host address was passed in.
         ip_addr = args.addr
@@ -994,15 +1748,22 @@ def main():
         print("Unknown log level. Using INFO instead")
         level = logging.INFO
 
+    socket_profile, logger_socket_profile = _socket_profiles(args)
+
     with disable_message_validation():
         msg_mgr = MessageManager(
             ip_address=ip_addr,
             port=args.port,
             timecode=args.timecode,
+            hop_times=args.hop_times,
             log_level=level,
             debug=args.debug,
             send_msg_timing=(not args.disable_timing_msg),
             send_active_clients=(not args.disable_active_clients_msg),
+            record_file=args.record_file,
+            record_format=args.record_format,
+            socket_profile=socket_profile,
+            logger_socket_profile=logger_socket_profile,
         )
 
         msg_mgr.run()
@@ -5,7 +5,7 @@ from __future__ import annotations
 import json
 import copy
 
-from typing import Type, Dict, Any, TypeVar
+from typing import Type, Dict, Any, Optional, TypeVar
 
 from .header import MessageHeader, get_header_cls
 from .message_data import MessageData
@@ -14,6 +14,7 @@ from .exceptions import InvalidMessageDefinition, UnknownMessageType
 
 __all__ = [
     "Message",
+    "LazyMessage",
     "MessageHeader",
     "MessageData",
     "get_header_cls",
@@ -174,13 +175,65 @@ class Message:
 
         return obj
 
-    @classmethod
-    def copy(cls, m: Message) -> Message:
+    def copy(self) -> Message:
         """Generate a copy of a message structure
 
-        Args:
-            m: Message structure to copy
+        The copy does not share memory with the original, so it stays valid
+        after the receive buffer behind a zero-copy message is reused. Can
+        also be called as ``Message.copy(m)``.
+
+        Returns:
+            Message: Copy of the message
         """
         return Message(
-            MessageHeader.from_buffer_copy(m.header), m.data.from_buffer_copy(m.data)
+            type(self.header).from_buffer_copy(self.header),
+            type(self.data).from_buffer_copy(self.data),
         )
+
+
+class LazyMessage(Message):
+    """Message whose data is decoded from the received bytes on first access
+
+    Returned by clients with lazy decoding enabled. Code that only looks at
+    the header, such as routing or forwarding by type, never pays for
+    creating the message data object.
+
+    Args:
+        header: Message header
+        msg_cls: Message data class
+        payload: Raw message data bytes. The message data is decoded in place from this buffer.
+    """
+
+    def __init__(
+        self, header: MessageHeader, msg_cls: Type[MessageData], payload: bytearray
+    ):
+        self.header = header
+        self._msg_cls = msg_cls
+        self._payload = payload
+        self._data: Optional[MessageData] = None
+
+    @property
+    def data(self) -> MessageData:
+        if self._data is None:
+            if len(self._payload):
+                self._data = self._msg_cls.from_buffer(self._payload)
+            else:
+                self._data = self._msg_cls()
+        return self._data
+
+    @data.setter
+    def data(self, value: MessageData):
+        self._data = value
+
+    @property
+    def decoded(self) -> bool:
+        """True once the message data has been decoded"""
+        return self._data is not None
+
+    @property
+    def type_id(self) -> int:
+        return self._msg_cls.type_id
+
+    @property
+    def name(self) -> str:
+        return self._msg_cls.type_name
@@ -15,3 +15,4 @@ class MessageData(MessageBase, metaclass=MessageMeta):
     type_source: ClassVar[str] = ""
     type_size: ClassVar[int] = -1
     type_def: ClassVar[str] = ""
+    type_compression: ClassVar[str] = ""
@@ -285,6 +285,7 @@ class MDF:
     src: pathlib.Path
     fields: List[Field] = field(default_factory=list)
     alignment: int = 8
+    compression: str = ""
 
     @property
     def signal(self) -> bool:
@@ -1129,7 +1130,7 @@ class Parser:
             return
 
         # Check for correct section headers
-        valid_sections = ("id", "fields")
+        valid_sections = ("id", "fields", "compression")
         for section in mdf.keys():
             if section not in valid_sections:
                 raise RTMASyntaxError(
@@ -1166,6 +1167,15 @@ class Parser:
         # Parse and the fields of the definition
         self.add_fields(obj, mdf["fields"])
 
+        # Wire compression does not change the data layout, so it is not hashed
+        compression = mdf.get("compression")
+        if compression is not None:
+            if not isinstance(compression, str) or not compression.isidentifier():
+                raise RTMASyntaxError(
+                    f"Invalid compression codec name '{compression}' in message def {name} -> {self.current_file}"
+                )
+            obj.compression = compression
+
         # Store the new defintion
         self.message_defs[name] = obj
 
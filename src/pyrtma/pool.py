@@ -0,0 +1,83 @@
+"""pyrtma.pool module
+
+Contains :py:class:`~MessagePool`, reusable message objects for allocation-free receive loops
+"""
+
+from .header import MessageHeader
+from .message import Message
+from .message_data import MessageData
+
+from typing import Dict, List, Type
+
+__all__ = ["MessagePool"]
+
+
+class MessagePool:
+    """Reusable message objects, kept per message type
+
+    Each message type has a ring of up to size messages. Acquiring a message
+    returns the oldest one of the ring, so a pooled message is overwritten
+    once size more messages of its type have been acquired.
+
+    Args:
+        header_cls: Message header class
+        size: Number of messages kept per message type
+    """
+
+    def __init__(self, header_cls: Type[MessageHeader], size: int):
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+
+        self.header_cls = header_cls
+        self.size = size
+        self._slots: Dict[int, List[Message]] = {}
+        self._next: Dict[int, int] = {}
+
+    def acquire(self, msg_type: int, msg_cls: Type[MessageData]) -> Message:
+        """Get the next message object to fill for a message type
+
+        Args:
+            msg_type (int): Message type ID
+            msg_cls: Message data class of the message type
+
+        Returns:
+            Message: Pooled message. Its contents are stale until filled by the caller.
+        """
+        slots = self._slots.get(msg_type)
+        if slots is None:
+            slots = self._slots[msg_type] = []
+
+        i = self._next.get(msg_type, 0)
+        self._next[msg_type] = (i + 1) % self.size
+
+        if i == len(slots):
+            msg = Message(self.header_cls(), msg_cls())
+            slots.append(msg)
+            return msg
+
+        msg = slots[i]
+        if type(msg.data) is not msg_cls:
+            # Message definitions were reloaded
+            msg = slots[i] = Message(self.header_cls(), msg_cls())
+        return msg
+
+    def detach(self, msg: Message) -> Message:
+        """Take a message out of the pool so it is never overwritten
+
+        Args:
+            msg (Message): Message returned by :py:meth:`acquire`. Other messages are ignored.
+
+        Returns:
+            Message: The same message, now owned by the caller
+        """
+        slots = self._slots.get(msg.header.msg_type, [])
+        for i, m in enumerate(slots):
+            if m is msg:
+                slots[i] = Message(self.header_cls(), type(msg.data)())
+                break
+        return msg
+
+    def clear(self):
+        """Release all pooled messages"""
+        self._slots.clear()
+        self._next.clear()
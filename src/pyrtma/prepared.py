@@ -0,0 +1,144 @@
+"""pyrtma.prepared module
+
+Contains :py:class:`~PreparedMessage`, a pre-built send buffer for publishing one message type at a high rate
+"""
+
+from __future__ import annotations
+
+import ctypes
+import struct
+import time
+
+from functools import partial
+
+from .message_data import MessageData
+from .exceptions import NotConnectedError
+
+from typing import TYPE_CHECKING, Any, Callable, Type, Union
+
+if TYPE_CHECKING:
+    from .client import Client
+
+__all__ = ["PreparedMessage"]
+
+# ctypes type codes that struct packs the same way
+_SCALAR_CODES = frozenset("bBhHiIlLqQfd")
+
+
+class PreparedMessage:
+    """Pre-built header and data buffer for repeated sends of one message type
+
+    The header and data are built once into a single buffer. :py:attr:`header`
+    and :py:attr:`data` are views of that buffer, so assigning a data field
+    writes straight into it. Each :py:meth:`send` only stamps the message
+    count and send time in place and writes the buffer with one system call.
+
+    Create with :py:meth:`pyrtma.client.Client.prepare`.
+
+    Args:
+        client (Client): Client that sends the message
+        msg_data: Message data class, or message object whose contents are copied
+        dest_mod_id (optional): Specific module ID to send to. Defaults to 0 (broadcast).
+        dest_host_id (optional): Specific host ID to send to. Defaults to 0 (broadcast).
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        msg_data: Union[MessageData, Type[MessageData]],
+        dest_mod_id: int = 0,
+        dest_host_id: int = 0,
+    ):
+        client._check_destination(dest_mod_id, dest_host_id)
+        if isinstance(msg_data, type):
+            msg_data = msg_data()
+
+        header = client._make_data_header(msg_data, dest_mod_id, dest_host_id)
+        header_cls = type(header)
+        header_size = ctypes.sizeof(header)
+
+        self._client = client
+        self._buffer = bytearray(header_size + ctypes.sizeof(msg_data))
+        self._buffer[:header_size] = bytes(header)
+        self._buffer[header_size:] = bytes(msg_data)
+        self._header_size = header_size
+
+        self.header = header_cls.from_buffer(self._buffer)
+        self.data = type(msg_data).from_buffer(self._buffer, header_size)
+
+        self._msg_count = partial(
+            struct.Struct("i").pack_into,
+            self._buffer,
+            header_cls._msg_count.offset,  # type: ignore
+        )
+        self._send_time = partial(
+            struct.Struct("d").pack_into,
+            self._buffer,
+            header_cls._send_time.offset,  # type: ignore
+        )
+        self._src_mod_id = partial(
+            struct.Struct("h").pack_into,
+            self._buffer,
+            header_cls._src_mod_id.offset,  # type: ignore
+        )
+
+    @property
+    def buffer(self) -> bytearray:
+        """Buffer holding the header followed by the message data"""
+        return self._buffer
+
+    def setter(self, name: str) -> Callable[[Any], None]:
+        """Get a function that writes one scalar data field straight into the buffer
+
+        The function skips the field validators, so it is faster than
+        assigning through :py:attr:`data`. Out of range integers raise struct.error.
+
+        Args:
+            name (str): Name of a numeric scalar data field
+
+        Raises:
+            ValueError: The field is unknown or is not a numeric scalar
+
+        Returns:
+            Callable taking the new field value
+        """
+        data_cls = type(self.data)
+        field = getattr(data_cls, "_" + name, None)
+        ctype = dict(data_cls._fields_).get("_" + name)
+        if field is None or ctype is None:
+            raise ValueError(f"{data_cls.__name__} has no field named {name}")
+
+        fmt = getattr(ctype, "_type_", None)
+        if fmt not in _SCALAR_CODES:
+            raise ValueError(
+                f"{data_cls.__name__}.{name} is not a numeric scalar field. Assign it through data."
+            )
+
+        return partial(
+            struct.Struct(fmt).pack_into, self._buffer, self._header_size + field.offset
+        )
+
+    def send(self, timeout: float = -1):
+        """Send the message with its current contents
+
+        Args:
+            timeout (optional): Timeout in seconds to wait for socket to be available for sending.
+                Defaults to -1 (blocking).
+
+        Raises:
+            NotConnectedError: Client is not connected
+            ConnectionLost: Connection error to message manager server
+        """
+        client = self._client
+        if not client._connected:
+            raise NotConnectedError
+
+        if client._nonblocking_send or client._wait_writable(timeout):
+            self._msg_count(client._msg_count)
+            self._send_time(time.perf_counter() + client._clock_offset)
+            self._src_mod_id(client._module_id)
+            client._transmit([self._buffer])
+
+        else:
+            # Socket was not ready to receive data. Drop the packet.
+            print("x", end="")
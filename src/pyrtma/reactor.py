@@ -0,0 +1,234 @@
+"""pyrtma.reactor module
+
+Contains :py:class:`~ClientReactor`, which serves many :py:class:`~pyrtma.client.Client`
+connections from a single thread
+"""
+
+import selectors
+import socket
+
+from dataclasses import dataclass
+
+from .client import Client
+from .message import Message
+from .exceptions import ClientError, ConnectionLost
+
+from typing import Any, Callable, Dict, List, Optional, Union
+
+__all__ = ["ClientReactor"]
+
+MessageHandler = Callable[[Client, Message], Any]
+ErrorHandler = Callable[[Client, Exception], Any]
+
+
+@dataclass
+class _Registration:
+    handler: MessageHandler
+    on_error: Optional[ErrorHandler]
+
+
+class ClientReactor:
+    """Dispatch messages from many clients with one selector
+
+    Each registered client's socket is watched by a single selector. When a
+    socket becomes readable, everything that can be read from it without
+    blocking is passed to the client's handler as handler(client, msg).
+    Clients that already hold buffered messages are served without waiting.
+
+    Errors raised while reading a client are passed to its on_error callback,
+    or raised from :py:meth:`run_once` if it has none. A client whose
+    connection was lost is unregistered before the error is reported.
+
+    Registered clients must not be read by any other means, including
+    :py:meth:`~pyrtma.client.Client.start_receiving`. A client that reconnects
+    gets a new socket and must be registered again.
+
+    Args:
+        max_batch (optional): Maximum number of messages read from one client per pass. Defaults to 1000.
+    """
+
+    def __init__(self, max_batch: Optional[int] = 1000):
+        if max_batch is not None and max_batch < 1:
+            raise ValueError("max_batch must be a positive integer or None.")
+
+        self.max_batch = max_batch
+        self._selector = selectors.DefaultSelector()
+        self._clients: Dict[Client, _Registration] = {}
+        self._pending: List[Client] = []
+        self._running = False
+
+        # Lets stop() wake a blocked select from another thread
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def clients(self) -> List[Client]:
+        """Registered clients"""
+        return list(self._clients)
+
+    @property
+    def running(self) -> bool:
+        """True while :py:meth:`run` is dispatching"""
+        return self._running
+
+    def register(
+        self,
+        client: Client,
+        handler: MessageHandler,
+        on_error: Optional[ErrorHandler] = None,
+    ):
+        """Register a connected client
+
+        Args:
+            client (Client): Connected client
+            handler: Called as handler(client, msg) for each message read from the client
+            on_error (optional): Called as on_error(client, exc) for errors raised while reading the client. Defaults to None.
+
+        Raises:
+            ClientError: Client is not connected, is already registered, or is receiving on a background thread
+        """
+        if not client.connected:
+            raise ClientError(f"{client} must be connected before registering.")
+
+        if client.receiving:
+            raise ClientError(
+                f"{client} is receiving on a background thread and cannot be registered."
+            )
+
+        if client in self._clients:
+            raise ClientError(f"{client} is already registered.")
+
+        self._selector.register(client.sock, selectors.EVENT_READ, client)
+        self._clients[client] = _Registration(handler, on_error)
+
+        # Serve messages that were buffered before registration
+        if client.has_buffered_messages:
+            self._pending.append(client)
+
+    def unregister(self, client: Client):
+        """Stop dispatching messages from a client
+
+        Messages that were already buffered by the client stay buffered.
+
+        Args:
+            client (Client): Registered client
+        """
+        if self._clients.pop(client, None) is None:
+            return
+
+        for key in list(self._selector.get_map().values()):
+            if key.data is client:
+                self._selector.unregister(key.fileobj)
+                break
+
+        if client in self._pending:
+            self._pending.remove(client)
+
+    def run_once(self, timeout: Union[int, float, None] = None) -> int:
+        """Wait for registered clients to become readable and dispatch their messages
+
+        Args:
+            timeout (optional): Maximum time to wait in seconds. None waits indefinitely. Defaults to None.
+
+        Returns:
+            int: Number of messages dispatched
+        """
+        if self._pending:
+            timeout = 0
+        elif timeout is not None and timeout < 0:
+            timeout = None
+
+        ready = self._pending
+        self._pending = []
+
+        for key, _ in self._selector.select(timeout):
+            if key.data is None:
+                self._drain_wakeup()
+            elif key.data not in ready:
+                ready.append(key.data)
+
+        count = 0
+        for client in ready:
+            count += self._service(client)
+
+        return count
+
+    def run(self):
+        """Dispatch messages until :py:meth:`stop` is called or no clients remain registered"""
+        self._running = True
+        try:
+            while self._running and self._clients:
+                self.run_once()
+        finally:
+            self._running = False
+
+    def stop(self):
+        """Stop :py:meth:`run`
+
+        Safe to call from a handler or from another thread.
+        """
+        self._running = False
+        try:
+            self._wakeup_w.send(b"\x00")
+        except (BlockingIOError, OSError):
+            pass
+
+    def close(self):
+        """Unregister all clients and release the selector
+
+        The clients themselves are left connected.
+        """
+        self.stop()
+        for client in list(self._clients):
+            self.unregister(client)
+        self._selector.close()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_r.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _service(self, client: Client) -> int:
+        """Read and dispatch the messages available from one client"""
+        reg = self._clients.get(client)
+        if reg is None:
+            # Unregistered by an earlier handler in this pass
+            return 0
+
+        try:
+            msgs = client._read_available(self.max_batch)
+        except ConnectionLost as e:
+            self.unregister(client)
+            self._report(client, reg, e)
+            return 0
+        except Exception as e:
+            # The bad frame was consumed. Messages behind it are served next pass.
+            if client.has_buffered_messages:
+                self._pending.append(client)
+            self._report(client, reg, e)
+            return 0
+
+        if client.has_buffered_messages:
+            self._pending.append(client)
+
+        for msg in msgs:
+            reg.handler(client, msg)
+
+        return len(msgs)
+
+    def _report(self, client: Client, reg: _Registration, exc: Exception):
+        if reg.on_error is None:
+            raise exc
+        reg.on_error(client, exc)
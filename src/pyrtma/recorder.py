@@ -0,0 +1,252 @@
+"""pyrtma.recorder module
+
+Contains :py:class:`~TrafficRecorder` class used by MessageManager to record message traffic
+"""
+
+import ctypes
+import os
+import struct
+import logging
+import threading
+import time
+
+from .header import MessageHeader
+
+from typing import BinaryIO, Optional, Type, Union
+
+__all__ = ["TrafficRecorder", "INDEX_RECORD", "recover_recording"]
+
+# Index record layout for the "indexed" format:
+#   file offset (int64), frame size (int32), msg_type (int32), src_mod_id (int16),
+#   padding (int16), recv_time (double)
+INDEX_RECORD = struct.Struct("<qiih2xd")
+
+
+class TrafficRecorder:
+    """Record raw message traffic from within the MessageManager process
+
+    Each recorded message is appended as raw header+payload bytes to a staging
+    buffer and written to disk by a background thread, so the manager never
+    blocks on file I/O. The output file uses the same layout as the data_logger
+    "raw" formatter (.dat). The "indexed" format additionally writes an index
+    file (.idx) with one :py:data:`INDEX_RECORD` per message.
+
+    Disk space is preallocated and trimmed to the recorded size by :py:meth:`close`.
+    If the process exits without closing the recorder, the file keeps a zero-filled
+    tail. Use :py:func:`recover_recording` to trim it before reading the file.
+
+    A write error (e.g. a full disk) is logged and stops the recording. Messages
+    recorded afterwards are dropped.
+
+    Args:
+        filename: Path of the output .dat file
+        fmt (optional): "raw" or "indexed". Defaults to "raw".
+        preallocate (optional): Number of bytes to preallocate on disk. Defaults to 256 MB.
+        flush_interval (optional): Maximum time in seconds between writes. Defaults to 0.5.
+        max_buffered (optional): Maximum number of staged bytes before messages are dropped.
+            Defaults to 64 MB.
+        overwrite (optional): Replace an existing file. Defaults to False.
+
+    Raises:
+        FileExistsError: The output file exists and overwrite is False
+    """
+
+    FORMATS = ("raw", "indexed")
+
+    def __init__(
+        self,
+        filename: str,
+        fmt: str = "raw",
+        preallocate: int = 256 * 1024**2,
+        flush_interval: float = 0.5,
+        max_buffered: int = 64 * 1024**2,
+        overwrite: bool = False,
+    ):
+        if fmt not in TrafficRecorder.FORMATS:
+            raise ValueError(
+                f"Unknown recorder format: {fmt}. Expected one of {TrafficRecorder.FORMATS}"
+            )
+
+        self.filename = filename
+        self.fmt = fmt
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+
+        self.messages = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.error: Optional[OSError] = None
+        self.logger = logging.getLogger("pyrtma.recorder")
+
+        self._recv_time_offset = MessageHeader._recv_time.offset  # type: ignore
+        self._active = bytearray()
+        self._active_index = bytearray()
+        self._offset = 0  # file offset of the next recorded frame
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        mode = "wb" if overwrite else "xb"
+        self._fd: BinaryIO = open(filename, mode)
+        self._preallocate(preallocate)
+
+        self._index_fd: Optional[BinaryIO] = None
+        if fmt == "indexed":
+            try:
+                self._index_fd = open(os.path.splitext(filename)[0] + ".idx", mode)
+            except OSError:
+                self._fd.close()
+                raise
+
+        self._thread = threading.Thread(
+            target=self._write_loop, name="TrafficRecorder", daemon=True
+        )
+        self._thread.start()
+
+    def _preallocate(self, nbytes: int):
+        if nbytes <= 0:
+            return
+
+        fileno = self._fd.fileno()
+        try:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fileno, 0, nbytes)
+            else:
+                os.truncate(fileno, nbytes)
+        except OSError:
+            # Preallocation is an optimization only
+            pass
+
+    @property
+    def pending_bytes(self) -> int:
+        """Number of bytes staged but not yet written to disk"""
+        return len(self._active)
+
+    def record(self, header: MessageHeader, payload: Union[bytes, memoryview]) -> bool:
+        """Stage a message for recording
+
+        Args:
+            header (MessageHeader): Message header
+            payload (Union[bytes, memoryview]): Message data
+
+        Returns:
+            bool: False if the message was dropped because the staging buffer is full
+        """
+        recv_time = time.perf_counter()
+        with self._lock:
+            buf = self._active
+            if self.error is not None or len(buf) > self.max_buffered:
+                self.dropped += 1
+                return False
+
+            start = len(buf)
+            buf += header  # type: ignore
+            buf += payload
+            struct.pack_into("d", buf, start + self._recv_time_offset, recv_time)
+
+            nbytes = len(buf) - start
+            if self._index_fd is not None:
+                self._active_index += INDEX_RECORD.pack(
+                    self._offset,
+                    nbytes,
+                    header.msg_type,
+                    header.src_mod_id,
+                    recv_time,
+                )
+            self._offset += nbytes
+            self.messages += 1
+
+        return True
+
+    def _swap(self):
+        with self._lock:
+            buf, self._active = self._active, bytearray()
+            index, self._active_index = self._active_index, bytearray()
+        return buf, index
+
+    def _write_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if not self._write():
+                break
+
+    def _write(self) -> bool:
+        buf, index = self._swap()
+        if self.error is not None:
+            return False
+
+        try:
+            if buf:
+                self._fd.write(buf)
+                self.bytes_written += len(buf)
+            if index and self._index_fd is not None:
+                self._index_fd.write(index)
+        except OSError as e:
+            with self._lock:
+                self.error = e
+            self.logger.error(f"Recording to {self.filename} stopped: {e!s}")
+            return False
+
+        return True
+
+    def flush(self):
+        """Request an immediate write of all staged messages"""
+        self._wake.set()
+
+    def close(self):
+        """Write any remaining messages, trim preallocated space, and close the files"""
+        if self._stop.is_set():
+            return
+
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+
+        self._write()
+        try:
+            self._fd.truncate(self.bytes_written)
+        except OSError as e:
+            self.logger.error(f"Unable to trim recording {self.filename}: {e!s}")
+        finally:
+            for fd in (self._fd, self._index_fd):
+                if fd is None:
+                    continue
+                try:
+                    fd.close()
+                except OSError as e:
+                    self.logger.error(f"Unable to close {fd.name}: {e!s}")
+
+
+def recover_recording(
+    filename: str, header_cls: Type[MessageHeader] = MessageHeader
+) -> int:
+    """Trim the zero-filled tail of a recording that was not closed
+
+    The recorder stamps recv_time on every message, so the first frame with a
+    zero recv_time marks the end of the recorded data.
+
+    Args:
+        filename: Path of the .dat file
+        header_cls (optional): Header class used by the recording manager. Defaults to MessageHeader.
+
+    Returns:
+        int: Size of the recorded data in bytes
+    """
+    header_size = ctypes.sizeof(header_cls)
+    with open(filename, "r+b") as f:
+        data = f.read()
+        offset = 0
+        while offset + header_size <= len(data):
+            header = header_cls.from_buffer_copy(data, offset)
+            size = header_size + header.num_data_bytes
+            if (
+                header.recv_time == 0
+                or header.num_data_bytes < 0
+                or offset + size > len(data)
+            ):
+                break
+            offset += size
+        f.truncate(offset)
+
+    return offset
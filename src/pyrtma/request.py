@@ -0,0 +1,169 @@
+"""pyrtma.request module
+
+Contains :py:class:`~RequestTracker`, which matches reply messages to outstanding requests
+"""
+
+import itertools
+import threading
+
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+from .message import Message
+from .exceptions import RequestTimeout
+
+from typing import Dict, Iterable, List, Optional
+
+__all__ = ["RequestTracker"]
+
+
+@dataclass
+class _PendingRequest:
+    future: Future
+    src_mod_id: int
+    correlation_field: Optional[str]
+    correlation: int
+    deadline: Optional[float]
+
+    def matches(self, msg: Message) -> bool:
+        if self.src_mod_id and msg.header.src_mod_id != self.src_mod_id:
+            return False
+        if self.correlation_field is None:
+            return True
+        return getattr(msg.data, self.correlation_field, None) == self.correlation
+
+
+class RequestTracker:
+    """Outstanding requests waiting for replies, keyed by reply message type
+
+    Used internally by :py:class:`~pyrtma.client.Client`. A reply resolves the
+    oldest outstanding request of its type that it matches. Requests may be
+    added from one thread while replies are resolved on another.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[int, List[_PendingRequest]] = {}
+        self._ids = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, reply_type: int) -> bool:
+        return reply_type in self._pending
+
+    def next_id(self) -> int:
+        """Next correlation ID, which fits in a 32-bit signed field"""
+        return (next(self._ids) - 1) % (2**31 - 1) + 1
+
+    def add(
+        self,
+        reply_type: int,
+        src_mod_id: int = 0,
+        correlation_field: Optional[str] = None,
+        correlation: int = 0,
+        deadline: Optional[float] = None,
+    ) -> Future:
+        """Register a request
+
+        Args:
+            reply_type (int): Message type ID of the reply
+            src_mod_id (optional): Module ID the reply must come from. Defaults to 0 (any module).
+            correlation_field (optional): Reply data field that must equal correlation. Defaults to None.
+            correlation (optional): Correlation ID of the request. Defaults to 0.
+            deadline (optional): time.perf_counter() time after which the request times out.
+                Defaults to None (never).
+
+        Returns:
+            Future: Future resolved with the reply message
+        """
+        future: Future = Future()
+        request = _PendingRequest(
+            future, src_mod_id, correlation_field, correlation, deadline
+        )
+        with self._lock:
+            self._pending.setdefault(reply_type, []).append(request)
+        return future
+
+    def resolve(self, msg: Message) -> bool:
+        """Resolve the request a reply message belongs to
+
+        Args:
+            msg (Message): Received message
+
+        Returns:
+            True if the message was a reply to an outstanding request
+        """
+        with self._lock:
+            requests = self._pending.get(msg.header.msg_type)
+            if not requests:
+                return False
+
+            for i, request in enumerate(requests):
+                if request.matches(msg):
+                    del requests[i]
+                    if not requests:
+                        del self._pending[msg.header.msg_type]
+                    break
+            else:
+                return False
+
+        if not request.future.done():
+            request.future.set_result(msg)
+        return True
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest deadline of the outstanding requests, or None"""
+        with self._lock:
+            deadlines = [
+                r.deadline
+                for requests in self._pending.values()
+                for r in requests
+                if r.deadline is not None
+            ]
+        return min(deadlines, default=None)
+
+    def expire(self, now: float):
+        """Fail requests whose deadline has passed with RequestTimeout
+
+        Args:
+            now (float): Current time.perf_counter() time
+        """
+        self._remove(
+            lambda r: r.future.done() or (r.deadline is not None and now >= r.deadline),
+            RequestTimeout("No reply received before the request timed out"),
+        )
+
+    def discard(self, futures: Iterable[Future]):
+        """Forget requests without resolving them
+
+        Args:
+            futures: Futures returned by :py:meth:`add`
+        """
+        futures = set(futures)
+        self._remove(lambda r: r.future in futures)
+
+    def fail_all(self, exc: Exception):
+        """Fail all outstanding requests
+
+        Args:
+            exc (Exception): Exception set on every outstanding future
+        """
+        self._remove(lambda r: True, exc)
+
+    def _remove(self, predicate, exc: Optional[Exception] = None):
+        removed: List[_PendingRequest] = []
+        with self._lock:
+            for reply_type in list(self._pending):
+                keep = []
+                for request in self._pending[reply_type]:
+                    (removed if predicate(request) else keep).append(request)
+                if keep:
+                    self._pending[reply_type] = keep
+                else:
+                    del self._pending[reply_type]
+
+        if exc is not None:
+            for request in removed:
+                if not request.future.done():
+                    request.future.set_exception(exc)
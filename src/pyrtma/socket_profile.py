@@ -0,0 +1,205 @@
+"""pyrtma.socket_profile module
+
+Contains :py:class:`~SocketProfile` dataclass and the predefined socket tuning profiles
+"""
+
+import socket
+import sys
+import dataclasses
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple, Union
+from warnings import warn
+
+from .exceptions import SocketOptionError
+
+__all__ = ["SocketProfile", "SOCKET_PROFILES", "get_socket_profile"]
+
+# SO_BUSY_POLL is not exported by the socket module
+_SO_BUSY_POLL: Optional[int] = getattr(
+    socket, "SO_BUSY_POLL", 46 if sys.platform.startswith("linux") else None
+)
+
+# (option, requested size) pairs already reported as capped by the kernel
+_capped_buffers: Set[Tuple[int, int]] = set()
+
+
+@dataclass(frozen=True)
+class SocketProfile:
+    """Socket tuning options
+
+    Options left as None keep the operating system default. Options that are
+    not available on the current platform are skipped.
+
+    The kernel caps buffer sizes at net.core.wmem_max/rmem_max (about 200 KB on a
+    stock Linux kernel). The effective size is read back and a warning is issued
+    the first time a requested size is capped in each process.
+
+    Args:
+        nodelay (optional): Disable the Nagle algorithm. Defaults to True.
+        sndbuf (optional): Kernel send buffer size in bytes (SO_SNDBUF).
+        rcvbuf (optional): Kernel receive buffer size in bytes (SO_RCVBUF).
+        quickack (optional): Disable delayed ACKs (TCP_QUICKACK, Linux only).
+            The kernel clears this flag, so it is re-armed after every read. Defaults to False.
+        busy_poll (optional): Busy poll time in microseconds (SO_BUSY_POLL, Linux only).
+            Raising it above net.core.busy_read requires CAP_NET_ADMIN.
+        keepalive (optional): Enable TCP keepalive probes. Defaults to False.
+        keepidle (optional): Idle time in seconds before sending keepalive probes.
+        keepintvl (optional): Interval in seconds between keepalive probes.
+        keepcnt (optional): Number of failed keepalive probes before dropping the connection.
+    """
+
+    nodelay: bool = True
+    sndbuf: Optional[int] = None
+    rcvbuf: Optional[int] = None
+    quickack: bool = False
+    busy_poll: Optional[int] = None
+    keepalive: bool = False
+    keepidle: Optional[int] = None
+    keepintvl: Optional[int] = None
+    keepcnt: Optional[int] = None
+
+    def replace(self, **kwargs) -> "SocketProfile":
+        """Create a copy of the profile with some options overridden
+
+        Options given as None are ignored.
+
+        Returns:
+            SocketProfile: New socket profile
+        """
+        return dataclasses.replace(
+            self, **{k: v for k, v in kwargs.items() if v is not None}
+        )
+
+    def apply(self, sock: socket.socket):
+        """Apply the profile to a socket
+
+        Args:
+            sock (socket.socket): TCP socket
+
+        Raises:
+            SocketOptionError: Unable to disable the Nagle algorithm
+        """
+        if self.nodelay:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError as e:
+                raise SocketOptionError from e
+
+        # The remaining options are tuning only, so failures are not fatal
+        self._set_buffer(sock, socket.SO_SNDBUF, self.sndbuf)
+        self._set_buffer(sock, socket.SO_RCVBUF, self.rcvbuf)
+        self._set(sock, socket.SOL_SOCKET, _SO_BUSY_POLL, self.busy_poll)
+
+        if self.quickack:
+            self.rearm_quickack(sock)
+
+        if self.keepalive:
+            self._set(sock, socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            self._set(
+                sock,
+                socket.IPPROTO_TCP,
+                getattr(socket, "TCP_KEEPIDLE", None),
+                self.keepidle,
+            )
+            self._set(
+                sock,
+                socket.IPPROTO_TCP,
+                getattr(socket, "TCP_KEEPINTVL", None),
+                self.keepintvl,
+            )
+            self._set(
+                sock,
+                socket.IPPROTO_TCP,
+                getattr(socket, "TCP_KEEPCNT", None),
+                self.keepcnt,
+            )
+
+    @staticmethod
+    def rearm_quickack(sock: socket.socket):
+        """Set TCP_QUICKACK, which the kernel clears after each delayed ACK decision"""
+        SocketProfile._set(
+            sock, socket.IPPROTO_TCP, getattr(socket, "TCP_QUICKACK", None), 1
+        )
+
+    @staticmethod
+    def _set_buffer(sock: socket.socket, option: int, value: Optional[int]):
+        if value is None:
+            return
+
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, option, value)
+            actual = sock.getsockopt(socket.SOL_SOCKET, option)
+        except OSError as e:
+            warn(f"Unable to set socket option {option}={value}: {e}")
+            return
+
+        # Linux reports double the requested size to account for bookkeeping overhead
+        if sys.platform.startswith("linux"):
+            actual //= 2
+
+        if actual < value and (option, value) not in _capped_buffers:
+            _capped_buffers.add((option, value))
+            name = "SO_SNDBUF" if option == socket.SO_SNDBUF else "SO_RCVBUF"
+            limit = "wmem_max" if option == socket.SO_SNDBUF else "rmem_max"
+            warn(
+                f"{name} capped at {actual} bytes ({value} requested). Raise net.core.{limit} to allow larger buffers."
+            )
+
+    @staticmethod
+    def _set(
+        sock: socket.socket, level: int, option: Optional[int], value: Optional[int]
+    ):
+        if option is None or value is None:
+            return
+
+        try:
+            sock.setsockopt(level, option, value)
+        except OSError as e:
+            warn(f"Unable to set socket option {option}={value}: {e}")
+
+
+# Profiles are selected by role: the manager and Client.connect use "logger" for
+# logger modules and "default" otherwise. The manager cannot tell which modules
+# are latency-critical, so "low_latency" is opt-in, e.g.
+# client.connect(socket_profile="low_latency").
+SOCKET_PROFILES: Dict[str, SocketProfile] = {
+    # Operating system defaults
+    "default": SocketProfile(),
+    # Bulk receivers such as data loggers: absorb bursts without dropping
+    "logger": SocketProfile(
+        sndbuf=8 * 1024**2,
+        rcvbuf=8 * 1024**2,
+        keepalive=True,
+    ),
+    # Real-time control modules: small queues and immediate ACKs.
+    # Busy polling needs CAP_NET_ADMIN, so it is left for explicit profiles.
+    "low_latency": SocketProfile(
+        sndbuf=64 * 1024,
+        rcvbuf=64 * 1024,
+        quickack=True,
+    ),
+}
+
+
+def get_socket_profile(profile: Union[str, SocketProfile]) -> SocketProfile:
+    """Get a socket profile by name
+
+    Args:
+        profile (Union[str, SocketProfile]): Profile name or a SocketProfile object
+
+    Raises:
+        ValueError: Unknown profile name
+
+    Returns:
+        SocketProfile: Socket profile
+    """
+    if isinstance(profile, SocketProfile):
+        return profile
+
+    try:
+        return SOCKET_PROFILES[profile]
+    except KeyError as e:
+        raise ValueError(
+            f"Unknown socket profile: {profile}. Expected one of {list(SOCKET_PROFILES)}"
+        ) from e
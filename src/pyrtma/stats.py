@@ -0,0 +1,281 @@
+"""pyrtma.stats module
+
+Contains :py:class:`~LatencyHistogram` and :py:class:`~ClientStats` for
+end-to-end latency and message loss statistics
+"""
+
+from array import array
+
+from . import core_defs as cd
+from .header import MessageHeader
+
+from typing import Dict, List, NamedTuple
+
+__all__ = ["LatencyHistogram", "ClientStats", "HopLatency", "hop_latency"]
+
+
+class HopLatency(NamedTuple):
+    """End-to-end latency of a message split at the message manager, in seconds"""
+
+    to_manager: float
+    in_manager: float
+    to_client: float
+
+    @property
+    def total(self) -> float:
+        return self.to_manager + self.in_manager + self.to_client
+
+
+def hop_latency(header: MessageHeader) -> HopLatency:
+    """Split the latency of a received message into publisher to manager, time
+    queued in the manager, and manager to subscriber
+
+    Requires a header with message manager hop timestamps, see
+    :py:func:`~pyrtma.header.get_header_cls`. The publisher and subscriber
+    clocks are compared with the manager clock, so the outer hops are only
+    meaningful on the manager's host or after
+    :py:meth:`~pyrtma.client.Client.sync_clock`. Messages sent by the message
+    manager itself report a to_manager latency of zero.
+
+    Args:
+        header (MessageHeader): Header of a received message
+
+    Raises:
+        ValueError: Header has no hop timestamps
+
+    Returns:
+        HopLatency: Latency of each hop
+    """
+    try:
+        mm_recv_time = header.mm_recv_time or header.send_time  # type: ignore
+        mm_send_time = header.mm_send_time  # type: ignore
+    except AttributeError:
+        raise ValueError(f"{type(header).__name__} has no hop timestamps")
+
+    return HopLatency(
+        mm_recv_time - header.send_time,
+        mm_send_time - mm_recv_time,
+        header.recv_time - mm_send_time,
+    )
+
+
+class LatencyHistogram:
+    """Fixed-memory latency histogram with log-linear buckets
+
+    Latencies are recorded in whole nanoseconds. Each power of two range is
+    split into 2**sub_bucket_bits buckets, so every recorded value is known
+    to within 1 / 2**sub_bucket_bits of its size (about 6% by default),
+    from 1 ns up to about 18 minutes. Recording is a few integer operations
+    and never allocates.
+
+    Args:
+        sub_bucket_bits (optional): Precision of each power of two range. Defaults to 4.
+    """
+
+    # Largest recorded value in nanoseconds is 2**MAX_BITS - 1
+    MAX_BITS = 40
+
+    def __init__(self, sub_bucket_bits: int = 4):
+        self._bits = sub_bucket_bits
+        self._sub_count = 1 << sub_bucket_bits
+        self._max_value = (1 << self.MAX_BITS) - 1
+        num_buckets = self._sub_count * (self.MAX_BITS - sub_bucket_bits + 1)
+        self._counts = array("Q", bytes(8 * num_buckets))
+        self.reset()
+
+    def reset(self):
+        """Discard all recorded values"""
+        for i in range(len(self._counts)):
+            self._counts[i] = 0
+        self.count = 0
+        self._sum = 0
+        self._min = self._max_value
+        self._max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self._bits - 1
+        return self._sub_count * (shift + 1) + (value >> shift) - self._sub_count
+
+    def _bucket_bounds(self, index: int):
+        """Lowest and highest value in nanoseconds that fall in a bucket"""
+        if index < self._sub_count:
+            return index, index
+        shift, sub = divmod(index, self._sub_count)
+        shift -= 1
+        low = (sub + self._sub_count) << shift
+        return low, low + (1 << shift) - 1
+
+    def record(self, latency: float):
+        """Record a latency
+
+        Args:
+            latency (float): Latency in seconds. Negative values are recorded as zero.
+        """
+        value = int(latency * 1e9)
+        if value < 0:
+            value = 0
+        elif value > self._max_value:
+            value = self._max_value
+
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        self._sum += value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add the values recorded by another histogram with the same precision
+
+        Args:
+            other (LatencyHistogram): Histogram to add
+        """
+        if other._bits != self._bits:
+            raise ValueError("Histograms must have the same sub_bucket_bits")
+
+        for i, n in enumerate(other._counts):
+            if n:
+                self._counts[i] += n
+        self.count += other.count
+        self._sum += other._sum
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+
+    @property
+    def min(self) -> float:
+        """Smallest recorded latency in seconds"""
+        return self._min * 1e-9 if self.count else 0.0
+
+    @property
+    def max(self) -> float:
+        """Largest recorded latency in seconds"""
+        return self._max * 1e-9
+
+    @property
+    def mean(self) -> float:
+        """Mean recorded latency in seconds"""
+        return self._sum / self.count * 1e-9 if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Latency at or below which the given percent of values fall
+
+        Args:
+            percent (float): Percentile between 0 and 100
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, in seconds
+        """
+        if not self.count:
+            return 0.0
+
+        rank = max(1, round(self.count * percent / 100))
+        seen = 0
+        for i, n in enumerate(self._counts):
+            seen += n
+            if seen >= rank:
+                return min(self._bucket_bounds(i)[1], self._max) * 1e-9
+
+        return self.max
+
+
+class ClientStats:
+    """Latency histograms and message loss counts of a client's received messages
+
+    Latency is recv_time - send_time, so it is only meaningful between
+    modules that share a clock, such as modules on the same host.
+
+    Loss is detected from the msg_count the message manager stamps on every
+    message it sends to this client, which increases by one per message. A
+    jump means messages were skipped, such as messages the manager dropped
+    because the client was not ready to receive.
+
+    When the message manager stamps hop timestamps, the latency of messages
+    forwarded by the manager is also split into the to_manager, in_manager
+    and to_client histograms. See :py:func:`hop_latency`.
+    """
+
+    def __init__(self):
+        self.total = LatencyHistogram()
+        self.by_type: Dict[int, LatencyHistogram] = {}
+        self.to_manager = LatencyHistogram()
+        self.in_manager = LatencyHistogram()
+        self.to_client = LatencyHistogram()
+        self.gaps = 0
+        self.lost = 0
+        self._last_count = 0
+
+    def reset(self):
+        """Discard all statistics"""
+        self.total.reset()
+        self.by_type.clear()
+        self.to_manager.reset()
+        self.in_manager.reset()
+        self.to_client.reset()
+        self.gaps = 0
+        self.lost = 0
+
+    def record(self, msg_type: int, msg_count: int, latency: float):
+        """Record a received message
+
+        Args:
+            msg_type (int): Message type ID
+            msg_count (int): msg_count stamped by the message manager
+            latency (float): recv_time - send_time in seconds
+        """
+        # Counts restart at 1 on every new connection to the manager
+        if self._last_count and msg_count > self._last_count + 1:
+            self.gaps += 1
+            self.lost += msg_count - self._last_count - 1
+        self._last_count = msg_count
+
+        self.total.record(latency)
+        hist = self.by_type.get(msg_type)
+        if hist is None:
+            hist = self.by_type[msg_type] = LatencyHistogram()
+        hist.record(latency)
+
+    def record_hops(self, to_manager: float, in_manager: float, to_client: float):
+        """Record the latency of each hop of a forwarded message
+
+        Args:
+            to_manager (float): Publisher to message manager latency in seconds
+            in_manager (float): Time queued in the message manager in seconds
+            to_client (float): Message manager to this client latency in seconds
+        """
+        self.to_manager.record(to_manager)
+        self.in_manager.record(in_manager)
+        self.to_client.record(to_client)
+
+    def reconnected(self):
+        """Restart loss detection for a new connection"""
+        self._last_count = 0
+
+    def to_messages(self) -> List[cd.MDF_CLIENT_LATENCY_STATS]:
+        """Summarize the statistics as CLIENT_LATENCY_STATS messages
+
+        Returns:
+            One message with the totals, with msg_type ALL_MESSAGE_TYPES, followed
+            by one message per received message type
+        """
+        msgs = [self._summary(cd.ALL_MESSAGE_TYPES, self.total)]
+        msgs[0].gaps = self.gaps
+        msgs[0].lost = self.lost
+        for msg_type, hist in sorted(self.by_type.items()):
+            msgs.append(self._summary(msg_type, hist))
+        return msgs
+
+    @staticmethod
+    def _summary(msg_type: int, hist: LatencyHistogram) -> cd.MDF_CLIENT_LATENCY_STATS:
+        msg = cd.MDF_CLIENT_LATENCY_STATS()
+        msg.msg_type = msg_type
+        msg.count = min(hist.count, 2**31 - 1)
+        msg.min = hist.min
+        msg.mean = hist.mean
+        msg.p50 = hist.percentile(50)
+        msg.p90 = hist.percentile(90)
+        msg.p99 = hist.percentile(99)
+        msg.max = hist.max
+        return msg
@@ -0,0 +1,307 @@
+"""pyrtma.stream module
+
+Contains :py:class:`~MessageStream` receive buffer and the :py:func:`~decode_message` helper
+shared by the client implementations
+"""
+
+import ctypes
+import socket
+import struct
+
+from .header import MessageHeader
+from .message import Message, LazyMessage, MessageData, get_msg_cls
+from .compression import is_compressed, restore_header, CompressedMessage
+from .exceptions import UnknownMessageType, InvalidMessageDefinition
+
+from typing import Optional, Type, Union
+
+__all__ = ["MessageStream", "check_message", "decode_message"]
+
+
+class MessageStream:
+    """Receive buffer that frames RTMA messages from a byte stream
+
+    Bytes are read from the socket in large chunks into a single buffer and
+    as many complete messages as the buffer contains are framed from it, so
+    a burst of messages costs one recv call instead of two per message.
+
+    A frame returned by :py:meth:`next_frame` remains valid until the next
+    call to :py:meth:`recv_into` or :py:meth:`feed`, which may compact the buffer.
+
+    Args:
+        header_cls: Message header class
+        buffer (optional): Preallocated receive buffer. Defaults to a new 1 MB buffer.
+    """
+
+    # Compact the buffer when less than this many bytes remain free at the end
+    MIN_FREE = 64 * 1024
+
+    def __init__(
+        self, header_cls: Type[MessageHeader], buffer: Optional[bytearray] = None
+    ):
+        self.header_cls = header_cls
+        self.header_size = ctypes.sizeof(header_cls)
+        self._int32 = struct.Struct("i")
+        self._num_data_bytes_offset = header_cls._num_data_bytes.offset  # type: ignore
+        self._msg_type_offset = header_cls._msg_type.offset  # type: ignore
+        self._set_buffer(buffer if buffer is not None else bytearray(1024**2))
+        self._start = 0  # first unframed byte
+        self._end = 0  # end of received bytes
+
+    @property
+    def buffer(self) -> bytearray:
+        """Underlying receive buffer"""
+        return self._buffer
+
+    @property
+    def view(self) -> memoryview:
+        """Memoryview of the underlying receive buffer"""
+        return self._view
+
+    @property
+    def pending_bytes(self) -> int:
+        """Number of received bytes that have not been framed yet"""
+        return self._end - self._start
+
+    def _set_buffer(self, buffer: bytearray):
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        # Base address for copying frames into existing ctypes objects
+        self._c_buffer = (ctypes.c_char * len(buffer)).from_buffer(buffer)
+        self._address = ctypes.addressof(self._c_buffer)
+
+    def has_frame(self) -> bool:
+        """Check whether a complete message is buffered"""
+        return self._frame_size() is not None
+
+    def clear(self):
+        """Discard all buffered bytes"""
+        self._start = 0
+        self._end = 0
+
+    def _frame_size(self) -> Optional[int]:
+        """Size of the next frame if it has been completely received"""
+        pending = self._end - self._start
+        if pending < self.header_size:
+            return None
+
+        (num_data_bytes,) = self._int32.unpack_from(
+            self._buffer, self._start + self._num_data_bytes_offset
+        )
+        size = self.header_size + num_data_bytes
+        if pending < size:
+            return None
+
+        return size
+
+    def next_frame(self) -> Optional[int]:
+        """Frame the next complete message
+
+        Returns:
+            Offset of the message header in :py:attr:`buffer`, or None if no
+            complete message is buffered. The message data follows the header.
+        """
+        size = self._frame_size()
+        if size is None:
+            return None
+
+        offset = self._start
+        self._start += size
+        return offset
+
+    def msg_type(self, offset: int) -> int:
+        """Read the message type of a framed message without decoding its header
+
+        Args:
+            offset (int): Offset returned by :py:meth:`next_frame`
+        """
+        (msg_type,) = self._int32.unpack_from(
+            self._buffer, offset + self._msg_type_offset
+        )
+        return msg_type
+
+    def unread(self, offset: int):
+        """Return the most recently framed message to the buffer
+
+        Args:
+            offset (int): Offset returned by the last call to :py:meth:`next_frame`
+        """
+        self._start = offset
+
+    def splice(self, offset: int):
+        """Frame the messages packed in the data of the most recently framed message
+
+        The next call to :py:meth:`next_frame` returns the first packed message.
+
+        Args:
+            offset (int): Offset returned by the last call to :py:meth:`next_frame`.
+                Its message data must consist of complete messages.
+        """
+        self._start = offset + self.header_size
+
+    def copy_into(self, obj: ctypes.Structure, offset: int, size: Optional[int] = None):
+        """Copy buffered bytes into an existing ctypes object
+
+        Args:
+            obj: Destination object
+            offset (int): Offset of the bytes in :py:attr:`buffer`
+            size (optional): Number of bytes to copy. Defaults to ctypes.sizeof(obj).
+        """
+        if size is None:
+            size = ctypes.sizeof(obj)
+        ctypes.memmove(ctypes.addressof(obj), self._address + offset, size)
+
+    def _reserve(self):
+        """Make room at the end of the buffer for the next read"""
+        if self._start == self._end:
+            self._start = self._end = 0
+            return
+
+        # Make sure a partially received frame will fit
+        pending = self._end - self._start
+        needed = self.header_size
+        if pending >= self.header_size:
+            (num_data_bytes,) = self._int32.unpack_from(
+                self._buffer, self._start + self._num_data_bytes_offset
+            )
+            needed += num_data_bytes
+        needed = max(needed, pending + self.MIN_FREE)
+
+        if len(self._buffer) - self._start >= needed:
+            return
+
+        if needed > len(self._buffer):
+            # Replace rather than resize so that existing views stay valid
+            buffer = bytearray(max(2 * len(self._buffer), needed))
+            buffer[:pending] = self._view[self._start : self._end]
+            self._set_buffer(buffer)
+        else:
+            self._view[:pending] = self._view[self._start : self._end]
+
+        self._start = 0
+        self._end = pending
+
+    def recv_into(self, sock: socket.socket) -> int:
+        """Read available bytes from a socket into the buffer
+
+        Args:
+            sock (socket.socket): Connected socket
+
+        Returns:
+            int: Number of bytes read. Zero indicates the connection was closed.
+        """
+        self._reserve()
+        nbytes = sock.recv_into(self._view[self._end :])
+        self._end += nbytes
+        return nbytes
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]):
+        """Append bytes that were received by other means
+
+        Args:
+            data: Received bytes
+        """
+        self._reserve()
+        nbytes = len(data)
+        if len(self._buffer) - self._end < nbytes:
+            buffer = bytearray(self._end + nbytes)
+            buffer[: self._end] = self._view[: self._end]
+            self._set_buffer(buffer)
+        self._view[self._end : self._end + nbytes] = data
+        self._end += nbytes
+
+
+def check_message(
+    header: MessageHeader,
+    payload: Union[bytes, bytearray, memoryview, None] = None,
+    sync_check: bool = False,
+) -> Type[MessageData]:
+    """Find the message data class for a header and check that the header matches it
+
+    Args:
+        header (MessageHeader): Message header
+        payload (optional): Message data bytes, attached to an UnknownMessageType error. Defaults to None.
+        sync_check (optional): Validate message definition matches header version. Defaults to False.
+
+    Raises:
+        UnknownMessageType: No message definition found for the message type
+        InvalidMessageDefinition: Message data does not match the message definition
+
+    Returns:
+        Type[MessageData]: Message data class
+    """
+    try:
+        msg_cls = get_msg_cls(header.msg_type)
+    except UnknownMessageType:
+        mt = header.msg_type
+        raise UnknownMessageType(
+            f"No message definition found for MT={mt}",
+            header,
+            bytes(payload) if payload is not None else b"",
+        )
+
+    type_size = msg_cls.type_size
+    if type_size == -1:  # not defined for v1 message defs
+        type_size = ctypes.sizeof(msg_cls)
+
+    if type_size != header.num_data_bytes:
+        raise InvalidMessageDefinition(
+            f"Received message header indicating a message data size ({header.num_data_bytes}) that does not match the expected size ({type_size}) of message type {msg_cls.type_name}. Message definitions may be out of sync across systems."
+        )
+
+    # Note: Ignore the sync check if header.version is not filled in
+    # This can removed once all clients support this field.
+    if sync_check and header.version != 0 and header.version != msg_cls.type_hash:
+        raise InvalidMessageDefinition(
+            f"Received message header indicating a message version that does not match the expected version of message type {msg_cls.type_name}. Message definitions may be out of sync across systems."
+        )
+
+    return msg_cls
+
+
+def decode_message(
+    header: MessageHeader,
+    payload: Union[bytes, bytearray, memoryview],
+    sync_check: bool = False,
+    lazy: bool = False,
+    copy: bool = True,
+) -> Message:
+    """Create a message object from a header and the raw message data
+
+    Args:
+        header (MessageHeader): Message header
+        payload: Message data bytes
+        sync_check (optional): Validate message definition matches header version. Defaults to False.
+        lazy (optional): Return a :py:class:`~pyrtma.message.LazyMessage` that decodes
+            the data on first access. Defaults to False. Compressed message data is
+            always decompressed on first access.
+        copy (optional): Copy the message data. When False, the message data is a
+            view of payload, which must be writable. Defaults to True.
+
+    Raises:
+        UnknownMessageType: No message definition found for the message type
+        InvalidMessageDefinition: Message data does not match the message definition
+
+    Returns:
+        Message: Message object
+    """
+    if is_compressed(header):
+        try:
+            codec = restore_header(header)
+        except ValueError as e:
+            raise InvalidMessageDefinition(str(e))
+        msg_cls = check_message(header, sync_check=sync_check)
+        return CompressedMessage(header, msg_cls, bytearray(payload), codec)
+
+    msg_cls = check_message(header, payload, sync_check)
+
+    if not header.num_data_bytes:
+        data = msg_cls()
+    elif not copy:
+        data = msg_cls.from_buffer(payload)
+    elif lazy:
+        return LazyMessage(header, msg_cls, bytearray(payload))
+    else:
+        data = msg_cls.from_buffer_copy(payload)
+
+    return Message(header, data)
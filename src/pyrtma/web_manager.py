@@ -90,12 +90,16 @@ class RTMAWebSocketHandler(WebSocketHandler):
 
         # Message Loop
         while self.keep_alive and self.proxy.connected:
-            rd, _, _ = select.select([self.rfile, self.proxy.sock], [], [], 0.100)
+            # Don't wait on the socket while messages are already buffered
+            buffered = self.proxy.has_buffered_messages
+            rd, _, _ = select.select(
+                [self.rfile, self.proxy.sock], [], [], 0 if buffered else 0.100
+            )
 
             if self.rfile in rd:
                 self.read_ws_message()
 
-            if self.proxy.sock in rd and self.proxy.connected:
+            if (buffered or self.proxy.sock in rd) and self.proxy.connected:
                 try:
                     msg = self.proxy.read_message(timeout=None, ack=True)
                 except RTMAMessageError as e:
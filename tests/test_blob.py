@@ -0,0 +1,60 @@
+import unittest
+
+import pyrtma.core_defs as cd
+from pyrtma.blob import BLOB_FIELDS, BlobAssembler
+
+
+def fragments(data: bytes, blob_id: int = 1, ack_every: int = 2):
+    size = cd.BLOB_FRAGMENT_SIZE
+    num_fragments = max(1, -(-len(data) // size))
+    for seq in range(num_fragments):
+        chunk = data[seq * size : (seq + 1) * size]
+        fields = BLOB_FIELDS.pack(
+            123, blob_id, seq, num_fragments, ack_every, len(chunk), len(data)
+        )
+        payload = fields + chunk + bytes(size - len(chunk))
+        yield memoryview(payload)
+
+
+class TestBlobAssembler(unittest.TestCase):
+    """Test reassembling blobs from fragments."""
+
+    def test_whenAllFragmentsArrive_blobIsReassembled(self):
+        # Arrange
+        assembler = BlobAssembler()
+        data = bytes(range(256)) * (cd.BLOB_FRAGMENT_SIZE * 3 // 256 + 1)
+
+        # Act
+        results = [assembler.feed(0, 20, payload) for payload in fragments(data)]
+
+        # Assert
+        blobs = [blob for blob, _ in results if blob is not None]
+        acks = [ack for _, ack in results if ack is not None]
+        self.assertEqual(len(blobs), 1)
+        self.assertEqual(blobs[0].data, data)
+        self.assertEqual(blobs[0].blob_type, 123)
+        self.assertEqual(blobs[0].src_mod_id, 20)
+        self.assertEqual(acks, [(1, 1), (1, 3)])
+
+    def test_whenFragmentIsMissing_blobIsDropped(self):
+        # Arrange
+        assembler = BlobAssembler()
+        payloads = list(fragments(bytes(cd.BLOB_FRAGMENT_SIZE * 3)))
+
+        # Act
+        results = [assembler.feed(0, 20, payloads[i]) for i in (0, 2)]
+
+        # Assert
+        self.assertEqual(results, [(None, None), (None, None)])
+        self.assertEqual(assembler.dropped, 1)
+
+    def test_whenBlobIsTooLarge_itIsDropped(self):
+        # Arrange
+        assembler = BlobAssembler(max_size=10)
+
+        # Act
+        results = [assembler.feed(0, 20, p) for p in fragments(bytes(11))]
+
+        # Assert
+        self.assertEqual(results, [(None, None)])
+        self.assertEqual(assembler.dropped, 1)
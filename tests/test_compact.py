@@ -0,0 +1,60 @@
+import unittest
+
+import pyrtma.core_defs as cd
+from pyrtma.compact import (
+    trimmed_size,
+    is_compact,
+    compact_header,
+    expand_header,
+    expand_payload,
+)
+from pyrtma.header import MessageHeader
+
+
+class TestCompactEncoding(unittest.TestCase):
+    """Test trimming and restoring trailing zero bytes."""
+
+    def test_whenDataEndsInZeros_trimmedSizeExcludesThem(self):
+        # Arrange
+        msg = cd.MDF_RTMA_LOG()
+        msg.name = "test"
+
+        # Act
+        size = trimmed_size(msg)
+
+        # Assert
+        self.assertLess(size, msg.type_size)
+        self.assertEqual(trimmed_size(b"\x01\x00\x02\x00\x00"), 3)
+        self.assertEqual(trimmed_size(bytes(8)), 0)
+
+    def test_whenDataSpansManyBlocks_trimmedSizeFindsLastNonzeroByte(self):
+        # Arrange
+        data = bytearray(100_000)
+        data[5] = 1
+        data[50_000] = 2
+
+        # Act
+        size = trimmed_size(data)
+
+        # Assert
+        self.assertEqual(size, 50_001)
+        data[-1] = 3
+        self.assertEqual(trimmed_size(data), len(data))
+
+    def test_whenHeaderIsCompacted_expandingRestoresIt(self):
+        # Arrange
+        header = MessageHeader()
+        header.num_data_bytes = 100
+
+        # Act
+        compact_header(header, 10)
+        compact = (is_compact(header), header.num_data_bytes, header.remaining_bytes)
+        data = expand_payload(header, b"x" * 10)
+
+        # Assert
+        self.assertEqual(compact, (True, 10, 90))
+        self.assertFalse(is_compact(header))
+        self.assertEqual(header.num_data_bytes, 100)
+        self.assertEqual(header.remaining_bytes, 0)
+        self.assertEqual(data, b"x" * 10 + bytes(90))
+        self.assertEqual(expand_header(header), 100)
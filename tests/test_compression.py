@@ -0,0 +1,134 @@
+import unittest
+import zlib
+
+from pyrtma import core_defs as cd
+from pyrtma.compression import (
+    Codec,
+    CompressedMessage,
+    register_codec,
+    get_codec,
+    is_compressed,
+    compress_payload,
+    decompress_payload,
+)
+from pyrtma.exceptions import InvalidMessageDefinition
+from pyrtma.header import MessageHeader
+from pyrtma.stream import decode_message
+
+
+def make_header(msg: cd.MDF_RTMA_LOG) -> MessageHeader:
+    header = MessageHeader()
+    header.msg_type = msg.type_id
+    header.num_data_bytes = msg.type_size
+    return header
+
+
+def make_message() -> cd.MDF_RTMA_LOG:
+    msg = cd.MDF_RTMA_LOG()
+    msg.message = "compressible " * 10
+    return msg
+
+
+class TestCompression(unittest.TestCase):
+    def test_whenCompressed_roundTripRestoresHeaderAndData(self):
+        # Arrange
+        msg = make_message()
+        header = make_header(msg)
+
+        # Act
+        compressed = compress_payload(header, msg, get_codec("zlib"))
+        sent_size = header.num_data_bytes
+        was_compressed = is_compressed(header)
+        data = decompress_payload(header, compressed)
+
+        # Assert
+        self.assertTrue(was_compressed)
+        self.assertEqual(sent_size, len(compressed))
+        self.assertEqual(header.num_data_bytes, msg.type_size)
+        self.assertEqual(header.remaining_bytes, 0)
+        self.assertFalse(is_compressed(header))
+        self.assertEqual(bytes(data), bytes(msg))
+
+    def test_whenCompressionDoesNotShrink_headerUnchanged(self):
+        # Arrange
+        msg = cd.MDF_TIME_SYNC_REQUEST()
+        header = make_header(msg)
+
+        # Act
+        compressed = compress_payload(header, msg, get_codec(cd.CODEC_LZMA))
+
+        # Assert
+        self.assertIsNone(compressed)
+        self.assertFalse(is_compressed(header))
+        self.assertEqual(header.num_data_bytes, msg.type_size)
+
+    def test_whenExpandedSizeExceedsLimit_raisesValueError(self):
+        # Arrange
+        msg = make_message()
+        header = make_header(msg)
+        compressed = compress_payload(header, msg, get_codec("zlib"))
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            decompress_payload(header, compressed, max_size=msg.type_size - 1)
+
+    def test_whenDataCorrupt_raisesValueError(self):
+        # Arrange
+        msg = make_message()
+        header = make_header(msg)
+        compress_payload(header, msg, get_codec("zlib"))
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            decompress_payload(header, b"corrupt")
+
+    def test_whenDecoded_dataDecompressedOnFirstAccess(self):
+        # Arrange
+        msg = make_message()
+        header = make_header(msg)
+        compressed = compress_payload(header, msg, get_codec("lzma"))
+
+        # Act
+        decoded = decode_message(header, compressed)
+
+        # Assert
+        self.assertIsInstance(decoded, CompressedMessage)
+        self.assertFalse(decoded.decoded)
+        self.assertEqual(decoded.data.message, msg.message)
+        self.assertTrue(decoded.decoded)
+
+    def test_whenDecodedDataCorrupt_accessRaisesInvalidMessageDefinition(self):
+        # Arrange
+        msg = make_message()
+        header = make_header(msg)
+        compress_payload(header, msg, get_codec("zlib"))
+        decoded = decode_message(header, b"corrupt")
+
+        # Act / Assert
+        with self.assertRaises(InvalidMessageDefinition):
+            decoded.data
+
+    def test_whenCustomCodecRegistered_usedByIdAndName(self):
+        # Arrange
+        codec = Codec(200, "test_zlib1", lambda b: zlib.compress(b, 1), zlib.decompress)  # type: ignore
+
+        # Act
+        register_codec(codec)
+
+        # Assert
+        self.assertIs(get_codec(200), codec)
+        self.assertIs(get_codec("test_zlib1"), codec)
+
+    def test_whenCodecConflicts_raisesValueError(self):
+        # Arrange
+        codec = Codec(cd.CODEC_ZLIB, "other", zlib.compress, zlib.decompress)  # type: ignore
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            register_codec(codec)
+        with self.assertRaises(ValueError):
+            get_codec("unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
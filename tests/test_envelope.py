@@ -0,0 +1,85 @@
+import ctypes
+import unittest
+
+from pyrtma import core_defs as cd
+from pyrtma.envelope import envelope_offsets
+from pyrtma.header import MessageHeader
+from pyrtma.stream import MessageStream
+
+MT_SAMPLE = 1234
+SAMPLE_SIZE = 64
+
+
+def pack(count: int, msg_type: int = MT_SAMPLE, dest_mod_id: int = 0) -> bytearray:
+    payload = bytearray()
+    for _ in range(count):
+        header = MessageHeader()
+        header.msg_type = msg_type
+        header.dest_mod_id = dest_mod_id
+        header.num_data_bytes = SAMPLE_SIZE
+        payload += bytes(header) + bytes(SAMPLE_SIZE)
+    return payload
+
+
+class TestEnvelope(unittest.TestCase):
+    def setUp(self):
+        self.header_size = ctypes.sizeof(MessageHeader)
+
+    def test_whenEnvelopeValid_returnsOffsetsOfEachMessage(self):
+        # Arrange
+        payload = pack(3)
+        frame_size = self.header_size + SAMPLE_SIZE
+
+        # Act
+        offsets = envelope_offsets(MessageHeader, payload)
+
+        # Assert
+        self.assertEqual(offsets, [0, frame_size, 2 * frame_size])
+
+    def test_whenEnvelopeTruncated_raisesValueError(self):
+        # Arrange
+        payload = pack(1)
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            envelope_offsets(MessageHeader, payload[:-1])
+        with self.assertRaises(ValueError):
+            envelope_offsets(MessageHeader, payload + bytes(self.header_size - 1))
+
+    def test_whenDestinationsDiffer_raisesValueError(self):
+        # Arrange
+        payload = pack(1) + pack(1, dest_mod_id=5)
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            envelope_offsets(MessageHeader, payload)
+
+    def test_whenCoreMessagePacked_raisesValueError(self):
+        # Arrange
+        payload = pack(1, msg_type=cd.MT_TIMING_MESSAGE)
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            envelope_offsets(MessageHeader, payload)
+
+    def test_whenSpliced_packedMessagesAreFramed(self):
+        # Arrange
+        payload = pack(2)
+        header = MessageHeader()
+        header.msg_type = cd.MT_ENVELOPE
+        header.num_data_bytes = len(payload)
+        stream = MessageStream(MessageHeader)
+        stream.feed(bytes(header) + payload)
+
+        # Act
+        offset = stream.next_frame()
+        stream.splice(offset)
+        frames = [stream.next_frame(), stream.next_frame(), stream.next_frame()]
+
+        # Assert
+        self.assertEqual([stream.msg_type(f) for f in frames[:2]], [MT_SAMPLE] * 2)
+        self.assertIsNone(frames[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
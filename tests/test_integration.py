@@ -1,14 +1,31 @@
+import asyncio
+import contextlib
+import io
+import os
+import socket
 import random
+import tempfile
 import threading
 import time
 import unittest
 import logging
 
+from unittest import mock
+
+from typing import Any, Dict
+
 import pyrtma
 from pyrtma import message_def
 from pyrtma.message_base import MessageMeta
 from pyrtma.client import Client, client_context
-from pyrtma.manager import MessageManager
+from pyrtma.compression import CompressedMessage
+from pyrtma.exceptions import InvalidSubscription, RequestTimeout
+from pyrtma.header import MessageHeader
+from pyrtma.manager import MessageManager, Module, RangeIndex
+from pyrtma.recorder import INDEX_RECORD
+from pyrtma.socket_profile import SocketProfile
+from pyrtma.stream import decode_message
+from pyrtma.stats import hop_latency
 from pyrtma.validators import (
     Int32,
     Double,
@@ -16,6 +33,8 @@ from pyrtma.validators import (
     ByteArray,
 )
 
+from .test_socket_profile import effective_size
+
 # Choose a unique message type id number
 MT_TEST_MESSAGE = 123
 MT_TEST_MESSAGE2 = 456
@@ -52,6 +71,37 @@ def wait_for_message():
     time.sleep(0.1)
 
 
+class ManagerTestCase(unittest.TestCase):
+    """
+    Base class for tests that need a running manager.
+    """
+
+    manager_kwargs: Dict[str, Any] = {}
+
+    def setUp(self):
+        self.port = random.randint(1000, 10000)  # random port
+        self.addr = f"127.0.0.1:{self.port}"
+
+        self.manager = MessageManager(
+            ip_address="127.0.0.1",
+            port=self.port,
+            timecode=False,
+            log_level=logging.ERROR,
+            debug=False,
+            send_msg_timing=True,
+            **self.manager_kwargs,
+        )
+        self.manager_thread = threading.Thread(
+            target=self.manager.run,
+        )
+        self.manager_thread.start()
+        wait_for_message()
+
+    def tearDown(self):
+        self.manager.close()
+        self.manager_thread.join()
+
+
 class TestSingleClient(unittest.TestCase):
     """
     Test interactions between a single client and manager.
@@ -777,3 +827,1709 @@ class TestSingleContextClient(unittest.TestCase):
                 [mod.mod_id for mod in self.manager.subscriptions[MT_TEST_MESSAGE2]],
                 msg="Module id not found in TEST_MESSAGE2 subscriptions",
             )
+
+
+class TestManagerRecorder(ManagerTestCase):
+    """
+    Test the message manager's built-in traffic recorder.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.record_file = os.path.join(self.tmpdir.name, "traffic.dat")
+        self.manager_kwargs = dict(
+            record_file=self.record_file, record_format="indexed"
+        )
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.tmpdir.cleanup()
+
+    def test_whenClientPublishes_messageIsRecorded(self):
+        """
+        Test if a published message is written to the recording and index files.
+        """
+        # Arrange
+        msg = TEST_MESSAGE()
+        msg.val = 3.5
+
+        # Act
+        with client_context(server_name=self.addr) as client:
+            client.send_message(msg)
+            wait_for_message()
+        wait_for_message()
+        self.manager.close()
+        self.manager_thread.join()
+
+        # Assert
+        with open(self.record_file, "rb") as f:
+            raw = f.read()
+        with open(os.path.splitext(self.record_file)[0] + ".idx", "rb") as f:
+            index = f.read()
+
+        self.assertEqual(len(raw), sum(r[1] for r in INDEX_RECORD.iter_unpack(index)))
+        records = [
+            r for r in INDEX_RECORD.iter_unpack(index) if r[2] == MT_TEST_MESSAGE
+        ]
+        self.assertEqual(len(records), 1, msg="TEST_MESSAGE not found in index.")
+
+        offset, size, *_ = records[0]
+        hdr = pyrtma.MessageHeader.from_buffer_copy(raw, offset)
+        data = TEST_MESSAGE.from_buffer_copy(raw, offset + hdr.size)
+        self.assertEqual(size, hdr.size + hdr.num_data_bytes)
+        self.assertEqual(data.val, 3.5)
+
+
+class TestConsumerGroups(ManagerTestCase):
+    """
+    Test load-balanced delivery to consumer groups.
+    """
+
+    def drain(self, client):
+        msgs = []
+        while (msg := client.read_message(timeout=0.1)) is not None:
+            msgs.append(msg)
+        return msgs
+
+    def test_whenGroupMembersSubscribe_messagesAreRoundRobined(self):
+        """
+        Test if each message is delivered to exactly one group member.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as worker1,
+            client_context(server_name=self.addr) as worker2,
+        ):
+            worker1.subscribe([MT_TEST_MESSAGE2], group="decoders")
+            worker2.subscribe([MT_TEST_MESSAGE2], group="decoders")
+            wait_for_message()
+
+            # Act
+            for i in range(4):
+                msg = TEST_MESSAGE2()
+                msg.val = i
+                pub.send_message(msg)
+            wait_for_message()
+
+            # Assert
+            vals1 = [m.data.val for m in self.drain(worker1)]
+            vals2 = [m.data.val for m in self.drain(worker2)]
+            self.assertEqual(len(vals1), 2)
+            self.assertEqual(len(vals2), 2)
+            self.assertEqual(sorted(vals1 + vals2), [0, 1, 2, 3])
+
+            # Leaving the group stops delivery to that member
+            worker1.unsubscribe([MT_TEST_MESSAGE2])
+            wait_for_message()
+            pub.send_message(TEST_MESSAGE2())
+            wait_for_message()
+            self.assertEqual(len(self.drain(worker1)), 0)
+            self.assertEqual(len(self.drain(worker2)), 1)
+
+    def test_whenGroupHashesSource_eachPublisherMapsToOneMember(self):
+        """
+        Test if the source hash policy pins each publisher to one member.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub1,
+            client_context(server_name=self.addr) as pub2,
+            client_context(server_name=self.addr) as worker1,
+            client_context(server_name=self.addr) as worker2,
+        ):
+            worker1.subscribe([MT_TEST_MESSAGE2], group="decoders", group_key="source")
+            worker2.subscribe([MT_TEST_MESSAGE2], group="decoders", group_key="source")
+            wait_for_message()
+
+            # Act
+            for _ in range(3):
+                pub1.send_message(TEST_MESSAGE2())
+                pub2.send_message(TEST_MESSAGE2())
+            wait_for_message()
+
+            # Assert
+            srcs1 = {m.header.src_mod_id for m in self.drain(worker1)}
+            srcs2 = {m.header.src_mod_id for m in self.drain(worker2)}
+            self.assertEqual(srcs1 | srcs2, {pub1.module_id, pub2.module_id})
+            self.assertEqual(len(srcs1 & srcs2), 0)
+
+    def test_whenGroupHashesField_equalKeysMapToOneMember(self):
+        """
+        Test if the field hash policy delivers equal keys to the same member.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as worker1,
+            client_context(server_name=self.addr) as worker2,
+        ):
+            worker1.subscribe([MT_TEST_MESSAGE2], group="decoders", group_key="val")
+            worker2.subscribe([MT_TEST_MESSAGE2], group="decoders", group_key="val")
+            wait_for_message()
+
+            # Act
+            for i in range(40):
+                msg = TEST_MESSAGE2()
+                msg.val = i % 8
+                pub.send_message(msg)
+            wait_for_message()
+
+            # Assert
+            vals1 = [m.data.val for m in self.drain(worker1)]
+            vals2 = [m.data.val for m in self.drain(worker2)]
+            self.assertEqual(len(vals1) + len(vals2), 40)
+            self.assertEqual(len(set(vals1) & set(vals2)), 0)
+            self.assertTrue(vals1 and vals2, msg="All keys hashed to one member.")
+
+    def test_whenGroupKeyIsInvalid_subscriptionIsRejected(self):
+        """
+        Test if unknown key fields and out of range key offsets are rejected.
+        """
+        with client_context(server_name=self.addr) as worker:
+            # Unknown field name is rejected by the client
+            with self.assertRaises(InvalidSubscription):
+                worker.subscribe([MT_TEST_MESSAGE2], group="decoders", group_key="x")
+
+            # Key outside of the message is rejected by the manager
+            sub = pyrtma.core_defs.MDF_SUBSCRIBE_GROUP()
+            sub.msg_type = MT_TEST_MESSAGE2
+            sub.group = "decoders"
+            sub.policy = pyrtma.core_defs.GROUP_HASH_FIELD
+            sub.key_offset = 8
+            sub.key_size = 8
+            worker.send_message(sub)
+            wait_for_message()
+
+            self.assertNotIn("decoders", self.manager.groups[MT_TEST_MESSAGE2])
+
+    def test_whenManagerLacksGroups_subscriptionIsRejected(self):
+        """
+        Test if group subscriptions to a manager without consumer groups raise.
+        """
+        # Arrange
+        with client_context(server_name=self.addr) as worker:
+            worker._manager_capabilities &= ~pyrtma.core_defs.MM_CAP_GROUPS
+
+            # Act / Assert
+            with self.assertRaises(InvalidSubscription):
+                worker.subscribe([MT_TEST_MESSAGE2], group="decoders")
+            self.assertNotIn(MT_TEST_MESSAGE2, worker.subscribed_types)
+
+
+class TestRangeSubscriptions(ManagerTestCase):
+    """
+    Test message type range subscriptions.
+    """
+
+    def test_whenClientSubscribesRange_messagesInRangeAreReceived(self):
+        """
+        Test if messages with types inside a subscribed range are delivered.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe_range(100, 200)
+            sub.subscribe([MT_TEST_MESSAGE])  # overlaps the range
+            wait_for_message()
+
+            # Act
+            pub.send_message(TEST_MESSAGE())
+            pub.send_message(TEST_MESSAGE2())
+            wait_for_message()
+
+            # Assert
+            msg = sub.read_message(timeout=0.1)
+            self.assertIsNotNone(msg)
+            self.assertEqual(msg.type_id, MT_TEST_MESSAGE)
+            self.assertIsNone(sub.read_message(timeout=0.1))
+
+            sub.unsubscribe_range(100, 200)
+            sub.unsubscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            self.assertFalse(self.manager.range_index)
+
+    def test_whenRangesOverlap_lookupReturnsEveryCoveringModule(self):
+        """
+        Test if the range index resolves overlapping and adjacent ranges.
+        """
+        # Arrange
+        a, b = (Module(uid, None, ("", 0), MessageHeader) for uid in (1, 2))
+        index = RangeIndex()
+
+        # Act
+        index.add(100, 200, a)
+        index.add(150, 250, b)
+        index.add(150, 160, a)
+        index.add(251, 300, a)
+
+        # Assert
+        self.assertEqual(index.lookup(99), set())
+        self.assertEqual(index.lookup(100), {a})
+        self.assertEqual(index.lookup(155), {a, b})
+        self.assertEqual(index.lookup(201), {b})
+        self.assertEqual(index.lookup(251), {a})
+        self.assertEqual(index.lookup(301), set())
+
+        index.remove(100, 200, a)
+        self.assertEqual(index.lookup(155), {a, b})
+        self.assertEqual(index.lookup(170), {b})
+
+    def test_whenRangesSubscribed_clientFiltersByMergedRanges(self):
+        """
+        Test if the client's own range filter matches overlapping and adjacent ranges.
+        """
+        with client_context(server_name=self.addr) as sub:
+            # Arrange
+            sub.subscribe_range(100, 200)
+            sub.subscribe_range(150, 250)
+            sub.subscribe_range(251, 300)
+            sub.subscribe_range(400, 400)
+
+            # Act
+            subscribed = [
+                t
+                for t in (99, 100, 220, 251, 300, 301, 400, 401)
+                if sub._is_subscribed(t)
+            ]
+
+            # Assert
+            self.assertEqual(subscribed, [100, 220, 251, 300, 400])
+            sub.unsubscribe_range(150, 250)
+            self.assertFalse(sub._is_subscribed(220))
+
+    def test_whenManagerLacksRanges_subscriptionIsRejected(self):
+        """
+        Test if range subscriptions to a manager without range support raise.
+        """
+        with client_context(server_name=self.addr) as sub:
+            # Arrange
+            sub._manager_capabilities &= ~pyrtma.core_defs.MM_CAP_RANGES
+
+            # Act / Assert
+            with self.assertRaises(InvalidSubscription):
+                sub.subscribe_range(100, 200)
+            self.assertEqual(sub.subscribed_ranges, set())
+
+
+class TestSubscribeMany(ManagerTestCase):
+    """
+    Test batched subscription control messages.
+    """
+
+    def test_whenClientSubscribesMany_allTypesSubscribedWithOneAckPerBatch(self):
+        """
+        Test if a large subscription list is sent in batches with one ACK each.
+        """
+        # Arrange
+        msg_types = list(range(1000, 1300))  # more than MAX_SUBS
+
+        with client_context(server_name=self.addr) as client:
+            self.assertTrue(
+                client.manager_capabilities & pyrtma.core_defs.MM_CAP_SUBSCRIBE_MANY
+            )
+            client.subscribe([pyrtma.core_defs.MT_ACKNOWLEDGE])
+            wait_for_message()
+            client.discard_messages(0.1)
+
+            # Act
+            client.subscribe(msg_types)
+            wait_for_message()
+
+            # Assert
+            for mt in msg_types:
+                self.assertIn(
+                    client.module_id,
+                    [mod.mod_id for mod in self.manager.subscriptions[mt]],
+                )
+
+            acks = 0
+            while client.read_message(timeout=0.1) is not None:
+                acks += 1
+            self.assertEqual(acks, 2)
+
+
+class TestBufferedReads(ManagerTestCase):
+    """
+    Test reading bursts of messages through the client receive buffer.
+    """
+
+    def test_whenBurstIsReceived_messagesAreServedFromBuffer(self):
+        """
+        Test if a burst of messages is framed from the receive buffer in order.
+        """
+        # Arrange
+        n = 500
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE2])
+            wait_for_message()
+
+            # Act
+            for i in range(n):
+                msg = TEST_MESSAGE2()
+                msg.val = i
+                pub.send_message(msg)
+            wait_for_message()
+
+            msgs = [sub.read_message(timeout=0.1)]
+            self.assertTrue(sub.has_buffered_messages)
+            while (msg := sub.read_message(timeout=0.1)) is not None:
+                msgs.append(msg)
+
+            # Assert
+            self.assertEqual([m.data.val for m in msgs], list(range(n)))
+            self.assertFalse(sub.has_buffered_messages)
+
+    def test_whenReadingBatches_allAvailableMessagesAreReturned(self):
+        """
+        Test if read_messages drains available messages up to max_count.
+        """
+        # Arrange
+        n = 100
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE2])
+            wait_for_message()
+
+            for i in range(n):
+                msg = TEST_MESSAGE2()
+                msg.val = i
+                pub.send_message(msg)
+                pub.send_message(TEST_MESSAGE())  # not subscribed
+            wait_for_message()
+
+            # Act
+            first = sub.read_messages(max_count=10, timeout=0.1)
+            rest = list(sub.iter_messages(timeout=0.1))
+
+            # Assert
+            self.assertEqual([m.data.val for m in first], list(range(10)))
+            self.assertEqual([m.data.val for m in rest], list(range(10, n)))
+            self.assertEqual(sub.read_messages(timeout=0), [])
+
+    def test_whenFramesAreBuffered_socketIsStillDrained(self):
+        """
+        Test if read_messages also reads data waiting in the socket once buffered frames run out.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE2])
+            wait_for_message()
+
+            for i in range(20):
+                msg = TEST_MESSAGE2()
+                msg.val = i
+                pub.send_message(msg)
+            wait_for_message()
+            first = sub.read_message(timeout=0.1)
+            self.assertTrue(sub.has_buffered_messages)
+
+            for i in range(20, 40):
+                msg = TEST_MESSAGE2()
+                msg.val = i
+                pub.send_message(msg)
+            wait_for_message()
+
+            # Act
+            msgs = sub.read_messages(timeout=0)
+
+            # Assert
+            self.assertEqual(first.data.val, 0)
+            self.assertEqual([m.data.val for m in msgs], list(range(1, 40)))
+
+    def test_whenMaxCountIsNotPositive_valueErrorIsRaised(self):
+        with client_context(server_name=self.addr) as sub:
+            for max_count in (0, -1):
+                with self.assertRaises(ValueError):
+                    sub.read_messages(max_count=max_count, timeout=0)
+
+    def test_whenBatchIsSent_messagesArriveInOrder(self):
+        """
+        Test if send_messages delivers a large mixed batch in order.
+        """
+        # Arrange
+        n = 1500  # more buffers than a single sendmsg call accepts
+        batch = []
+        for i in range(n):
+            msg = TEST_MESSAGE2() if i % 2 else TEST_MESSAGE()
+            msg.val = i
+            batch.append(msg)
+
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE, MT_TEST_MESSAGE2])
+            wait_for_message()
+
+            # Act
+            count = pub.msg_count
+            pub.send_messages(batch)
+            wait_for_message()
+            msgs = list(sub.iter_messages(timeout=0.1))
+
+            # Assert
+            self.assertEqual([m.data.val for m in msgs], list(range(n)))
+            counts = [m.header.msg_count for m in msgs]
+            self.assertEqual(counts, list(range(counts[0], counts[0] + n)))
+            self.assertEqual(pub.msg_count, count + n)
+
+
+class TestHeaderFilter(ManagerTestCase):
+    """
+    Test filtering received messages by header before decoding them.
+    """
+
+    def test_whenUnsubscribedMessagesAreBuffered_theyAreNotDecoded(self):
+        """
+        Test if read_message skips stale unsubscribed messages without decoding them.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE, MT_TEST_MESSAGE2])
+            wait_for_message()
+            for i in range(5):
+                pub.send_message(TEST_MESSAGE2())
+            msg = TEST_MESSAGE()
+            msg.val = 3.0
+            pub.send_message(msg)
+            wait_for_message()
+            sub.unsubscribe([MT_TEST_MESSAGE2])
+
+            # Act
+            with mock.patch(
+                "pyrtma.client.decode_message", wraps=decode_message
+            ) as decode:
+                read = sub.read_message(timeout=0.5)
+
+            # Assert
+            self.assertEqual(read.data.val, 3.0)
+            self.assertEqual(decode.call_count, 1)
+
+    def test_whenOnlyUnsubscribedMessagesArrive_timeoutIsOverall(self):
+        """
+        Test if the read timeout is not restarted for every skipped message.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE2])
+            wait_for_message()
+            # Drop the type locally only, so the manager keeps forwarding it
+            sub._subscribed_types.discard(MT_TEST_MESSAGE2)
+
+            def publish():
+                for _ in range(6):
+                    pub.send_message(TEST_MESSAGE2())
+                    time.sleep(0.05)
+
+            thread = threading.Thread(target=publish)
+
+            # Act
+            thread.start()
+            t0 = time.perf_counter()
+            read = sub.read_message(timeout=0.2)
+            elapsed = time.perf_counter() - t0
+            thread.join()
+
+            # Assert
+            self.assertIsNone(read)
+            self.assertLess(elapsed, 0.3)
+
+    def test_whenReadWithoutCopy_messageIsValidUntilNextRead(self):
+        """
+        Test if zero-copy reads return messages that can be copied to keep them.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE2])
+            wait_for_message()
+            for i in range(3):
+                msg = TEST_MESSAGE2()
+                msg.val = i
+                pub.send_message(msg)
+            wait_for_message()
+
+            # Act
+            vals = []
+            kept = []
+            while (read := sub.read_message(timeout=0.1, copy=False)) is not None:
+                vals.append(read.data.val)
+                kept.append(read.copy())
+
+            # Assert
+            self.assertEqual(vals, [0, 1, 2])
+            self.assertEqual([m.data.val for m in kept], [0, 1, 2])
+            self.assertTrue(all(m.header.recv_time > 0 for m in kept))
+
+    def test_whenPoolIsEnabled_messagesAreReusedUntilDetached(self):
+        """
+        Test if pooled reads fill the same objects in place and detach keeps one.
+        """
+        # Arrange
+        sub = Client(pool_size=1)
+        sub.connect(self.addr)
+        try:
+            with client_context(server_name=self.addr) as pub:
+                sub.subscribe([MT_TEST_MESSAGE2])
+                wait_for_message()
+                for i in range(3):
+                    msg = TEST_MESSAGE2()
+                    msg.val = i
+                    pub.send_message(msg)
+                wait_for_message()
+
+                # Act
+                first = sub.read_message(timeout=0.1)
+                kept = sub.detach(first)
+                second = sub.read_message(timeout=0.1)
+                second_val = second.data.val
+                third = sub.read_message(timeout=0.1)
+
+                # Assert
+                self.assertEqual(kept.data.val, 0)
+                self.assertIsNot(second, kept)
+                self.assertEqual(second_val, 1)
+                self.assertIs(third, second)
+                self.assertEqual(third.data.val, 2)
+                self.assertGreater(third.header.recv_time, 0)
+        finally:
+            sub.disconnect()
+
+    def test_whenLazyDecodeIsEnabled_dataIsDecodedOnAccess(self):
+        """
+        Test if a lazy decoding client returns LazyMessage objects.
+        """
+        # Arrange
+        sub = Client(lazy_decode=True)
+        sub.connect(self.addr)
+        try:
+            with client_context(server_name=self.addr) as pub:
+                sub.subscribe([MT_TEST_MESSAGE2])
+                wait_for_message()
+                msg = TEST_MESSAGE2()
+                msg.val = 4.5
+                pub.send_message(msg)
+
+                # Act
+                read = sub.read_message(timeout=0.5)
+
+                # Assert
+                self.assertIsInstance(read, pyrtma.LazyMessage)
+                self.assertFalse(read.decoded)
+                self.assertEqual(read.header.msg_type, MT_TEST_MESSAGE2)
+                self.assertEqual(read.data.val, 4.5)
+        finally:
+            sub.disconnect()
+
+
+class TestPreparedMessage(ManagerTestCase):
+    """
+    Test repeated publishing through a prepared send buffer.
+    """
+
+    def test_whenPreparedMessageIsSent_fieldsAndCountsAreStamped(self):
+        """
+        Test if field setters and data view writes reach subscribers with fresh counts.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            prepared = pub.prepare(TEST_MESSAGE)
+            set_val = prepared.setter("val")
+            prepared.data.arr[:] = list(range(8))
+
+            # Act
+            for i in range(5):
+                set_val(i)
+                prepared.send()
+            msgs = []
+            while len(msgs) < 5 and (msg := sub.read_message(timeout=0.5)):
+                msgs.append(msg)
+
+            # Assert
+            self.assertEqual([m.data.val for m in msgs], list(range(5)))
+            self.assertTrue(all(list(m.data.arr) == list(range(8)) for m in msgs))
+            counts = [m.header.msg_count for m in msgs]
+            self.assertEqual(counts, list(range(counts[0], counts[0] + 5)))
+            self.assertEqual(msgs[0].header.src_mod_id, pub.module_id)
+            self.assertEqual(msgs[0].header.version, TEST_MESSAGE.type_hash)
+
+    def test_whenFieldIsNotScalar_setterRaisesValueError(self):
+        """
+        Test if setters are only offered for numeric scalar fields.
+        """
+        with client_context(server_name=self.addr) as pub:
+            prepared = pub.prepare(TEST_MESSAGE())
+
+            with self.assertRaises(ValueError):
+                prepared.setter("arr")
+            with self.assertRaises(ValueError):
+                prepared.setter("missing")
+
+
+class TestClientStats(ManagerTestCase):
+    """
+    Test client latency statistics and loss detection.
+    """
+
+    def test_whenStatsAreEnabled_latencyIsRecordedAndPublished(self):
+        """
+        Test if received messages are timed and the summary can be published.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+            client_context(server_name=self.addr) as monitor,
+        ):
+            monitor.subscribe([pyrtma.core_defs.MT_CLIENT_LATENCY_STATS])
+            sub.subscribe([MT_TEST_MESSAGE2])
+            sub.enable_stats()
+            wait_for_message()
+
+            # Act
+            for i in range(10):
+                pub.send_message(TEST_MESSAGE2())
+            msgs = []
+            while len(msgs) < 10 and (msg := sub.read_message(timeout=0.5)):
+                msgs.append(msg)
+            sub.publish_stats()
+            summary = {}
+            while msg := monitor.read_message(timeout=0.5):
+                summary[msg.data.msg_type] = msg.data
+
+            # Assert
+            hist = sub.stats().by_type[MT_TEST_MESSAGE2]
+            self.assertEqual(hist.count, 10)
+            self.assertGreater(hist.min, 0)
+            self.assertLess(hist.max, 1.0)
+            self.assertEqual(sub.stats().lost, 0)
+            totals = summary[pyrtma.core_defs.ALL_MESSAGE_TYPES]
+            by_type = summary[MT_TEST_MESSAGE2]
+            self.assertGreaterEqual(totals.count, 10)
+            self.assertEqual(by_type.count, 10)
+            self.assertAlmostEqual(by_type.max, hist.max)
+
+    def test_whenManagerDropsMessages_lossIsDetected(self):
+        """
+        Test if messages the manager could not deliver show up as lost.
+        """
+        # Arrange
+        n = 20000
+        sub = Client()
+        sub.connect(self.addr, socket_profile=SocketProfile(rcvbuf=4096))
+        try:
+            with client_context(server_name=self.addr) as pub:
+                sub.subscribe([MT_TEST_MESSAGE])
+                sub.enable_stats()
+                wait_for_message()
+
+                # Act
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for _ in range(n):
+                        pub.send_message(TEST_MESSAGE())
+                    wait_for_message()
+                    received = len(sub.read_messages(timeout=0.5))
+                    while msgs := sub.read_messages(timeout=0.2):
+                        received += len(msgs)
+
+                # Assert
+                stats = sub.stats()
+                self.assertGreater(stats.lost, 0)
+                self.assertGreater(stats.gaps, 0)
+                self.assertEqual(received + stats.lost, n)
+        finally:
+            sub.disconnect()
+
+
+class TestSocketProfiles(ManagerTestCase):
+    """
+    Test socket profiles applied by the client and the manager.
+    """
+
+    manager_kwargs = dict(
+        socket_profile=SocketProfile(sndbuf=128 * 1024),
+        logger_socket_profile=SocketProfile(sndbuf=256 * 1024, keepalive=True),
+    )
+
+    def manager_conn(self, client: Client) -> socket.socket:
+        for conn, module in self.manager.modules.items():
+            if module.mod_id == client.module_id:
+                return conn
+        raise AssertionError(f"Module {client.module_id} not connected")
+
+    def test_whenClientConnects_profilesAreAppliedOnBothEnds(self):
+        """
+        Test if the client profile and the manager's role-based profiles are applied.
+        """
+        # Arrange
+        client_profile = SocketProfile(rcvbuf=96 * 1024)
+
+        # Act
+        with (
+            client_context(server_name=self.addr) as module,
+            client_context(server_name=self.addr, logger_status=True) as logger,
+        ):
+            module.connect(self.addr, socket_profile=client_profile)
+            wait_for_message()
+
+            # Assert
+            self.assertEqual(effective_size(module.sock, socket.SO_RCVBUF), 96 * 1024)
+            conn = self.manager_conn(module)
+            self.assertEqual(effective_size(conn, socket.SO_SNDBUF), 128 * 1024)
+            self.assertFalse(conn.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+
+            conn = self.manager_conn(logger)
+            self.assertEqual(effective_size(conn, socket.SO_SNDBUF), 256 * 1024)
+            self.assertTrue(conn.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+
+
+class TestReceiveThread(ManagerTestCase):
+    """
+    Test background receive mode with per-type handlers.
+    """
+
+    def publish(self, pub: Client, n: int):
+        # TEST_MESSAGE goes first, so every TEST_MESSAGE has been received
+        # by the time the last TEST_MESSAGE2 reaches its handler.
+        for i in range(n):
+            msg = TEST_MESSAGE()
+            msg.val = i
+            pub.send_message(msg)
+            msg = TEST_MESSAGE2()
+            msg.val = i
+            pub.send_message(msg)
+
+    def test_whenHandlerIsRegistered_messagesAreDispatchedOnThread(self):
+        """
+        Test if handled types go to handlers and all other types to read_message.
+        """
+        # Arrange
+        received = []
+        done = threading.Event()
+
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE, MT_TEST_MESSAGE2])
+
+            @sub.on(MT_TEST_MESSAGE2)
+            def handle(msg):
+                received.append((msg.data.val, threading.current_thread()))
+                if len(received) == 10:
+                    done.set()
+
+            sub.start_receiving()
+            wait_for_message()
+
+            # Act
+            self.publish(pub, 10)
+            self.assertTrue(done.wait(1.0))
+            msgs = sub.read_messages(timeout=0.1)
+            sub.stop_receiving()
+
+            # Assert
+            self.assertEqual([val for val, _ in received], list(range(10)))
+            self.assertTrue(
+                all(t is not threading.current_thread() for _, t in received)
+            )
+            self.assertEqual([m.data.val for m in msgs], list(range(10)))
+            self.assertTrue(all(m.header.msg_type == MT_TEST_MESSAGE for m in msgs))
+            self.assertFalse(sub.receiving)
+
+    def test_whenDispatchThreadIsDisabled_handlersRunInCaller(self):
+        """
+        Test if dispatch() runs handlers in the calling thread.
+        """
+        # Arrange
+        received = []
+
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE2])
+            sub.add_handler(MT_TEST_MESSAGE2, lambda msg: received.append(msg))
+            sub.start_receiving(dispatch_thread=False)
+            wait_for_message()
+
+            # Act
+            self.publish(pub, 5)
+            wait_for_message()
+            count = sub.dispatch(timeout=1.0)
+
+            # Assert
+            self.assertEqual(count, 5)
+            self.assertEqual([m.data.val for m in received], list(range(5)))
+            self.assertIsNone(sub.read_message(timeout=0))
+            sub.stop_receiving()
+
+
+class TestAsyncClient(ManagerTestCase):
+    """
+    Test the asyncio client against a running manager.
+    """
+
+    def test_whenAsyncClientSubscribes_itReceivesMessagesFromClient(self):
+        """
+        Test if an AsyncClient receives messages published by a Client.
+        """
+
+        async def run():
+            async with pyrtma.AsyncClient() as sub:
+                await sub.connect(self.addr)
+                await sub.subscribe([MT_TEST_MESSAGE, MT_TEST_MESSAGE2])
+                self.assertIsNone(await sub.read_message(timeout=0))
+
+                with client_context(server_name=self.addr) as pub:
+                    await asyncio.sleep(0.1)
+                    for i in range(5):
+                        msg = TEST_MESSAGE2()
+                        msg.val = i
+                        pub.send_message(msg)
+
+                    msgs = []
+                    async for msg in sub:
+                        msgs.append(msg)
+                        if len(msgs) == 5:
+                            break
+
+                    self.assertIsNone(await sub.read_message(timeout=0.1))
+                return msgs
+
+        # Act
+        msgs = asyncio.run(run())
+
+        # Assert
+        self.assertEqual([m.data.val for m in msgs], list(range(5)))
+        self.assertTrue(all(m.header.recv_time > 0 for m in msgs))
+
+    def test_whenAsyncClientSends_clientReceives(self):
+        """
+        Test if messages sent by an AsyncClient are delivered.
+        """
+
+        async def run():
+            async with pyrtma.AsyncClient() as pub:
+                await pub.connect(self.addr)
+                self.assertGreater(pub.module_id, 0)
+                msg = TEST_MESSAGE()
+                msg.val = 1.5
+                await pub.send_message(msg)
+                await asyncio.sleep(0.1)
+
+        with client_context(server_name=self.addr) as sub:
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+
+            # Act
+            asyncio.run(run())
+
+            # Assert
+            msg = sub.read_message(timeout=0.1)
+            self.assertIsNotNone(msg)
+            self.assertEqual(msg.data.val, 1.5)
+
+
+class TestClientReactor(ManagerTestCase):
+    """
+    Test serving many clients from one thread with ClientReactor.
+    """
+
+    def test_whenClientsAreRegistered_messagesAreDispatchedPerClient(self):
+        """
+        Test if each client's messages go to its own handler.
+        """
+        # Arrange
+        received: Dict[int, list] = {0: [], 1: []}
+
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub0,
+            client_context(server_name=self.addr) as sub1,
+            pyrtma.ClientReactor() as reactor,
+        ):
+            sub0.subscribe([MT_TEST_MESSAGE])
+            sub1.subscribe([MT_TEST_MESSAGE2])
+            reactor.register(sub0, lambda c, m: received[0].append(m.data.val))
+            reactor.register(sub1, lambda c, m: received[1].append(m.data.val))
+            wait_for_message()
+
+            # Act
+            for i in range(10):
+                msg = TEST_MESSAGE()
+                msg.val = i
+                pub.send_message(msg)
+                msg2 = TEST_MESSAGE2()
+                msg2.val = -i
+                pub.send_message(msg2)
+
+            deadline = time.perf_counter() + 1.0
+            while len(received[0]) + len(received[1]) < 20:
+                reactor.run_once(timeout=0.1)
+                self.assertLess(time.perf_counter(), deadline)
+
+            # Assert
+            self.assertEqual(received[0], list(range(10)))
+            self.assertEqual(received[1], [-i for i in range(10)])
+            self.assertEqual(reactor.run_once(timeout=0.05), 0)
+
+    def test_whenMaxBatchIsReached_remainingMessagesAreServedWithoutWaiting(self):
+        """
+        Test if buffered messages left after a batch are dispatched on the next pass.
+        """
+        # Arrange
+        received = []
+
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+            pyrtma.ClientReactor(max_batch=3) as reactor,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE2])
+            wait_for_message()
+            for i in range(5):
+                msg = TEST_MESSAGE2()
+                msg.val = i
+                pub.send_message(msg)
+            wait_for_message()
+
+            # Act
+            reactor.register(sub, lambda c, m: received.append(m.data.val))
+            first = reactor.run_once(timeout=1.0)
+            t0 = time.perf_counter()
+            second = reactor.run_once(timeout=1.0)
+            elapsed = time.perf_counter() - t0
+
+            # Assert
+            self.assertEqual(first, 3)
+            self.assertEqual(second, 2)
+            self.assertLess(elapsed, 0.5)
+            self.assertEqual(received, list(range(5)))
+
+    def test_whenConnectionIsLost_clientIsUnregisteredAndErrorReported(self):
+        """
+        Test if a closed connection is reported to on_error.
+        """
+        # Arrange
+        errors = []
+
+        with (
+            client_context(server_name=self.addr) as sub,
+            pyrtma.ClientReactor() as reactor,
+        ):
+            reactor.register(
+                sub, lambda c, m: None, on_error=lambda c, e: errors.append(e)
+            )
+
+            # Act
+            self.manager.close()
+            self.manager_thread.join()
+            deadline = time.perf_counter() + 1.0
+            while not errors and time.perf_counter() < deadline:
+                reactor.run_once(timeout=0.1)
+
+            # Assert
+            self.assertEqual(len(errors), 1)
+            self.assertIsInstance(errors[0], pyrtma.exceptions.ConnectionLost)
+            self.assertEqual(reactor.clients, [])
+
+    def test_whenStopIsCalledFromAnotherThread_runReturns(self):
+        """
+        Test if stop() wakes a reactor blocked in run().
+        """
+        with (
+            client_context(server_name=self.addr) as sub,
+            pyrtma.ClientReactor() as reactor,
+        ):
+            reactor.register(sub, lambda c, m: None)
+            thread = threading.Thread(target=reactor.run)
+            thread.start()
+            wait_for_message()
+
+            # Act
+            reactor.stop()
+            thread.join(1.0)
+
+            # Assert
+            self.assertFalse(thread.is_alive())
+            self.assertFalse(reactor.running)
+
+
+class TestTimeSync(ManagerTestCase):
+    """
+    Test clock offset estimation against the message manager.
+    """
+
+    def test_whenClientConnects_managerAdvertisesTimeSync(self):
+        """
+        Test if the manager advertises time sync support.
+        """
+        # Arrange / Act
+        with client_context(server_name=self.addr) as client:
+            # Assert
+            self.assertTrue(
+                client._manager_capabilities & pyrtma.core_defs.MM_CAP_TIME_SYNC
+            )
+
+    def test_whenClockIsSynced_offsetIsSmallOnSameHost(self):
+        """
+        Test if the estimated offset is near zero when sharing a clock.
+        """
+        # Arrange
+        with client_context(server_name=self.addr) as client:
+            # Act
+            offset = client.sync_clock(samples=4)
+
+            # Assert
+            self.assertEqual(offset, client.clock_offset)
+            self.assertEqual(len(client._time_samples), 4)
+            self.assertLess(abs(offset), 1e-3)
+            self.assertAlmostEqual(
+                client.manager_time(), time.perf_counter() + offset, delta=1e-2
+            )
+
+    def test_whenMessagesArriveDuringSync_theyAreKept(self):
+        """
+        Test if subscribed messages received while syncing can still be read.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            pub.send_message(TEST_MESSAGE())
+            wait_for_message()
+
+            # Act
+            sub.sync_clock(samples=1)
+            msg = sub.read_message(timeout=0.5)
+
+            # Assert
+            self.assertIsNotNone(msg)
+            self.assertEqual(msg.header.msg_type, MT_TEST_MESSAGE)
+
+    def test_whenReceivingOnThread_syncWaitsForReply(self):
+        """
+        Test if clock sync works while the receive thread owns the socket.
+        """
+        # Arrange
+        with client_context(server_name=self.addr) as client:
+            client.start_receiving()
+
+            # Act
+            client.sync_clock(samples=2)
+
+            # Assert
+            self.assertEqual(len(client._time_samples), 2)
+            client.stop_receiving()
+
+
+class TestHopTimestamps(ManagerTestCase):
+    """
+    Test message manager hop timestamps.
+    """
+
+    manager_kwargs = {"hop_times": True}
+
+    def test_whenManagerForwards_hopTimesAreStamped(self):
+        """
+        Test if forwarded messages carry the manager read and write times.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr, hop_times=True) as pub,
+            client_context(server_name=self.addr, hop_times=True) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE])
+            sub.enable_stats()
+            wait_for_message()
+
+            # Act
+            pub.send_message(TEST_MESSAGE())
+            msg = sub.read_message(timeout=0.5)
+
+            # Assert
+            self.assertIsNotNone(msg)
+            header = msg.header
+            self.assertLessEqual(header.send_time, header.mm_recv_time)
+            self.assertLessEqual(header.mm_recv_time, header.mm_send_time)
+            self.assertLessEqual(header.mm_send_time, header.recv_time)
+            hops = hop_latency(header)
+            self.assertAlmostEqual(
+                hops.total, header.recv_time - header.send_time, delta=1e-9
+            )
+            self.assertEqual(sub.stats().in_manager.count, 1)
+
+    def test_whenEnvelopeForwarded_packedMessagesCarryHopTimes(self):
+        """
+        Test if messages packed in an envelope carry hop times whether the envelope is unpacked or spliced.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr, hop_times=True) as pub,
+            client_context(server_name=self.addr, hop_times=True) as legacy,
+            client_context(server_name=self.addr, hop_times=True) as capable,
+        ):
+            capable.enable_envelope_receive()
+            for sub in (legacy, capable):
+                sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+
+            # Act
+            pub.send_envelope([TEST_MESSAGE(val=i) for i in range(3)])
+            received = [sub.read_message(timeout=0.5) for sub in (legacy, capable)]
+            received += [capable.read_message(timeout=0.5) for _ in range(2)]
+
+            # Assert
+            for msg in received:
+                header = msg.header
+                self.assertLessEqual(header.send_time, header.mm_recv_time)
+                self.assertLessEqual(header.mm_recv_time, header.mm_send_time)
+                self.assertLessEqual(header.mm_send_time, header.recv_time)
+
+
+class TestRequests(ManagerTestCase):
+    """
+    Test request/reply futures.
+    """
+
+    def reply(self, client: Client):
+        request = client.read_message(timeout=0.5)
+        self.assertIsNotNone(request)
+        client.send_message(
+            TEST_MESSAGE2(val=request.data.val), dest_mod_id=request.header.src_mod_id
+        )
+
+    def test_whenRequestIsSentToManyModules_eachReplyResolvesItsFuture(self):
+        """
+        Test if a fan-out request is matched to the reply of each module.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as requester,
+            client_context(module_id=20, server_name=self.addr) as a,
+            client_context(module_id=21, server_name=self.addr) as b,
+        ):
+            a.subscribe([MT_TEST_MESSAGE])
+            b.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+
+            # Act
+            futures = requester.request_many(
+                TEST_MESSAGE(), MT_TEST_MESSAGE2, [20, 21], correlation_field="val"
+            )
+            self.reply(b)
+            self.reply(a)
+            done = requester.wait_for_replies(futures, timeout=1.0)
+
+            # Assert
+            self.assertTrue(done)
+            replies = [f.result() for f in futures]
+            self.assertEqual([r.header.src_mod_id for r in replies], [20, 21])
+            self.assertTrue(all(r.data.val == 1 for r in replies))
+            self.assertIsNone(requester.read_message(timeout=0.1))
+
+    def test_whenNoReplyArrives_futureFailsWithRequestTimeout(self):
+        """
+        Test if an unanswered request times out.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as requester,
+            client_context(module_id=20, server_name=self.addr) as responder,
+        ):
+            responder.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+
+            # Act
+            future = requester.request(
+                TEST_MESSAGE(), MT_TEST_MESSAGE2, dest_mod_id=20, timeout=0.2
+            )
+            done = requester.wait_for_replies([future])
+
+            # Assert
+            self.assertTrue(done)
+            self.assertIsInstance(future.exception(), RequestTimeout)
+
+    def test_whenReceivingOnThread_repliesResolveFutures(self):
+        """
+        Test if the receive thread resolves requests.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as requester,
+            client_context(module_id=20, server_name=self.addr) as responder,
+        ):
+            responder.subscribe([MT_TEST_MESSAGE])
+            requester.subscribe([MT_TEST_MESSAGE2])
+            requester.start_receiving()
+            wait_for_message()
+
+            # Act
+            future = requester.request(
+                TEST_MESSAGE(),
+                MT_TEST_MESSAGE2,
+                dest_mod_id=20,
+                correlation_field="val",
+            )
+            self.reply(responder)
+
+            # Assert
+            self.assertEqual(future.result(timeout=1.0).header.src_mod_id, 20)
+            requester.stop_receiving()
+
+    def test_whenWaitingForAcknowledgement_otherMessagesAreKept(self):
+        """
+        Test if messages read while waiting for an ACK can still be read.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            pub.send_message(TEST_MESSAGE())
+            wait_for_message()
+
+            # Act
+            sub.subscribe([MT_TEST_MESSAGE2])
+            msg = sub.read_message(timeout=0.5)
+
+            # Assert
+            self.assertIsNotNone(msg)
+            self.assertEqual(msg.header.msg_type, MT_TEST_MESSAGE)
+
+
+class TestBlobs(ManagerTestCase):
+    """
+    Test sending payloads larger than a message.
+    """
+
+    def test_whenBlobIsSentToModule_itIsReassembledWithFlowControl(self):
+        """
+        Test if an acknowledged blob arrives complete and other messages still flow.
+        """
+        # Arrange
+        data = os.urandom(pyrtma.core_defs.BLOB_FRAGMENT_SIZE * 5 + 123)
+        blobs = []
+        received = threading.Event()
+        with (
+            client_context(server_name=self.addr) as sender,
+            client_context(module_id=20, server_name=self.addr) as receiver,
+        ):
+            receiver.subscribe([MT_TEST_MESSAGE])
+
+            @receiver.on_blob(MT_TEST_MESSAGE2)
+            def handler(blob):
+                blobs.append(blob)
+                received.set()
+
+            receiver.start_receiving()
+            wait_for_message()
+
+            # Act
+            blob_id = sender.send_blob(MT_TEST_MESSAGE2, data, dest_mod_id=20, window=2)
+            sender.send_message(TEST_MESSAGE())
+            received.wait(1.0)
+            msg = receiver.read_message(timeout=0.5)
+            receiver.stop_receiving()
+
+            # Assert
+            self.assertEqual(len(blobs), 1)
+            self.assertEqual(blobs[0].blob_id, blob_id)
+            self.assertEqual(blobs[0].src_mod_id, sender.module_id)
+            self.assertEqual(blobs[0].data, data)
+            self.assertIsNotNone(msg)
+            self.assertEqual(msg.header.msg_type, MT_TEST_MESSAGE)
+
+    def test_whenBlobAckedOnReceiveThread_applicationSendsStayIntact(self):
+        """
+        Test if blob acknowledgements from the receive thread do not corrupt concurrent sends.
+        """
+        # Arrange
+        data = os.urandom(pyrtma.core_defs.BLOB_FRAGMENT_SIZE * 20)
+        blobs = []
+        with (
+            client_context(server_name=self.addr) as sender,
+            client_context(module_id=20, server_name=self.addr) as receiver,
+            client_context(server_name=self.addr) as monitor,
+        ):
+            receiver.add_blob_handler(MT_TEST_MESSAGE2, blobs.append)
+            monitor.subscribe([MT_TEST_MESSAGE])
+            receiver.start_receiving()
+            wait_for_message()
+
+            def send_samples():
+                for i in range(500):
+                    receiver.send_message(TEST_MESSAGE(val=float(i)))
+
+            # Act
+            worker = threading.Thread(target=send_samples)
+            worker.start()
+            sender.send_blob(MT_TEST_MESSAGE2, data, dest_mod_id=20, window=1)
+            worker.join()
+            vals = []
+            while (msg := monitor.read_message(timeout=0.5)) is not None:
+                vals.append(msg.data.val)
+            receiver.stop_receiving()
+
+            # Assert
+            self.assertTrue(receiver.thread_safe_send)
+            self.assertEqual(len(blobs), 1)
+            self.assertEqual(blobs[0].data, data)
+            self.assertEqual(vals, [float(i) for i in range(500)])
+            with self.assertRaises(pyrtma.exceptions.ClientError):
+                receiver.disable_thread_safe_send()
+
+    def test_whenBlobIsBroadcast_subscribersReassembleIt(self):
+        """
+        Test if a broadcast blob is reassembled, with and without the compact encoding.
+        """
+        # Arrange
+        data = b"blob" * 100
+        blobs = []
+        with (
+            client_context(server_name=self.addr) as sender,
+            client_context(server_name=self.addr) as receiver,
+        ):
+            receiver.add_blob_handler(MT_TEST_MESSAGE2, blobs.append)
+            wait_for_message()
+
+            # Act
+            sender.send_blob(MT_TEST_MESSAGE2, data)
+            sender.enable_compact_encoding()
+            receiver.enable_compact_encoding()
+            wait_for_message()
+            sender.send_blob(MT_TEST_MESSAGE2, data)
+            receiver.read_message(timeout=0.2)
+
+            # Assert
+            self.assertEqual([bytes(b.data) for b in blobs], [data, data])
+
+    def test_whenReceiverDoesNotAcknowledge_sendBlobTimesOut(self):
+        """
+        Test if send_blob fails when the destination does not acknowledge.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as sender,
+            client_context(module_id=20, server_name=self.addr) as receiver,
+        ):
+            receiver.subscribe([pyrtma.core_defs.MT_BLOB_FRAGMENT])
+            wait_for_message()
+
+            # Act / Assert
+            with self.assertRaises(RequestTimeout):
+                sender.send_blob(MT_TEST_MESSAGE2, b"x", dest_mod_id=20, timeout=0.2)
+
+
+class TestCompactEncoding(ManagerTestCase):
+    """
+    Test the compact encoding of trailing zero bytes.
+    """
+
+    def test_whenCompactClientSends_legacyClientReceivesFullMessage(self):
+        """
+        Test if the manager expands compact messages for clients that did not opt in.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            self.assertTrue(pub.enable_compact_encoding())
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            msg = TEST_MESSAGE(val=1.0)
+            msg.str[:3] = b"abc"
+
+            # Act
+            pub.send_message(msg)
+            received = sub.read_message(timeout=0.5)
+
+            # Assert
+            self.assertIsNotNone(received)
+            self.assertEqual(received.header.num_data_bytes, msg.type_size)
+            self.assertEqual(received.header.is_dynamic, 0)
+            self.assertEqual(bytes(received.data), bytes(msg))
+
+    def test_whenCompactClientReceives_messagesArriveTrimmed(self):
+        """
+        Test if the manager trims messages for clients that opted in.
+        """
+        # Arrange
+        sub = Client(pool_size=2)
+        sub.connect(self.addr)
+        try:
+            with client_context(server_name=self.addr) as pub:
+                self.assertTrue(sub.enable_compact_encoding())
+                sub.subscribe([MT_TEST_MESSAGE])
+                wait_for_message()
+                sub.discard_messages(timeout=0.1)
+                msg = TEST_MESSAGE(val=1.0)
+
+                # Act
+                pub.send_message(msg)
+                pub.send_message(msg)
+                wait_for_message()
+                sub._recv_available()
+                pending = sub._stream.pending_bytes
+                first = sub.read_message(timeout=0.5)
+                second = sub.read_message(timeout=0.5, copy=False)
+
+                # Assert
+                self.assertEqual(pending, 2 * (sub._stream.header_size + 72))
+                for received in (first, second):
+                    self.assertEqual(received.header.num_data_bytes, msg.type_size)
+                    self.assertEqual(bytes(received.data), bytes(msg))
+        finally:
+            sub.disconnect()
+
+
+class TestCompression(ManagerTestCase):
+    """
+    Test per-message-type compression of message data.
+    """
+
+    def make_message(self) -> TEST_MESSAGE:
+        msg = TEST_MESSAGE(val=2.5)
+        msg.str[:6] = b"abcabc"
+        return msg
+
+    def test_whenCompressedMessageSent_legacyClientReceivesDecompressed(self):
+        """
+        Test if the manager decompresses messages for clients that did not opt in.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            pub.set_compression(MT_TEST_MESSAGE, "lzma")
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            msg = self.make_message()
+
+            # Act
+            pub.send_message(msg)
+            received = sub.read_message(timeout=0.5)
+
+            # Assert
+            self.assertIsNotNone(received)
+            self.assertNotIsInstance(received, CompressedMessage)
+            self.assertEqual(received.header.num_data_bytes, msg.type_size)
+            self.assertEqual(received.header.is_dynamic, 0)
+            self.assertEqual(bytes(received.data), bytes(msg))
+
+    def test_whenCompressedReceiveEnabled_messageDecompressedOnAccess(self):
+        """
+        Test if the manager forwards compressed bytes to clients that opted in.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            pub.set_compression(MT_TEST_MESSAGE)
+            self.assertTrue(sub.enable_compressed_receive())
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            sub.discard_messages(timeout=0.1)
+            msg = self.make_message()
+
+            # Act
+            pub.send_message(msg)
+            wait_for_message()
+            sub._recv_available()
+            pending = sub._stream.pending_bytes
+            received = sub.read_message(timeout=0.5)
+
+            # Assert
+            self.assertLess(pending, sub._stream.header_size + msg.type_size)
+            self.assertIsInstance(received, CompressedMessage)
+            self.assertFalse(received.decoded)
+            self.assertEqual(received.header.num_data_bytes, msg.type_size)
+            self.assertEqual(bytes(received.data), bytes(msg))
+
+    def test_whenCompressionDisabledForType_messageSentUncompressed(self):
+        """
+        Test if set_compression with None sends a message type uncompressed.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            pub.set_compression(MT_TEST_MESSAGE)
+            pub.set_compression(MT_TEST_MESSAGE, None)
+            sub.enable_compressed_receive()
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            msg = self.make_message()
+
+            # Act
+            pub.send_message(msg)
+            received = sub.read_message(timeout=0.5)
+
+            # Assert
+            self.assertNotIsInstance(received, CompressedMessage)
+            self.assertEqual(bytes(received.data), bytes(msg))
+
+    def test_whenPooledClientReceivesCompressed_messageDecompressed(self):
+        """
+        Test if compressed messages are decompressed into pooled messages.
+        """
+        # Arrange
+        sub = Client(pool_size=2)
+        sub.connect(self.addr)
+        try:
+            with client_context(server_name=self.addr) as pub:
+                pub.set_compression(MT_TEST_MESSAGE)
+                sub.enable_compressed_receive()
+                sub.subscribe([MT_TEST_MESSAGE])
+                wait_for_message()
+                msg = self.make_message()
+
+                # Act
+                pub.send_message(msg)
+                received = sub.read_message(timeout=0.5)
+
+                # Assert
+                self.assertEqual(received.header.num_data_bytes, msg.type_size)
+                self.assertEqual(received.header.is_dynamic, 0)
+                self.assertEqual(bytes(received.data), bytes(msg))
+        finally:
+            sub.disconnect()
+
+    def test_whenCoreMessageTypeCompressed_raisesValueError(self):
+        """
+        Test if compressing core message types is rejected.
+        """
+        # Arrange
+        with client_context(server_name=self.addr) as client:
+            # Act / Assert
+            with self.assertRaises(ValueError):
+                client.set_compression(pyrtma.core_defs.MT_TIMING_MESSAGE)
+
+
+class TestEnvelopes(ManagerTestCase):
+    """
+    Test ENVELOPE frames that pack many messages into one frame.
+    """
+
+    def make_messages(self, n: int):
+        return [TEST_MESSAGE(val=float(i)) for i in range(n)]
+
+    def test_whenEnvelopeSent_legacyClientReceivesSeparateMessages(self):
+        """
+        Test if the manager unpacks envelopes for clients that did not opt in.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            msgs = self.make_messages(100)
+
+            # Act
+            pub.send_envelope(msgs)
+            received = [sub.read_message(timeout=0.5) for _ in msgs]
+
+            # Assert
+            self.assertEqual([m.data.val for m in received], [m.val for m in msgs])
+            counts = [m.header.msg_count for m in received]
+            self.assertEqual(counts, list(range(counts[0], counts[0] + len(msgs))))
+
+    def test_whenEnvelopeReceiveEnabled_envelopeArrivesAsOneFrame(self):
+        """
+        Test if the manager forwards envelopes intact to clients that opted in.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            self.assertTrue(sub.enable_envelope_receive())
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            sub.discard_messages(timeout=0.1)
+            msgs = self.make_messages(10)
+
+            # Act
+            pub.send_envelope(msgs)
+            wait_for_message()
+            sub._recv_available()
+            offset = sub._stream.next_frame()
+            envelope_type = sub._stream.msg_type(offset)
+            sub._stream.unread(offset)
+            received = [sub.read_message(timeout=0.5) for _ in msgs]
+
+            # Assert
+            self.assertEqual(envelope_type, pyrtma.core_defs.MT_ENVELOPE)
+            self.assertEqual([m.data.val for m in received], [m.val for m in msgs])
+            self.assertEqual(len({m.header.msg_count for m in received}), 1)
+
+    def test_whenBatchExceedsMaxSize_sentAsSeveralEnvelopes(self):
+        """
+        Test if large batches are split into envelopes that fit MAX_MESSAGE_SIZE.
+        """
+        # Arrange
+        with (
+            client_context(server_name=self.addr) as pub,
+            client_context(server_name=self.addr) as sub,
+        ):
+            sub.subscribe([MT_TEST_MESSAGE])
+            wait_for_message()
+            msgs = self.make_messages(1000)
+            start_count = pub._msg_count
+
+            # Act
+            pub.send_envelope(msgs)
+            received = [sub.read_message(timeout=0.5) for _ in msgs]
+
+            # Assert
+            self.assertEqual(pub._msg_count - start_count, 3)
+            self.assertEqual([m.data.val for m in received], [m.val for m in msgs])
+
+    def test_whenEnvelopeMixesTypes_raisesValueError(self):
+        """
+        Test if envelopes of several message types are rejected.
+        """
+        # Arrange
+        with client_context(server_name=self.addr) as pub:
+            msgs = [TEST_MESSAGE(), TEST_MESSAGE2()]
+
+            # Act / Assert
+            with self.assertRaises(ValueError):
+                pub.send_envelope(msgs)
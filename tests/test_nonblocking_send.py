@@ -0,0 +1,78 @@
+import socket
+import threading
+import unittest
+
+import pyrtma
+import pyrtma.core_defs as cd
+from pyrtma.client import Client
+from pyrtma.stream import MessageStream
+
+
+class TestNonblockingSend(unittest.TestCase):
+    """Test queueing sends to a peer that stops reading."""
+
+    def setUp(self):
+        self.peer, sock = socket.socketpair()
+        self.client = Client()
+        self.client._sock.close()
+        self.client._sock = sock
+        self.client._connected = True
+        self.high_water = []
+        self.client.enable_nonblocking_send(
+            high_water=64 * 1024,
+            on_high_water=lambda c, n: self.high_water.append(n),
+        )
+
+    def tearDown(self):
+        self.client._connected = False
+        self.client._sock.close()
+        self.peer.close()
+
+    def send(self, n: int):
+        for i in range(n):
+            msg = cd.MDF_SUBSCRIBE()
+            msg.msg_type = i
+            self.client.send_message(msg)
+
+    def read_peer(self, stream: MessageStream, nbytes: int):
+        while stream.pending_bytes < nbytes:
+            stream.recv_into(self.peer)
+
+    def test_whenPeerStalls_sendsAreQueuedWithoutBlocking(self):
+        # Arrange
+        n = 20000
+        header_size = pyrtma.MessageHeader().size
+        frame_size = header_size + cd.MDF_SUBSCRIBE().size
+        stream = MessageStream(pyrtma.MessageHeader)
+
+        # Act
+        self.send(n)
+        pending = self.client.pending_bytes
+        reader = threading.Thread(target=self.read_peer, args=(stream, n * frame_size))
+        reader.start()
+        flushed = self.client.flush(timeout=5.0)
+        reader.join(5.0)
+
+        # Assert
+        self.assertGreater(pending, 64 * 1024)
+        self.assertEqual(len(self.high_water), 1)
+        self.assertTrue(flushed)
+        self.assertEqual(self.client.pending_bytes, 0)
+        msg_types = []
+        while (offset := stream.next_frame()) is not None:
+            payload = stream.view[offset + header_size : offset + frame_size]
+            msg_types.append(cd.MDF_SUBSCRIBE.from_buffer_copy(payload).msg_type)
+        self.assertEqual(msg_types, list(range(n)))
+
+    def test_whenFlushTimesOut_dataStaysQueued(self):
+        # Arrange
+        self.send(20000)
+
+        # Act
+        flushed = self.client.flush(timeout=0.05)
+
+        # Assert
+        self.assertFalse(flushed)
+        self.assertGreater(self.client.pending_bytes, 0)
+        self.assertFalse(self.client.disable_nonblocking_send(timeout=0))
+        self.assertTrue(self.client.nonblocking_send)
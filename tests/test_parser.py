@@ -650,3 +650,36 @@ class TestParser(unittest.TestCase):
         self.tmp.write(text)
         with self.assertRaises(pyrtma.parser.RTMASyntaxError):
             self.parser.parse(self.tmp.path)
+
+    def test_compression(self):
+        text = textwrap.dedent("""
+            message_defs:
+                A:
+                    id: 1001
+                    compression: zlib
+                    fields:
+                        i: int
+                B:
+                    id: 1002
+                    fields:
+                        i: int
+            """)
+        self.tmp.write(text)
+        self.parser.parse(self.tmp.path)
+        self.assertEqual(self.parser.message_defs["A"].compression, "zlib")
+        self.assertEqual(self.parser.message_defs["B"].compression, "")
+
+        # Compression does not change the message version
+        self.assertNotIn("compression", self.parser.message_defs["A"].raw)
+
+        text = textwrap.dedent("""
+            message_defs:
+                C:
+                    id: 1003
+                    compression: [zlib]
+                    fields:
+                        i: int
+            """)
+        self.tmp2.write(text)
+        with self.assertRaises(pyrtma.parser.RTMASyntaxError):
+            self.parser.parse(self.tmp2.path)
@@ -0,0 +1,42 @@
+import unittest
+
+import pyrtma
+import pyrtma.core_defs as cd
+from pyrtma.pool import MessagePool
+
+
+class TestMessagePool(unittest.TestCase):
+    """Test reusing message objects per message type."""
+
+    def test_whenRingIsFull_oldestMessageIsReused(self):
+        # Arrange
+        pool = MessagePool(pyrtma.MessageHeader, 2)
+
+        # Act
+        first = pool.acquire(cd.MT_SUBSCRIBE, cd.MDF_SUBSCRIBE)
+        second = pool.acquire(cd.MT_SUBSCRIBE, cd.MDF_SUBSCRIBE)
+        third = pool.acquire(cd.MT_SUBSCRIBE, cd.MDF_SUBSCRIBE)
+        other = pool.acquire(cd.MT_UNSUBSCRIBE, cd.MDF_UNSUBSCRIBE)
+
+        # Assert
+        self.assertIsNot(first, second)
+        self.assertIs(third, first)
+        self.assertIsInstance(other.data, cd.MDF_UNSUBSCRIBE)
+
+    def test_whenMessageIsDetached_itIsNotReused(self):
+        # Arrange
+        pool = MessagePool(pyrtma.MessageHeader, 1)
+        msg = pool.acquire(cd.MT_SUBSCRIBE, cd.MDF_SUBSCRIBE)
+        msg.header.msg_type = cd.MT_SUBSCRIBE
+
+        # Act
+        kept = pool.detach(msg)
+        again = pool.acquire(cd.MT_SUBSCRIBE, cd.MDF_SUBSCRIBE)
+
+        # Assert
+        self.assertIs(kept, msg)
+        self.assertIsNot(again, msg)
+
+    def test_whenSizeIsInvalid_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            MessagePool(pyrtma.MessageHeader, 0)
@@ -0,0 +1,91 @@
+import errno
+import os
+import tempfile
+import unittest
+
+import pyrtma
+from pyrtma.recorder import TrafficRecorder, recover_recording
+
+
+class FailingFile:
+    """File stand-in that fails every write, like a full disk."""
+
+    name = "failing"
+
+    def write(self, data):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def truncate(self, size):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def close(self):
+        pass
+
+
+class TestTrafficRecorder(unittest.TestCase):
+    """Test the traffic recorder outside of a running manager."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "traffic.dat")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_header(self, msg_type: int) -> pyrtma.MessageHeader:
+        header = pyrtma.MessageHeader()
+        header.msg_type = msg_type
+        header.num_data_bytes = 8
+        return header
+
+    def test_whenFileExists_recorderRefusesToOverwrite(self):
+        # Arrange
+        with open(self.filename, "wb") as f:
+            f.write(b"previous recording")
+
+        # Act / Assert
+        with self.assertRaises(FileExistsError):
+            TrafficRecorder(self.filename)
+
+        recorder = TrafficRecorder(self.filename, preallocate=0, overwrite=True)
+        recorder.close()
+        self.assertEqual(os.path.getsize(self.filename), 0)
+
+    def test_whenWriteFails_recordingStopsAndCloseIsSafe(self):
+        # Arrange
+        recorder = TrafficRecorder(self.filename, preallocate=0)
+        recorder._fd.close()
+        recorder._fd = FailingFile()  # type: ignore
+
+        # Act
+        self.assertTrue(recorder.record(self.make_header(1), bytes(8)))
+        with self.assertLogs("pyrtma.recorder", level="ERROR"):
+            recorder.flush()
+            recorder._thread.join(timeout=1)
+            recorder.close()
+
+        # Assert
+        self.assertIsNotNone(recorder.error)
+        self.assertFalse(recorder._thread.is_alive())
+        self.assertFalse(recorder.record(self.make_header(2), bytes(8)))
+        self.assertEqual(recorder.dropped, 1)
+
+    def test_whenRecordingWasNotClosed_recoverTrimsZeroTail(self):
+        # Arrange
+        recorder = TrafficRecorder(self.filename, preallocate=4096)
+        for mt in (1, 2, 3):
+            recorder.record(self.make_header(mt), bytes(8))
+        recorder.flush()
+        recorder._stop.set()
+        recorder._wake.set()
+        recorder._thread.join()
+        recorder._fd.close()  # simulate a crash: no trim
+        frame_size = pyrtma.MessageHeader().size + 8
+        self.assertEqual(os.path.getsize(self.filename), 4096)
+
+        # Act
+        size = recover_recording(self.filename)
+
+        # Assert
+        self.assertEqual(size, 3 * frame_size)
+        self.assertEqual(os.path.getsize(self.filename), 3 * frame_size)
@@ -0,0 +1,56 @@
+import unittest
+
+from pyrtma.exceptions import RequestTimeout
+from pyrtma.header import MessageHeader
+from pyrtma.message import Message
+from pyrtma.request import RequestTracker
+
+import pyrtma.core_defs as cd
+
+
+def reply(src_mod_id: int, value: int) -> Message:
+    header = MessageHeader()
+    header.msg_type = cd.MT_ACTIVE_CLIENTS
+    header.src_mod_id = src_mod_id
+    data = cd.MDF_ACTIVE_CLIENTS()
+    data.num_clients = value
+    return Message(header, data)
+
+
+class TestRequestTracker(unittest.TestCase):
+    """Test matching replies to outstanding requests."""
+
+    def test_whenRepliesArrive_theyMatchBySourceAndCorrelation(self):
+        # Arrange
+        tracker = RequestTracker()
+        first = tracker.add(cd.MT_ACTIVE_CLIENTS, 20, "num_clients", 7)
+        second = tracker.add(cd.MT_ACTIVE_CLIENTS, 21, "num_clients", 7)
+
+        # Act
+        stale = tracker.resolve(reply(20, 6))
+        other = tracker.resolve(reply(22, 7))
+        matched = tracker.resolve(reply(21, 7))
+
+        # Assert
+        self.assertFalse(stale)
+        self.assertFalse(other)
+        self.assertTrue(matched)
+        self.assertFalse(first.done())
+        self.assertEqual(second.result().header.src_mod_id, 21)
+        self.assertIn(cd.MT_ACTIVE_CLIENTS, tracker)
+
+    def test_whenDeadlinePasses_requestFailsWithRequestTimeout(self):
+        # Arrange
+        tracker = RequestTracker()
+        expired = tracker.add(cd.MT_ACTIVE_CLIENTS, deadline=1.0)
+        waiting = tracker.add(cd.MT_ACTIVE_CLIENTS, deadline=3.0)
+
+        # Act
+        tracker.expire(2.0)
+
+        # Assert
+        self.assertIsInstance(expired.exception(), RequestTimeout)
+        self.assertFalse(waiting.done())
+        self.assertEqual(tracker.next_deadline(), 3.0)
+        self.assertTrue(tracker.resolve(reply(0, 0)))
+        self.assertEqual(len(tracker), 0)
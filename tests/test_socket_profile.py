@@ -0,0 +1,88 @@
+import socket
+import sys
+import unittest
+import warnings
+
+from pyrtma.manager import _arg_parser, _socket_profiles
+from pyrtma.socket_profile import SocketProfile, get_socket_profile
+
+BUFSIZE = 64 * 1024
+
+
+def effective_size(sock: socket.socket, option: int) -> int:
+    """Buffer size as requested, undoing the Linux doubling"""
+    size = sock.getsockopt(socket.SOL_SOCKET, option)
+    return size // 2 if sys.platform.startswith("linux") else size
+
+
+class TestSocketProfile(unittest.TestCase):
+    """Test applying socket profiles to sockets."""
+
+    def setUp(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+    def tearDown(self):
+        self.sock.close()
+
+    def test_whenProfileIsApplied_optionsAreSet(self):
+        # Arrange
+        profile = SocketProfile(sndbuf=BUFSIZE, rcvbuf=BUFSIZE, keepalive=True)
+
+        # Act
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            profile.apply(self.sock)
+
+        # Assert
+        self.assertTrue(self.sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+        self.assertTrue(self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+        self.assertEqual(effective_size(self.sock, socket.SO_SNDBUF), BUFSIZE)
+        self.assertEqual(effective_size(self.sock, socket.SO_RCVBUF), BUFSIZE)
+
+    def test_whenBufferIsCappedByKernel_warningIsIssued(self):
+        # Arrange
+        profile = SocketProfile(rcvbuf=2**30)
+
+        # Act / Assert
+        with self.assertWarnsRegex(UserWarning, "SO_RCVBUF capped"):
+            profile.apply(self.sock)
+
+    def test_whenSameBufferIsCappedAgain_warningIsNotRepeated(self):
+        # Arrange
+        profile = SocketProfile(sndbuf=2**30 + 4096)
+        with self.assertWarnsRegex(UserWarning, "SO_SNDBUF capped"):
+            profile.apply(self.sock)
+
+        # Act / Assert
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                profile.apply(sock)
+
+    def test_whenProfileIsUnknown_valueErrorIsRaised(self):
+        with self.assertRaises(ValueError):
+            get_socket_profile("fast")
+
+    def test_whenCommandLineOverridesBuffers_profilesAreReplaced(self):
+        # Arrange
+        args = _arg_parser().parse_args(
+            [
+                "--socket-profile",
+                "low_latency",
+                "--sndbuf",
+                "32768",
+                "--logger-rcvbuf",
+                "1048576",
+            ]
+        )
+
+        # Act
+        profile, logger_profile = _socket_profiles(args)
+
+        # Assert
+        self.assertTrue(profile.quickack)
+        self.assertEqual(profile.sndbuf, 32768)
+        self.assertEqual(profile.rcvbuf, get_socket_profile("low_latency").rcvbuf)
+        self.assertTrue(logger_profile.keepalive)
+        self.assertEqual(logger_profile.rcvbuf, 1048576)
+        self.assertEqual(logger_profile.sndbuf, get_socket_profile("logger").sndbuf)
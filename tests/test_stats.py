@@ -0,0 +1,116 @@
+import unittest
+
+import pyrtma.core_defs as cd
+from pyrtma.header import get_header_cls
+from pyrtma.stats import ClientStats, LatencyHistogram, hop_latency
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test recording latencies in fixed-memory histograms."""
+
+    def test_whenValuesAreRecorded_percentilesAreWithinPrecision(self):
+        # Arrange
+        hist = LatencyHistogram()
+
+        # Act
+        for us in range(1, 1001):
+            hist.record(us * 1e-6)
+
+        # Assert
+        self.assertEqual(hist.count, 1000)
+        self.assertAlmostEqual(hist.min, 1e-6)
+        self.assertAlmostEqual(hist.max, 1e-3)
+        self.assertAlmostEqual(hist.mean, 500.5e-6, delta=1e-9)
+        for percent, expected in ((50, 500e-6), (90, 900e-6), (99, 990e-6)):
+            self.assertAlmostEqual(
+                hist.percentile(percent), expected, delta=expected / 16
+            )
+        self.assertEqual(hist.percentile(100), hist.max)
+
+    def test_whenHistogramsAreMerged_countsAreCombined(self):
+        # Arrange
+        a = LatencyHistogram()
+        b = LatencyHistogram()
+        a.record(1e-3)
+        b.record(2e-3)
+        b.record(-1.0)
+
+        # Act
+        a.merge(b)
+
+        # Assert
+        self.assertEqual(a.count, 3)
+        self.assertEqual(a.min, 0.0)
+        self.assertAlmostEqual(a.max, 2e-3)
+
+
+class TestClientStats(unittest.TestCase):
+    """Test loss detection from manager msg_count values."""
+
+    def test_whenMsgCountSkips_gapIsCounted(self):
+        # Arrange
+        stats = ClientStats()
+
+        # Act
+        for count in (1, 2, 3, 7, 8, 10):
+            stats.record(cd.MT_SUBSCRIBE, count, 1e-4)
+
+        # Assert
+        self.assertEqual(stats.gaps, 2)
+        self.assertEqual(stats.lost, 4)
+        self.assertEqual(stats.by_type[cd.MT_SUBSCRIBE].count, 6)
+
+    def test_whenReconnected_countRestartIsNotALoss(self):
+        # Arrange
+        stats = ClientStats()
+        stats.record(cd.MT_SUBSCRIBE, 5, 1e-4)
+
+        # Act
+        stats.reconnected()
+        stats.record(cd.MT_SUBSCRIBE, 3, 1e-4)
+
+        # Assert
+        self.assertEqual(stats.lost, 0)
+
+    def test_whenExported_totalsComeFirst(self):
+        # Arrange
+        stats = ClientStats()
+        stats.record(cd.MT_UNSUBSCRIBE, 1, 2e-4)
+        stats.record(cd.MT_SUBSCRIBE, 3, 1e-4)
+
+        # Act
+        msgs = stats.to_messages()
+
+        # Assert
+        self.assertEqual(
+            [m.msg_type for m in msgs],
+            [cd.ALL_MESSAGE_TYPES, cd.MT_SUBSCRIBE, cd.MT_UNSUBSCRIBE],
+        )
+        self.assertEqual((msgs[0].count, msgs[0].gaps, msgs[0].lost), (2, 1, 1))
+
+
+class TestHopLatency(unittest.TestCase):
+    """Test splitting latency at the message manager."""
+
+    def test_whenHeaderHasHopTimes_latencyIsSplit(self):
+        # Arrange
+        header = get_header_cls(hop_times=True)()
+        header.send_time = 1.0
+        header.mm_recv_time = 1.25
+        header.mm_send_time = 1.5
+        header.recv_time = 2.0
+
+        # Act
+        hops = hop_latency(header)
+
+        # Assert
+        self.assertEqual(tuple(hops), (0.25, 0.25, 0.5))
+        self.assertEqual(hops.total, 1.0)
+
+    def test_whenHeaderHasNoHopTimes_valueErrorIsRaised(self):
+        # Arrange
+        header = get_header_cls(timecode=True)()
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            hop_latency(header)
@@ -0,0 +1,128 @@
+import unittest
+
+import pyrtma
+import pyrtma.core_defs as cd
+from pyrtma.stream import MessageStream, decode_message
+
+
+def make_frame(i: int) -> bytes:
+    msg = cd.MDF_SUBSCRIBE()
+    msg.msg_type = i
+    header = pyrtma.MessageHeader()
+    header.msg_type = cd.MT_SUBSCRIBE
+    header.num_data_bytes = msg.size
+    return bytes(header) + bytes(msg)
+
+
+class TestMessageStream(unittest.TestCase):
+    """Test framing messages from a byte stream."""
+
+    def read_all(self, stream: MessageStream):
+        msgs = []
+        while (offset := stream.next_frame()) is not None:
+            header = pyrtma.MessageHeader.from_buffer_copy(stream.buffer, offset)
+            start = offset + header.size
+            payload = stream.view[start : start + header.num_data_bytes]
+            msgs.append(decode_message(header, payload))
+        return msgs
+
+    def test_whenFrameExceedsBuffer_bufferGrows(self):
+        # Arrange
+        stream = MessageStream(pyrtma.MessageHeader, bytearray(32))
+        data = b"".join(make_frame(i) for i in range(3))
+
+        # Act
+        msgs = []
+        for i in range(0, len(data), 50):
+            stream.feed(data[i : i + 50])
+            msgs += self.read_all(stream)
+
+        # Assert
+        self.assertEqual([m.data.msg_type for m in msgs], [0, 1, 2])
+        self.assertEqual(stream.pending_bytes, 0)
+
+    def test_whenFrameIsPartial_itIsNotFramedUntilComplete(self):
+        # Arrange
+        stream = MessageStream(pyrtma.MessageHeader)
+        frame = make_frame(7)
+
+        # Act / Assert
+        stream.feed(frame[:-1])
+        self.assertFalse(stream.has_frame())
+        self.assertIsNone(stream.next_frame())
+
+        stream.feed(frame[-1:])
+        self.assertTrue(stream.has_frame())
+        self.assertEqual([m.data.msg_type for m in self.read_all(stream)], [7])
+
+    def test_whenFrameIsUnread_itIsFramedAgain(self):
+        # Arrange
+        stream = MessageStream(pyrtma.MessageHeader)
+        stream.feed(make_frame(1) + make_frame(2))
+
+        # Act
+        offset = stream.next_frame()
+        stream.unread(offset)
+
+        # Assert
+        self.assertEqual([m.data.msg_type for m in self.read_all(stream)], [1, 2])
+
+
+class TestDecodeMessage(unittest.TestCase):
+    """Test decoding frames from the receive buffer."""
+
+    def test_whenFrameIsPeeked_msgTypeIsReadFromRawHeader(self):
+        # Arrange
+        stream = MessageStream(pyrtma.MessageHeader)
+        stream.feed(make_frame(3))
+
+        # Act
+        offset = stream.next_frame()
+
+        # Assert
+        self.assertEqual(stream.msg_type(offset), cd.MT_SUBSCRIBE)
+
+    def test_whenLazy_dataIsDecodedOnFirstAccess(self):
+        # Arrange
+        frame = make_frame(5)
+        header = pyrtma.MessageHeader.from_buffer_copy(frame)
+
+        # Act
+        msg = decode_message(header, frame[header.size :], lazy=True)
+
+        # Assert
+        self.assertIsInstance(msg, pyrtma.LazyMessage)
+        self.assertFalse(msg.decoded)
+        self.assertEqual(msg.type_id, cd.MT_SUBSCRIBE)
+        self.assertEqual(msg.data.msg_type, 5)
+        self.assertTrue(msg.decoded)
+        self.assertEqual(msg, decode_message(header, frame[header.size :]))
+
+    def test_whenNotCopied_messageIsViewOfPayload(self):
+        # Arrange
+        frame = bytearray(make_frame(5))
+        header = pyrtma.MessageHeader.from_buffer_copy(frame)
+        payload = memoryview(frame)[header.size :]
+
+        # Act
+        msg = decode_message(header, payload, copy=False)
+        kept = msg.copy()
+        frame[header.size :] = bytes(make_frame(9))[header.size :]
+
+        # Assert
+        self.assertEqual(msg.data.msg_type, 9)
+        self.assertEqual(kept.data.msg_type, 5)
+
+    def test_whenCopied_headerClassIsKept(self):
+        # Arrange
+        header = pyrtma.get_header_cls(timecode=True)()
+        header.utc_seconds = 12
+        msg = pyrtma.Message(header, cd.MDF_SUBSCRIBE())
+
+        # Act
+        copied = pyrtma.Message.copy(msg)
+
+        # Assert
+        self.assertIsInstance(copied.header, type(header))
+        self.assertEqual(copied.header.utc_seconds, 12)
+        self.assertEqual(copied, msg)
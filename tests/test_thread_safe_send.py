@@ -0,0 +1,71 @@
+import socket
+import threading
+import unittest
+
+import pyrtma
+import pyrtma.core_defs as cd
+from pyrtma.client import Client
+from pyrtma.stream import MessageStream
+
+
+class TestThreadSafeSend(unittest.TestCase):
+    """Test sending from several threads through one client."""
+
+    def setUp(self):
+        self.peer, sock = socket.socketpair()
+        self.client = Client()
+        self.client._sock.close()
+        self.client._sock = sock
+        self.client._connected = True
+        self.client.enable_thread_safe_send()
+
+    def tearDown(self):
+        self.client._connected = False
+        self.client._sock.close()
+        self.peer.close()
+
+    def test_whenThreadsSendAtOnce_framesAreIntactAndCountsConsecutive(self):
+        # Arrange
+        n_threads = 4
+        n = 2000
+        header_size = pyrtma.MessageHeader().size
+        frame_size = header_size + cd.MDF_SUBSCRIBE().size
+        stream = MessageStream(pyrtma.MessageHeader)
+
+        def send(thread_id: int):
+            for i in range(n):
+                msg = cd.MDF_SUBSCRIBE()
+                msg.msg_type = thread_id * n + i
+                self.client.send_message(msg)
+
+        def read():
+            while stream.pending_bytes < n_threads * n * frame_size:
+                stream.recv_into(self.peer)
+
+        threads = [threading.Thread(target=send, args=(t,)) for t in range(n_threads)]
+        reader = threading.Thread(target=read)
+
+        # Act
+        reader.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        reader.join(5.0)
+
+        # Assert
+        counts = []
+        sent = {t: [] for t in range(n_threads)}
+        while (offset := stream.next_frame()) is not None:
+            header = pyrtma.MessageHeader.from_buffer_copy(stream.buffer, offset)
+            self.assertEqual(header.msg_type, cd.MT_SUBSCRIBE)
+            self.assertEqual(header.num_data_bytes, 4)
+            counts.append(header.msg_count)
+            payload = stream.view[offset + header_size : offset + frame_size]
+            value = cd.MDF_SUBSCRIBE.from_buffer_copy(payload).msg_type
+            sent[value // n].append(value % n)
+
+        self.assertEqual(counts, list(range(n_threads * n)))
+        self.assertEqual(self.client.msg_count, n_threads * n)
+        for t in range(n_threads):
+            self.assertEqual(sent[t], list(range(n)))